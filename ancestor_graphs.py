@@ -0,0 +1,76 @@
+"""
+    Ancestor Graphs
+
+    This module answers "what do I need for this course" questions with the part of the prerequisite graph that
+    leads to the asked courses: the subgraph of the graph built by main.Program.create_graph on the asked courses
+    and every node with a path to them, with the same group nodes, built without building the whole graph (see
+    main.ancestor_nodes). Its nodes and edges only depend on the catalog, so the structure of the most recently asked
+    subgraphs is cached, and each student's graph is a copy of it with the student's red and green edge colours.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+from functools import lru_cache
+from typing import Iterable, TYPE_CHECKING
+
+import core_classes as cc
+import main
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+ANCESTOR_CACHE_SIZE = 128
+
+
+class AncestorGraphs:
+    """
+        Builds and caches the ancestor subgraphs of one catalog.
+
+        Instance Attributes:
+        - courses: A dictionary mapping course code to Course object.
+
+        Representation Invariants:
+        - self.courses != {}
+    """
+    courses: dict[str, cc.Course]
+
+    def __init__(self, courses: dict[str, cc.Course], cache_size: int = ANCESTOR_CACHE_SIZE) -> None:
+        self.courses = courses
+        self._structure = lru_cache(maxsize=cache_size)(self._build)
+
+    def structure(self, targets: Iterable[str]) -> 'nx.DiGraph':
+        """
+            Returns the uncoloured subgraph of the targets and their ancestors, from the cache if it was asked for
+            recently. The graph is shared by every caller and must not be modified. Raises a ValueError if a target
+            is not a node of the whole graph.
+        """
+        return self._structure(frozenset(targets))
+
+    def graph(self, student: cc.Student, targets: Iterable[str]) -> 'nx.DiGraph':
+        """
+            Returns the subgraph of the targets and their ancestors, with every edge coloured for the student the
+            way create_graph colours it: 'g' for fulfilled prerequisites and 'r' for unfulfilled ones. Raises a
+            ValueError if a target is not a node of the whole graph.
+        """
+        g = self.structure(targets).copy()
+        colors = main.get_edges(self.courses, main.create_student_mapping(student), g)
+        for source, target in g.edges:
+            g[source][target]['color'] = colors[(target, source)]
+        return g
+
+    def clear(self) -> None:
+        """
+            Empties the cache, for when the catalog has changed.
+        """
+        self._structure.cache_clear()
+
+    def _build(self, targets: frozenset[str]) -> 'nx.DiGraph':
+        """
+            Builds the uncoloured subgraph of the targets and their ancestors. Available through structure.
+        """
+        import networkx as nx
+
+        g = nx.DiGraph()
+        main.Program(self.courses, cc.Student('0000000000', 'Structure', [])).create_graph(g, targets=targets)
+        for _, _, data in g.edges(data=True):
+            del data['color']
+        return g
@@ -0,0 +1,8 @@
+"""
+    Benchmarks for CourseSpyderweb
+
+    Each module in this package is run from the project root with python -m benchmarks.<module> and prints its
+    results as JSON.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
@@ -0,0 +1,36 @@
+"""
+    Categorize Benchmark
+
+    Measures how many course blocks per second categorize_courses turns into Course objects, using a saved copy of
+    the calendar print page. The page is parsed once up front so only categorizing is timed.
+
+    Usage: python -m benchmarks.categorize_benchmark <saved print page> [repeats]
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import json
+import sys
+import time
+
+from bs4 import BeautifulSoup as Soupy
+
+from course_scrapper import COURSE_BLOCK_CLASS, COURSES_TO_SCRAP, categorize_courses
+
+
+def benchmark_categorize(file_name: str, repeats: int = 5) -> dict:
+    """
+        Returns the number of course blocks in the page and the best rows per second over repeats runs of
+        categorize_courses on all of them.
+    """
+    with open(file_name, encoding='utf-8') as page:
+        blocks = Soupy(page.read(), 'html.parser').find_all(class_=COURSE_BLOCK_CLASS)
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        categorize_courses(blocks, COURSES_TO_SCRAP)
+        best = min(best, time.perf_counter() - start)
+    return {'rows': len(blocks), 'seconds': best, 'rows_per_second': len(blocks) / best}
+
+
+if __name__ == '__main__':
+    print(json.dumps(benchmark_categorize(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 5), indent=2))
@@ -0,0 +1,67 @@
+"""
+    Memory Benchmark
+
+    Measures the memory retained by a synthetic catalog and a batch of academic records, once as core_classes.Course
+    and core_classes.Record objects and once as their compact variants, CompactCourse and CompactRecord. Memory is
+    measured with tracemalloc, so it counts Python allocations only.
+
+    Usage: python -m benchmarks.memory_benchmark [courses] [records]
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import gc
+import json
+import sys
+import tracemalloc
+from typing import Callable
+
+from benchmarks.synthetic import synthetic_catalog, synthetic_records
+from core_classes import CompactRecord, compact_courses
+
+
+def retained_bytes(build: Callable[[], object]) -> int:
+    """
+        Returns the number of bytes still allocated after build() returns, while its result is kept alive.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return retained
+
+
+def benchmark_memory(courses: int = 10000, records: int = 100000, seed: int = 0) -> dict:
+    """
+        Returns the bytes retained by the catalog and the records in each representation. The compact records
+        share the compact catalog's course objects.
+    """
+    def plain() -> tuple:
+        catalog = synthetic_catalog(courses, seed)
+        return catalog, synthetic_records(catalog, records, seed)
+
+    def compact() -> tuple:
+        catalog = synthetic_catalog(courses, seed)
+        history = synthetic_records(catalog, records, seed)
+        compact_catalog = compact_courses(catalog)
+        by_code = {course.course_code: course for course in compact_catalog}
+        del catalog
+        return compact_catalog, [CompactRecord.from_record(record, by_code) for record in history]
+
+    catalog_bytes = retained_bytes(lambda: synthetic_catalog(courses, seed))
+    compact_catalog_bytes = retained_bytes(lambda: compact_courses(synthetic_catalog(courses, seed)))
+    total_bytes = retained_bytes(plain)
+    compact_total_bytes = retained_bytes(compact)
+    return {'courses': courses, 'records': records,
+            'catalog_bytes': catalog_bytes, 'compact_catalog_bytes': compact_catalog_bytes,
+            'catalog_and_records_bytes': total_bytes, 'compact_catalog_and_records_bytes': compact_total_bytes,
+            'catalog_ratio': compact_catalog_bytes / catalog_bytes,
+            'catalog_and_records_ratio': compact_total_bytes / total_bytes}
+
+
+if __name__ == '__main__':
+    arguments = [int(argument) for argument in sys.argv[1:3]]
+    print(json.dumps(benchmark_memory(*arguments), indent=2))
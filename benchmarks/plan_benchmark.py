@@ -0,0 +1,61 @@
+"""
+    Plan Benchmark
+
+    Measures the seconds it takes course_planner to plan every program and focus, with each objective, for students
+    at the start of their first year, after the first year courses of either route, after part of second year, and
+    with irregular histories that skip ahead to upper year courses, which give the slowest plans found (close to a
+    second for the computer vision focus). It reports the slowest plan, the number of terms and credits of each plan
+    and the seconds it took.
+
+    Usage: python -m benchmarks.plan_benchmark
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import json
+import time
+
+import core_classes as cc
+import course_planner
+import course_scrapper
+import main
+import program_rules
+
+HISTORIES = [[],
+             ['CSC110Y1', 'CSC111H1', 'MAT137Y1'],
+             ['CSC108H1', 'CSC148H1', 'CSC165H1', 'MAT135H1', 'MAT136H1'],
+             ['CSC110Y1', 'CSC111H1', 'MAT137Y1', 'CSC207H1', 'CSC236H1', 'MAT223H1'],
+             ['CSC108H1', 'CSC148H1', 'CSC369H1'],
+             ['CSC108H1', 'CSC148H1', 'CSC318H1', 'CSC369H1', 'CSC419H1', 'CSC446H1', 'CSC491H1']]
+
+
+def benchmark_plans() -> dict:
+    """
+        Returns the seconds it took to set up the planner and the plans of every program and focus, with each
+        objective, for a student with each of the HISTORIES.
+    """
+    courses = main.create_course_mapping(course_scrapper.read_from_csv(course_scrapper.CSV_FILE))
+    batch = []
+    for number, history in enumerate(HISTORIES):
+        student = cc.Student(str(1000000000 + number), 'Student', [])
+        for code in history:
+            main.add_course_info(student, code, 80, 0.5 if code[6] == 'H' else 1.0, courses)
+        batch.append(student)
+    start = time.perf_counter()
+    planner = course_planner.CoursePlanner(courses)
+    results = {'planner_setup_seconds': time.perf_counter() - start, 'slowest_seconds': 0.0, 'plans': []}
+    targets = list(program_rules.PROGRAM_RULES) + [(focus, 'major') for focus in program_rules.FOCUS_RULES]
+    for student, history in zip(batch, HISTORIES):
+        for program, degree_type in targets:
+            for objective in course_planner.PLAN_OBJECTIVES:
+                start = time.perf_counter()
+                plan = course_planner.plan_program(student, program, degree_type, planner, objective=objective)
+                seconds = time.perf_counter() - start
+                results['slowest_seconds'] = max(results['slowest_seconds'], seconds)
+                results['plans'].append({'history': history, 'program': program, 'degree_type': degree_type,
+                                         'objective': objective, 'terms': None if plan is None else len(plan.terms),
+                                         'credits': None if plan is None else plan.credits, 'seconds': seconds})
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(benchmark_plans(), indent=2))
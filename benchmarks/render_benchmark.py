@@ -0,0 +1,72 @@
+"""
+    Render Benchmark
+
+    Measures the seconds per student it takes to write the CSC prerequisite graph to a PNG file, once by drawing the
+    whole figure for every student (as visualize_graph does) and once with graph_renderer.GraphRenderer, which draws
+    the graph once and only swaps the edge colours, for PNG and for SVG files. The students are random selections of
+    CSC, MAT and STA courses from the saved course data.
+
+    Usage: python -m benchmarks.render_benchmark [students]
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import core_classes as cc
+import course_scrapper
+import graph_layout
+import graph_renderer
+import main
+
+
+def benchmark_render(students: int = 20, seed: int = 0) -> dict:
+    """
+        Returns the seconds per student of redrawing the whole figure and of rendering with a GraphRenderer, and the
+        seconds it took to set up the renderer.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
+    courses = main.create_course_mapping(course_scrapper.read_from_csv(course_scrapper.CSV_FILE))
+    main.course_data = courses
+    rng = random.Random(seed)
+    codes = [code for code in courses if code[:3] in ('CSC', 'MAT', 'STA')]
+    batch = [cc.Student(str(1000000000 + number), 'Student',
+                        [cc.Record(courses[code], rng.randint(40, 100), 0.5) for code in rng.sample(codes, 12)])
+             for number in range(students)]
+    g = nx.DiGraph()
+    main.Program(courses, batch[0]).create_graph(g)
+    pos = graph_layout.cached_layout(g)
+    colors = [graph_renderer.edge_colors(courses, student, g) for student in batch]
+    results = {'students': students}
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        for student_colors in colors:
+            plt.figure(figsize=graph_renderer.FIGURE_SIZE, dpi=graph_renderer.FIGURE_DPI)
+            nx.draw_networkx_nodes(g, pos, node_size=graph_renderer.NODE_SIZE)
+            nx.draw_networkx_labels(g, pos, font_size=graph_renderer.FONT_SIZE)
+            nx.draw_networkx_edges(g, pos, arrows=True, edge_color=student_colors)
+            plt.savefig(os.path.join(directory, 'redraw.png'))
+            plt.close()
+        results['redraw_png_seconds'] = (time.perf_counter() - start) / students
+        start = time.perf_counter()
+        renderer = graph_renderer.GraphRenderer(g, pos)
+        results['renderer_setup_seconds'] = time.perf_counter() - start
+        for file_format in graph_renderer.RENDER_FORMATS:
+            renderer.render(colors[0], os.path.join(directory, f'first.{file_format}'))
+            start = time.perf_counter()
+            for student_colors in colors:
+                renderer.render(student_colors, os.path.join(directory, f'student.{file_format}'))
+            results[f'renderer_{file_format}_seconds'] = (time.perf_counter() - start) / students
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(benchmark_render(int(sys.argv[1]) if len(sys.argv) > 1 else 20), indent=2))
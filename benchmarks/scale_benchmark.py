@@ -0,0 +1,215 @@
+"""
+    Scale Benchmark
+
+    Measures how the stages of loading a catalog, building and colouring its prerequisite graph and checking
+    eligibility scale with the size of the catalog, on seeded synthetic catalogs (see benchmarks.synthetic) of each
+    of the given sizes and a batch of synthetic students. The catalogs have CSC, MAT and STA departments, whose
+    courses are the ones Program.create_graph and the program rules look at, and as few other departments as the
+    calendar's three digit course numbers allow, so the CSC department (and the graph) grows with the catalog. Most
+    prerequisites point at lower numbered courses of the same department.
+
+    Every stage reports the best wall time in seconds over a number of repeats, the number of calls it made, and
+    its peak memory in bytes, measured with tracemalloc in a separate run so that tracing does not slow down the
+    timed runs. The time it takes to import the headless eligibility API (see import_budget) is reported once.
+
+    The results are compared with a baseline, a JSON file written by an earlier run: every stage of a size that is
+    in both, whose peak memory grew by more than the tolerance (and by more than a small absolute amount), or whose
+    number of calls changed, is listed as a regression. When there are regressions the script exits with status 1.
+    Wall times vary too much from run to run to fail on by default, even as the best of several repeats. With
+    --seconds they are compared too, after scaling the baseline's times by how much slower a fixed calibration loop
+    (see calibrate), timed in the same run, ran than in the baseline's run, and a stage must also be slower by a
+    small absolute amount, so that noise on stages that take microseconds is not reported.
+
+    The baseline is only meaningful on the machine it was recorded on: peak memory depends on the Python and
+    library versions, and the calibration loop only corrects for a uniformly faster or slower machine. Re-record
+    it on each machine (and after an intended change) by writing a run's results over it.
+
+    Usage: python -m benchmarks.scale_benchmark [--seconds] [sizes, e.g. 100,1000,10000,50000] [output JSON file]
+    [baseline JSON file, default benchmarks/scale_baseline.json if it exists]
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Optional
+
+import core_classes as cc
+import course_graph
+import course_scrapper
+import graph_layout
+import import_budget
+import main
+import program_rules
+from benchmarks.synthetic import synthetic_catalog, synthetic_records
+
+SCALE_SIZES = (100, 1000, 10000, 50000)
+SCALE_DEPARTMENTS = ('CSC', 'MAT', 'STA')
+SCALE_STUDENTS = 20
+SCALE_RECORDS = 20
+SCALE_REPEATS = 5
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scale_baseline.json')
+REGRESSION_TOLERANCE = 0.5
+MIN_REGRESSION_SECONDS = 0.005
+MIN_REGRESSION_BYTES = 64 * 1024
+CALIBRATION_SIZE = 100000
+
+
+def measure(stage: Callable[[], Any], calls: int, repeats: int = SCALE_REPEATS) -> dict:
+    """
+        Returns the best seconds over repeats runs of stage, the number of calls one run makes and the peak bytes
+        allocated by one traced run of stage, on top of what was allocated before it.
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        stage()
+        best = min(best, time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    stage()
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return {'seconds': best, 'calls': calls, 'peak_bytes': peak}
+
+
+def calibrate(repeats: int = SCALE_REPEATS) -> float:
+    """
+        Returns the best seconds over repeats runs of a fixed loop of the dictionary, set, string and sorting work
+        the stages are made of, which measures how fast this machine runs them at the moment.
+    """
+    def loop() -> None:
+        codes = {f'CSC{number % 1000:03d}H{number % 7}': number for number in range(CALIBRATION_SIZE)}
+        stems = {code[:6] for code in codes}
+        sorted(codes, key=lambda code: (code[:6] in stems, codes[code]))
+
+    return measure(loop, 1, repeats)['seconds']
+
+
+def benchmark_size(size: int, seed: int = 0, students: int = SCALE_STUDENTS, repeats: int = SCALE_REPEATS) -> dict:
+    """
+        Returns the measurements of every stage for a synthetic catalog of size courses and a batch of students.
+
+        Preconditions:
+        - 1 <= size <= 900 * 26 ** 3
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
+    departments = max(len(SCALE_DEPARTMENTS), -(-size // 900))
+    catalog = synthetic_catalog(size, seed, departments, SCALE_DEPARTMENTS, same_department=0.8)
+    stages = {}
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, 'catalog.csv')
+        course_scrapper.write_to_csv(catalog, file_name)
+        stages['read_from_csv'] = measure(lambda: course_scrapper.read_from_csv(file_name, use_snapshot=False), 1,
+                                          repeats)
+        course_scrapper.read_from_csv(file_name)
+        stages['read_from_csv_snapshot'] = measure(lambda: course_scrapper.read_from_csv(file_name), 1, repeats)
+    stages['create_course_mapping'] = measure(lambda: main.create_course_mapping(catalog), 1, repeats)
+    courses = main.create_course_mapping(catalog)
+    batch = [cc.Student(str(1000000000 + number), 'Student',
+                        synthetic_records(catalog, SCALE_RECORDS, seed + number)) for number in range(students)]
+    for student in batch:
+        main.create_student_mapping(student)
+
+    def build_graph() -> nx.DiGraph:
+        g = nx.DiGraph()
+        main.Program(courses, batch[0]).create_graph(g)
+        return g
+
+    stages['create_graph'] = measure(build_graph, 1, repeats)
+    g = build_graph()
+    stages['get_edges'] = measure(lambda: [main.get_edges(courses, main.create_student_mapping(student), g)
+                                           for student in batch], students, repeats)
+    structure = course_graph.CourseGraph(courses)
+    stages['course_graph_colors'] = measure(lambda: [structure.colors(student) for student in batch], students,
+                                            repeats)
+    stages['check_eligibility_course'] = measure(
+        lambda: [main.check_eligibility_course(course, student, courses) for student in batch for course in courses],
+        students * len(courses), repeats)
+    stages['check_eligibility_focus'] = measure(
+        lambda: [main.check_eligibility_focus(focus, student) for student in batch
+                 for focus in program_rules.FOCUS_RULES], students * len(program_rules.FOCUS_RULES), repeats)
+    stages['layered_layout'] = measure(lambda: graph_layout.layered_layout(g), 1, repeats)
+    pos = graph_layout.layered_layout(g)
+
+    def draw() -> None:
+        main.visualize_graph(g, pos)
+        plt.gcf().canvas.draw()
+        plt.close('all')
+
+    stages['visualize_graph'] = measure(draw, 1, repeats)
+    return {'courses': size, 'graph_nodes': g.number_of_nodes(), 'graph_edges': g.number_of_edges(),
+            'stages': stages}
+
+
+def compare(results: dict, baseline: dict, tolerance: float = REGRESSION_TOLERANCE, seconds: bool = False) \
+        -> list[dict]:
+    """
+        Returns the regressions of results against baseline: the stages whose number of calls changed, or whose peak
+        bytes grew by more than tolerance, as a fraction of the baseline, and by more than MIN_REGRESSION_BYTES. If
+        seconds is True, so are the stages whose seconds grew by more than tolerance and by more than
+        MIN_REGRESSION_SECONDS over the baseline's seconds scaled by the ratio of the calibration times of the two
+        runs (see calibrate).
+    """
+    metrics = [('peak_bytes', MIN_REGRESSION_BYTES, 1.0)]
+    if seconds:
+        calibration = results['calibration_seconds']
+        metrics.append(('seconds', MIN_REGRESSION_SECONDS,
+                        calibration / baseline.get('calibration_seconds', calibration)))
+    regressions = []
+    for size, measured in results['sizes'].items():
+        for stage, values in measured['stages'].items():
+            before = baseline.get('sizes', {}).get(size, {}).get('stages', {}).get(stage)
+            if before is None:
+                continue
+            if values['calls'] != before['calls']:
+                regressions.append({'size': size, 'stage': stage, 'metric': 'calls', 'baseline': before['calls'],
+                                    'current': values['calls'], 'ratio': values['calls'] / max(before['calls'], 1)})
+            for metric, minimum, scale in metrics:
+                expected = before[metric] * scale
+                if values[metric] > expected * (1 + tolerance) and values[metric] - expected > minimum:
+                    regressions.append({'size': size, 'stage': stage, 'metric': metric, 'baseline': expected,
+                                        'current': values[metric], 'ratio': values[metric] / max(expected, 1e-9)})
+    return regressions
+
+
+def benchmark_scale(sizes: tuple[int, ...] = SCALE_SIZES, baseline_file: Optional[str] = None, seed: int = 0,
+                    seconds: bool = False) -> dict:
+    """
+        Returns the measurements of every size, the import time of the headless eligibility API, the calibration
+        time and the regressions against the baseline in baseline_file (or BASELINE_FILE if baseline_file is None
+        and it exists). Seconds are only compared if seconds is True (see compare).
+    """
+    results = {'seed': seed, 'students': SCALE_STUDENTS, 'repeats': SCALE_REPEATS,
+               'import': import_budget.measure_import(import_budget.HEADLESS_MODULES),
+               'calibration_seconds': calibrate(),
+               'sizes': {str(size): benchmark_size(size, seed) for size in sizes}}
+    if baseline_file is None and os.path.exists(BASELINE_FILE):
+        baseline_file = BASELINE_FILE
+    if baseline_file is not None:
+        with open(baseline_file, encoding='utf-8') as baseline:
+            results['baseline'] = baseline_file
+            results['regressions'] = compare(results, json.load(baseline), seconds=seconds)
+    return results
+
+
+if __name__ == '__main__':
+    arguments = [argument for argument in sys.argv[1:] if argument != '--seconds']
+    report = benchmark_scale(tuple(int(size) for size in arguments[0].split(',')) if len(arguments) > 0
+                             else SCALE_SIZES, arguments[2] if len(arguments) > 2 else None,
+                             seconds='--seconds' in sys.argv[1:])
+    if len(arguments) > 1:
+        with open(arguments[1], 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if report.get('regressions') else 0)
@@ -0,0 +1,134 @@
+"""
+    Service Benchmark
+
+    A local load test of query_service: opens a number of concurrent keep-alive connections and sends a mix of
+    eligibility, requirements, graph edge, plan and unlock queries for random students over them, then reports the
+    throughput and the 50th and 99th percentile latencies, overall and per query path. Unless a port is given, the
+    service is started in a subprocess on a free port and stopped afterwards.
+
+    Usage: python -m benchmarks.service_benchmark [requests] [concurrency] [port]
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Optional
+
+import course_scrapper
+from query_service import SERVICE_HOST
+
+FOCUSES = ['scientific computing', 'game design', 'computer vision', 'artificial intelligence',
+           'theory of computation', 'computer systems']
+
+
+def synthetic_queries(count: int, seed: int = 0) -> list[tuple[str, bytes]]:
+    """
+        Returns count (path, JSON body) queries for random students of CSC, MAT and STA courses from the course
+        data, cycling through the service's query paths.
+    """
+    rng = random.Random(seed)
+    codes = [course.course_code for course in course_scrapper.read_from_csv(course_scrapper.CSV_FILE)
+             if course.course_code[:3] in ('CSC', 'MAT', 'STA')]
+    queries = []
+    for number in range(count):
+        student = {'student_number': str(1000000000 + number), 'student_name': 'Student',
+                   'records': [{'course': code, 'grade': rng.randint(40, 100)} for code in rng.sample(codes, 15)]}
+        path, query = [('/eligibility/course', {'courses': rng.sample(codes, 10)}),
+                       ('/eligibility/program', {'degree': rng.choice(['major', 'specialist'])}),
+                       ('/eligibility/focus', {'focus': rng.choice(FOCUSES)}),
+                       ('/requirements', {'program': 'computer science', 'degree_type': 'major'}),
+                       ('/edges', {}),
+                       ('/plan', {'program': 'computer science', 'degree_type': rng.choice(['major', 'specialist'])}),
+                       ('/unlocks', {'limit': 10})][number % 7]
+        queries.append((path, json.dumps({'student': student, **query}).encode('utf-8')))
+    return queries
+
+
+async def _client(host: str, port: int, queries: list[tuple[str, bytes]], latencies: list[tuple[str, float, int]]) \
+        -> None:
+    """
+        Sends the queries one after the other over a single keep-alive connection, appending the path, latency in
+        seconds and status code of each response to latencies.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path, body in queries:
+            start = time.perf_counter()
+            writer.write(f'POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n'
+                         f'Content-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            line = await reader.readline()
+            while line not in (b'\r\n', b''):
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.strip().lower() == 'content-length':
+                    length = int(value)
+                line = await reader.readline()
+            await reader.readexactly(length)
+            latencies.append((path, time.perf_counter() - start, status))
+    finally:
+        writer.close()
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    """
+        Returns the nearest-rank percentile of the sorted values, in milliseconds.
+
+        Preconditions:
+        - values != []
+        - 0 <= fraction <= 1
+    """
+    return values[min(len(values) - 1, int(fraction * len(values)))] * 1000
+
+
+async def _load_test(host: str, port: int, queries: list[tuple[str, bytes]], concurrency: int) -> dict:
+    """
+        Spreads the queries over concurrency connections and returns the load test's report.
+    """
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, queries[client::concurrency], latencies)
+                           for client in range(concurrency)))
+    seconds = time.perf_counter() - start
+    report = {'requests': len(latencies), 'concurrency': concurrency, 'seconds': seconds,
+              'requests_per_second': len(latencies) / seconds,
+              'errors': sum(1 for _, _, status in latencies if status != 200)}
+    for path in [None] + sorted({path for path, _, _ in latencies}):
+        times = sorted(latency for query_path, latency, _ in latencies if path is None or query_path == path)
+        report[path or 'all'] = {'p50_ms': _percentile(times, 0.5), 'p99_ms': _percentile(times, 0.99)}
+    return report
+
+
+def benchmark_service(requests: int = 2000, concurrency: int = 32, port: Optional[int] = None) -> dict:
+    """
+        Load tests the service on port, or on a service started in a subprocess if port is None, and returns the
+        report.
+
+        Preconditions:
+        - requests >= concurrency >= 1
+    """
+    queries = synthetic_queries(requests)
+    service = None
+    if port is None:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        service = subprocess.Popen([sys.executable, 'query_service.py', '0'], cwd=root, stdout=subprocess.PIPE,
+                                   text=True)
+        port = int(service.stdout.readline().rsplit(':', 1)[1])
+    try:
+        return asyncio.run(_load_test(SERVICE_HOST, port, queries, concurrency))
+    finally:
+        if service is not None:
+            service.terminate()
+            service.wait()
+
+
+if __name__ == '__main__':
+    print(json.dumps(benchmark_service(int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+                                       int(sys.argv[2]) if len(sys.argv) > 2 else 32,
+                                       int(sys.argv[3]) if len(sys.argv) > 3 else None), indent=2))
@@ -0,0 +1,91 @@
+"""
+    Synthetic Catalogs
+
+    Generates seeded, synthetic course catalogs and academic records at any scale, for benchmarks that need more
+    courses than the CSC dataset has. Course codes follow the calendar's format (three letter department, three
+    digit number, H or Y, campus digit), prerequisites only point at lower numbered courses, and the relation lists
+    are built the way read_from_csv builds them, as fresh lists of fresh strings.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import random
+import string
+
+from core_classes import Course, Record
+
+WORDS = ['algorithms', 'data', 'systems', 'theory', 'analysis', 'design', 'methods', 'introduction', 'advanced',
+         'topics', 'structures', 'models', 'computation', 'applications', 'principles', 'foundations']
+
+
+def synthetic_catalog(size: int, seed: int = 0, departments: int = 60, named: tuple[str, ...] = (),
+                      same_department: float = 0.0) -> list[Course]:
+    """
+        Returns size synthetic courses spread over the given number of departments. The same arguments always produce
+        the same catalog.
+
+        The departments in named (e.g. ('CSC', 'MAT', 'STA'), so the catalog has courses that Program.create_graph
+        and the program rules look at) are always among the departments. Each prerequisite is replaced with
+        probability same_department by a random lower numbered course of the course's own department, since most
+        prerequisites of real courses are in the same department.
+
+        Preconditions:
+        - 1 <= size <= 900 * departments
+        - len(named) <= departments <= 26 ** 3
+        - 0.0 <= same_department <= 1.0
+    """
+    rng = random.Random(seed)
+    department_codes = set(named)
+    while len(department_codes) < departments:
+        department_codes.add(''.join(rng.choices(string.ascii_uppercase, k=3)))
+    department_codes = sorted(department_codes)
+    codes = []
+    for number in range(size):
+        department = department_codes[number % departments]
+        codes.append(f'{department}{100 + number // departments}{rng.choice("HY")}1')
+    courses = []
+    for position, code in enumerate(codes):
+        prerequisites = _sample(rng, codes, position, [0, 0, 1, 2, 2, 3, 4])
+        if same_department > 0 and position >= departments:
+            prerequisites = list(dict.fromkeys(
+                codes[position - departments * rng.randint(1, position // departments)]
+                if rng.random() < same_department else prerequisite for prerequisite in prerequisites))
+        exclusion = _sample(rng, codes, position, [0, 0, 0, 1, 2])
+        recommended = _sample(rng, codes, position, [0, 0, 0, 0, 1])
+        title = f'{code} - ' + ' '.join(rng.choices(WORDS, k=3)).title()
+        description = ' '.join(rng.choices(WORDS, k=40)).capitalize() + '.'
+        courses.append(Course(course_code=code, course_title=title, course_description=description,
+                              prerequisites=_fresh(prerequisites), recommended=_fresh(recommended), corequisite=[],
+                              exclusion=_fresh(exclusion), breadth_requirements=rng.randint(1, 5)))
+    return courses
+
+
+def synthetic_records(courses: list[Course], count: int, seed: int = 0) -> list[Record]:
+    """
+        Returns count synthetic academic records of randomly chosen courses of the catalog, each with a fresh copy
+        of its course, as a transcript parser would produce them.
+    """
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        course = rng.choice(courses)
+        copy = Course(course_code=_fresh([course.course_code])[0], course_title=course.course_title,
+                      course_description=course.course_description, prerequisites=_fresh(course.prerequisites),
+                      recommended=_fresh(course.recommended), corequisite=_fresh(course.corequisite),
+                      exclusion=_fresh(course.exclusion), breadth_requirements=course.breadth_requirements)
+        weight = 0.5 if course.course_code[6] == 'H' else 1.0
+        records.append(Record(course_taken=copy, grade=rng.randint(0, 100), weight=float(str(weight))))
+    return records
+
+
+def _sample(rng: random.Random, codes: list[str], position: int, sizes: list[int]) -> list[str]:
+    """
+        Returns a random sample of the codes before position, of a size randomly chosen from sizes.
+    """
+    return [codes[i] for i in rng.sample(range(position), min(position, rng.choice(sizes)))]
+
+
+def _fresh(codes: list[str]) -> list[str]:
+    """
+        Returns a list of new string objects equal to codes, like the lists read_from_csv splits out of a cell.
+    """
+    return ','.join(codes).split(',') if codes else []
@@ -0,0 +1,308 @@
+"""
+    Calendar Spider
+    This module contains the scrapy spider that downloads the Academic Calendar and hands the course blocks to
+    course_scrapper for categorizing and writing. It is kept apart from course_scrapper so that scrapy and
+    BeautifulSoup are only imported when scraping.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import logging
+import os
+import re
+from typing import Any, AsyncIterator, Iterator, Optional, Union
+
+import scrapy
+from bs4 import BeautifulSoup as Soupy
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.internet import task
+
+from course_scrapper import COURSE_BLOCK_CLASS, COURSES_TO_SCRAP, CSV_FILE, STREAM_CHUNK_SIZE, categorize_courses, \
+    categorize_courses_parallel, iter_course_block_html, iter_course_blocks, not_modified_report, read_refresh_state, \
+    refresh_csv, write_to_csv
+
+DEPARTMENTS_URL = 'https://artsci.calendar.utoronto.ca/listing-program-subject-areas'
+DEPARTMENT_LINK_SELECTOR = 'a[href*="/section/"]::attr(href)'
+NEXT_PAGE_SELECTOR = 'li.pager__item--next a::attr(href)'
+SHARD_DIRECTORY = 'CourseData'
+BACKOFF_BASE_DELAY = 1.0
+BACKOFF_MAX_DELAY = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+class BackoffRetryMiddleware:
+    """
+        A downloader middleware that retries failed requests like scrapy's RetryMiddleware, but waits before each
+        retry, doubling the wait every time: BACKOFF_BASE_DELAY seconds before the first retry, up to
+        BACKOFF_MAX_DELAY seconds. It reads the RETRY_TIMES, RETRY_HTTP_CODES, BACKOFF_BASE_DELAY and
+        BACKOFF_MAX_DELAY settings, and counts a failure as any connection error or a response with one of the
+        RETRY_HTTP_CODES status codes. Its methods take the spider as an optional argument, which newer scrapy
+        versions no longer pass.
+    """
+    max_retries: int
+    retry_codes: set[int]
+    base_delay: float
+    max_delay: float
+
+    def __init__(self, max_retries: int, retry_codes: set[int], base_delay: float, max_delay: float) -> None:
+        self.max_retries = max_retries
+        self.retry_codes = retry_codes
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_crawler(cls, crawler: 'scrapy.crawler.Crawler') -> 'BackoffRetryMiddleware':
+        """
+            Creates the middleware from the crawler's settings.
+        """
+        settings = crawler.settings
+        return cls(settings.getint('RETRY_TIMES'), {int(code) for code in settings.getlist('RETRY_HTTP_CODES')},
+                   settings.getfloat('BACKOFF_BASE_DELAY', BACKOFF_BASE_DELAY),
+                   settings.getfloat('BACKOFF_MAX_DELAY', BACKOFF_MAX_DELAY))
+
+    async def process_request(self, request: scrapy.Request, spider: Optional[scrapy.Spider] = None) -> None:
+        """
+            Waits out the backoff delay of a retried request before it is downloaded.
+        """
+        from twisted.internet import reactor
+
+        delay = request.meta.pop('backoff_delay', 0)
+        if delay > 0:
+            await maybe_deferred_to_future(task.deferLater(reactor, delay, lambda: None))
+
+    def process_response(self, request: scrapy.Request, response: scrapy.http.Response,
+                         spider: Optional[scrapy.Spider] = None) -> Union[scrapy.Request, scrapy.http.Response]:
+        """
+            Returns a retry of the request if the response has a retryable status code and retries are left, and
+            the response otherwise.
+        """
+        if response.status in self.retry_codes:
+            return self._retry(request) or response
+        return response
+
+    def process_exception(self, request: scrapy.Request, exception: Exception,
+                          spider: Optional[scrapy.Spider] = None) -> Optional[scrapy.Request]:
+        """
+            Returns a retry of a request whose download failed, or None once its retries are used up.
+        """
+        return self._retry(request)
+
+    def _retry(self, request: scrapy.Request) -> Optional[scrapy.Request]:
+        """
+            Returns a copy of the request to download again after its backoff delay, or None if it was already
+            retried max_retries times.
+        """
+        retries = request.meta.get('retry_times', 0)
+        if retries >= self.max_retries:
+            logger.error(f'Gave up on {request.url} after {retries} retries')
+            return None
+        delay = min(self.base_delay * 2 ** retries, self.max_delay)
+        logger.info(f'Retrying {request.url} in {delay}s')
+        retry = request.replace(dont_filter=True)
+        retry.meta['retry_times'] = retries + 1
+        retry.meta['backoff_delay'] = delay
+        return retry
+
+
+class CalendarSpider(scrapy.Spider):
+    """
+        This is a spider to perform scrapping on Course Calendar. It inherits from scrapy.spider class.
+
+        Setting processes (e.g. scrapy crawl CoursesSpider -a processes=8) to anything but 1 categorizes the course
+        blocks (only the new or edited ones when refreshing incrementally) on that many processes with
+        categorize_courses_parallel; 0 uses every core. Setting streaming to False (-a streaming=0) builds a
+        BeautifulSoup tree of the whole page instead of streaming it. Flags given with -a are False when they are '',
+        '0', 'false', 'no' or 'off', in any case.
+
+        When incremental is True (the default), the page is requested conditionally with the validators saved by the
+        last refresh, and the dataset is updated with refresh_csv instead of being rewritten. Setting incremental to
+        False (-a incremental=0) always downloads the page and rewrites the dataset. The url argument points the
+        spider at another copy of the print page, such as a local server.
+
+        Setting full_calendar (-a full_calendar=1) crawls every department instead: the departments page at
+        departments_url is read for links to each department's course listing, the listing pages of all departments
+        are fetched in parallel (following each listing's next page links), and every course is kept. Once the crawl
+        finishes, each department's courses are written in page order to its own shard, shard_directory/<department>
+        .csv, which read_shards reads back. Concurrency is bounded overall and per host, requests to a host are
+        spaced out and auto-throttled, and failed requests are retried with exponential backoff by
+        BackoffRetryMiddleware; all of these are set in custom_settings and can be overridden with -s.
+    """
+    name = "CoursesSpider"
+    url = 'https://artsci.calendar.utoronto.ca/print/view/pdf/course_search/print_page/debug'
+    streaming = True
+    processes = 1
+    incremental = True
+    handle_httpstatus_list = [304]
+    full_calendar = False
+    departments_url = DEPARTMENTS_URL
+    shard_directory = SHARD_DIRECTORY
+    custom_settings = {
+        'CONCURRENT_REQUESTS': 16,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 4,
+        'DOWNLOAD_DELAY': 0.25,
+        'AUTOTHROTTLE_ENABLED': True,
+        'AUTOTHROTTLE_START_DELAY': 0.25,
+        'AUTOTHROTTLE_MAX_DELAY': 10.0,
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': 4.0,
+        'RETRY_TIMES': 4,
+        'RETRY_HTTP_CODES': [429, 500, 502, 503, 504, 522, 524, 408],
+        'BACKOFF_BASE_DELAY': BACKOFF_BASE_DELAY,
+        'BACKOFF_MAX_DELAY': BACKOFF_MAX_DELAY,
+        'DOWNLOADER_MIDDLEWARES': {
+            'scrapy.downloadermiddlewares.retry.RetryMiddleware': None,
+            'calendar_spider.BackoffRetryMiddleware': 550,
+        },
+    }
+    department_pages: dict[str, dict[int, list]]
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """
+            Creates the spider, turning its -a arguments, which scrapy passes as strings, into the types of the
+            class attributes they override.
+        """
+        super().__init__(*args, **kwargs)
+        self.streaming = _flag(self.streaming)
+        self.incremental = _flag(self.incremental)
+        self.full_calendar = _flag(self.full_calendar)
+        self.processes = int(self.processes)
+
+    async def start(self) -> AsyncIterator[scrapy.Request]:
+        """
+            Yields the requests of start_requests. Scrapy 2.13 and later call this instead of start_requests.
+        """
+        for request in self.start_requests():
+            yield request
+
+    def start_requests(self) -> list[scrapy.Request]:
+        """
+         It starts the request to the web page (Academic Calendar) and returns the result of the request. After that, it
+         parses the request using Parse function
+        """
+        if self.full_calendar:
+            self.department_pages = {}
+            return [scrapy.Request(url=self.departments_url, callback=self.parse_departments)]
+        urls = [self.url]
+        headers = {}
+        if self.incremental:
+            state = read_refresh_state(CSV_FILE)
+            if state.get('etag'):
+                headers['If-None-Match'] = state['etag']
+            if state.get('last_modified'):
+                headers['If-Modified-Since'] = state['last_modified']
+        requests = list()
+        for url in urls:
+            requests.append(scrapy.Request(url=url, callback=self.parse, headers=headers))
+        return requests
+
+    def parse(self, response: scrapy.http.response) -> None:
+        """
+            Parses given response from the request into a raw data format and sends the result to categorize_courses to
+            clean and categorize raw data into a courses list and then return that list to write_to_csv to write a csv
+            file using the categorized data.
+
+            When streaming is True (the default), the page is fed to iter_course_blocks in chunks and each course
+            block is categorized as soon as it is complete, instead of building a tree of the whole page first.
+
+            When incremental is True, a 304 Not Modified response leaves the dataset untouched, and any other
+            response updates only the changed courses; either way a change report is written next to the dataset.
+        """
+        processes = self.processes or None
+        if self.incremental:
+            self.refresh(response, processes)
+            return None
+        if self.streaming:
+            body = response.body
+            chunks = (body[start:start + STREAM_CHUNK_SIZE] for start in range(0, len(body), STREAM_CHUNK_SIZE))
+            if processes != 1:
+                calendar_content = iter_course_block_html(chunks, response.encoding)
+            else:
+                calendar_content = iter_course_blocks(chunks, response.encoding)
+        else:
+            soup = Soupy(response.text, "html.parser")
+            calendar_content = soup.find_all(class_=COURSE_BLOCK_CLASS)
+            self.logger.debug(calendar_content)
+        if processes != 1:
+            write_to_csv(categorize_courses_parallel(calendar_content, COURSES_TO_SCRAP, processes))
+        else:
+            write_to_csv(categorize_courses(calendar_content, COURSES_TO_SCRAP))
+        return None
+
+    def refresh(self, response: scrapy.http.response, processes: Optional[int] = 1) -> None:
+        """
+            Incrementally updates the dataset from the response, saving its validators for the next request, and
+            logs the change report. The new or edited course blocks are categorized on that many processes if
+            processes is not 1 (see refresh_csv).
+        """
+        if response.status == 304:
+            report = not_modified_report(CSV_FILE)
+        else:
+            body = response.body
+            chunks = (body[start:start + STREAM_CHUNK_SIZE] for start in range(0, len(body), STREAM_CHUNK_SIZE))
+            validators = {'etag': _header(response, b'ETag'), 'last_modified': _header(response, b'Last-Modified')}
+            report = refresh_csv(iter_course_block_html(chunks, response.encoding), validators, COURSES_TO_SCRAP,
+                                 CSV_FILE, processes)
+        self.logger.info(report)
+
+    def parse_departments(self, response: scrapy.http.response) -> Iterator[scrapy.Request]:
+        """
+            Yields a request for the first listing page of every department linked from the departments page.
+        """
+        for link in dict.fromkeys(response.css(DEPARTMENT_LINK_SELECTOR).getall()):
+            department = _department_name(link)
+            self.department_pages[department] = {}
+            yield response.follow(link, callback=self.parse_department, cb_kwargs={'department': department,
+                                                                                 'page': 0})
+
+    def parse_department(self, response: scrapy.http.response, department: str,
+                         page: int) -> Iterator[scrapy.Request]:
+        """
+            Categorizes the courses on one listing page of a department, keeping them under the page's number, and
+            yields a request for the next listing page if there is one.
+        """
+        next_page = response.css(NEXT_PAGE_SELECTOR).get()
+        if next_page is not None:
+            yield response.follow(next_page, callback=self.parse_department,
+                                  cb_kwargs={'department': department, 'page': page + 1})
+        body = response.body
+        chunks = (body[start:start + STREAM_CHUNK_SIZE] for start in range(0, len(body), STREAM_CHUNK_SIZE))
+        self.department_pages[department][page] = categorize_courses(iter_course_blocks(chunks, response.encoding),
+                                                                     None)
+
+    def closed(self, reason: str) -> None:
+        """
+            Writes the shard of every department once a full calendar crawl finishes.
+        """
+        if not self.full_calendar:
+            return None
+        os.makedirs(self.shard_directory, exist_ok=True)
+        for department, pages in self.department_pages.items():
+            courses = [course for page in sorted(pages) for course in pages[page]]
+            write_to_csv(courses, os.path.join(self.shard_directory, department + '.csv'))
+            self.logger.info(f'Wrote {len(courses)} courses from {len(pages)} pages of {department}')
+        return None
+
+
+def _flag(value: Union[bool, str]) -> bool:
+    """
+        Returns a spider argument as a boolean. Arguments given with -a are strings, which are False when they are
+        '', '0', 'false', 'no' or 'off', in any case.
+    """
+    if isinstance(value, str):
+        return value.strip().lower() not in ('', '0', 'false', 'no', 'off')
+    return bool(value)
+
+
+def _department_name(link: str) -> str:
+    """
+        Returns the shard name of the department a listing link points to: the last segment of its path, with
+        anything but letters, digits and dashes replaced.
+    """
+    return re.sub(r'[^A-Za-z0-9-]', '_', link.split('?')[0].rstrip('/').rsplit('/', 1)[-1])
+
+
+def _header(response: scrapy.http.response, name: bytes) -> str:
+    """
+        Returns the value of a response header, or '' if the response does not have it.
+    """
+    value = response.headers.get(name)
+    return value.decode('latin-1') if value is not None else ''
@@ -0,0 +1,218 @@
+"""
+    Catalog Store
+
+    This module stores a course catalog in columns of NumPy arrays instead of a dictionary of Course objects. Courses
+    are identified by their integer IDs in course_ids.COURSE_IDS (the code to ID table shared with the bitmasks,
+    cohorts and indexes in the rest of the project), and each relation between courses (prerequisites, exclusion,
+    corequisite and recommended) is stored in compressed sparse row (CSR) form: the courses related to the course
+    with ID i are indices[indptr[i]:indptr[i + 1]].
+
+    The arrays can be handed to other consumers as read-only views without copying, exported as edge arrays or as a
+    networkx graph, and saved to and loaded from a .npz file so they do not have to be rebuilt on every run. The
+    prerequisite closure of prerequisite_index.PrerequisiteIndex can be built straight from the arrays (see
+    PrerequisiteIndex.from_store).
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+from typing import Iterable, Iterator, Optional, TYPE_CHECKING
+
+import numpy as np
+
+import core_classes as cc
+from course_ids import COURSE_IDS, CourseIds
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+RELATIONS = ('prerequisites', 'exclusion', 'corequisite', 'recommended')
+
+
+class CatalogStore:
+    """
+        A columnar, array backed course catalog.
+
+        Every per course array is indexed by course ID and has one entry for every ID that existed when the store was
+        built; IDs of courses that are only mentioned in relations, and IDs interned later, have no relations.
+
+        Instance Attributes:
+        - ids: The code to ID table the store's IDs belong to.
+        - courses: The IDs of the catalog's courses, in catalog order.
+        - in_catalog: in_catalog[i] is True if the course with ID i is in the catalog.
+        - breadth: breadth[i] is the breadth requirement of the course with ID i, or 0 if it is not in the catalog.
+
+        Representation Invariants:
+        - self.in_catalog.shape == self.breadth.shape
+        - all(self.in_catalog[course_id] for course_id in self.courses)
+    """
+    ids: CourseIds
+    courses: np.ndarray
+    in_catalog: np.ndarray
+    breadth: np.ndarray
+    _indptr: dict[str, np.ndarray]
+    _indices: dict[str, np.ndarray]
+
+    def __init__(self, courses: Iterable[cc.Course], ids: CourseIds = COURSE_IDS) -> None:
+        self.ids = ids
+        by_id = {}
+        for course in courses:
+            by_id[ids.intern(course.course_code)] = course
+        relations = {relation: {course_id: [ids.intern(code) for code in getattr(course, relation) if code != '']
+                                for course_id, course in by_id.items()} for relation in RELATIONS}
+        size = len(ids)
+        self.courses = np.fromiter(by_id, dtype=np.int32, count=len(by_id))
+        self.in_catalog = np.zeros(size, dtype=bool)
+        self.in_catalog[self.courses] = True
+        self.breadth = np.zeros(size, dtype=np.int8)
+        self.breadth[self.courses] = [course.breadth_requirements for course in by_id.values()]
+        self._indptr = {}
+        self._indices = {}
+        for relation, related in relations.items():
+            counts = np.zeros(size + 1, dtype=np.int64)
+            for course_id, related_ids in related.items():
+                counts[course_id + 1] = len(related_ids)
+            self._indptr[relation] = np.cumsum(counts)
+            self._indices[relation] = np.fromiter((related_id for course_id in sorted(related)
+                                                   for related_id in related[course_id]),
+                                                  dtype=np.int32, count=int(counts.sum()))
+        self._freeze()
+
+    def _freeze(self) -> None:
+        """
+            Makes every array of the store read-only, so views handed out cannot change it.
+        """
+        for array in [self.courses, self.in_catalog, self.breadth, *self._indptr.values(), *self._indices.values()]:
+            array.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    def __contains__(self, code: str) -> bool:
+        course_id = self.ids.get(code)
+        return course_id is not None and course_id < len(self.in_catalog) and bool(self.in_catalog[course_id])
+
+    def codes(self) -> list[str]:
+        """
+            Returns the codes of the catalog's courses, in catalog order.
+        """
+        return [self.ids.code(course_id) for course_id in self.courses.tolist()]
+
+    def csr(self, relation: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+            Returns the read-only indptr and indices arrays of a relation. Raises a ValueError if the relation does
+            not exist.
+        """
+        if relation not in self._indptr:
+            raise ValueError
+        return self._indptr[relation], self._indices[relation]
+
+    def related_ids(self, relation: str, course_id: int) -> np.ndarray:
+        """
+            Returns a read-only view of the IDs of the courses related to the course with the given ID. Raises a
+            ValueError if the relation does not exist.
+        """
+        indptr, indices = self.csr(relation)
+        if course_id + 1 >= len(indptr):
+            return indices[:0]
+        return indices[indptr[course_id]:indptr[course_id + 1]]
+
+    def related(self, relation: str, code: str) -> list[str]:
+        """
+            Returns the codes of the courses related to the given course, such as its prerequisites. Raises a
+            ValueError if the relation does not exist.
+        """
+        course_id = self.ids.get(code)
+        if course_id is None:
+            self.csr(relation)
+            return []
+        return [self.ids.code(related_id) for related_id in self.related_ids(relation, course_id).tolist()]
+
+    def edges(self, relation: str) -> np.ndarray:
+        """
+            Returns an E by 2 array of the relation's edges as (related course ID, course ID) pairs, so that for
+            prerequisites every edge points from a prerequisite to the course that requires it, as in the graph
+            drawn by main.Program. Raises a ValueError if the relation does not exist.
+        """
+        indptr, indices = self.csr(relation)
+        targets = np.repeat(np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr))
+        return np.column_stack((indices, targets))
+
+    def edge_codes(self, relation: str) -> Iterator[tuple[str, str]]:
+        """
+            Yields the relation's edges as (related course code, course code) pairs, in the same order as edges.
+        """
+        code = self.ids.code
+        for source, target in self.edges(relation).tolist():
+            yield code(source), code(target)
+
+    def to_networkx(self, relation: str = 'prerequisites', graph: Optional['nx.DiGraph'] = None) -> 'nx.DiGraph':
+        """
+            Adds the catalog's courses and the relation's edges (see edges) to graph, or to a new directed graph if
+            graph is None, and returns the graph. Courses are named by their codes.
+        """
+        if graph is None:
+            import networkx as nx
+            graph = nx.DiGraph()
+        graph.add_nodes_from(self.codes())
+        graph.add_edges_from(self.edge_codes(relation))
+        return graph
+
+    def save(self, file_name: str) -> None:
+        """
+            Saves the store's arrays and the codes of its IDs to a .npz file. The .npz extension is added to
+            file_name if it does not have it, as load adds it.
+        """
+        file_name = _npz_file_name(file_name)
+        arrays = {f'{relation}_{part}': array for relation in RELATIONS
+                  for part, array in (('indptr', self._indptr[relation]), ('indices', self._indices[relation]))}
+        np.savez(file_name, codes=np.array([self.ids.code(course_id) for course_id in range(len(self.breadth))]),
+                 courses=self.courses, breadth=self.breadth, **arrays)
+
+    @classmethod
+    def load(cls, file_name: str, ids: CourseIds = COURSE_IDS) -> 'CatalogStore':
+        """
+            Loads a store saved with save. Its codes are interned into ids, and its arrays are remapped to the IDs the
+            codes have in ids if those differ from the IDs they were saved with. The .npz extension is added to
+            file_name if it does not have it, as save adds it.
+        """
+        with np.load(_npz_file_name(file_name)) as data:
+            saved_ids = np.array([ids.intern(code) for code in data['codes'].tolist()], dtype=np.int32)
+            remap = not np.array_equal(saved_ids, np.arange(len(saved_ids)))
+            store = cls.__new__(cls)
+            store.ids = ids
+            store.courses = saved_ids[data['courses']] if remap else data['courses']
+            size = len(ids) if remap else len(saved_ids)
+            store.in_catalog = np.zeros(size, dtype=bool)
+            store.in_catalog[store.courses] = True
+            store.breadth = np.zeros(size, dtype=np.int8)
+            store.breadth[saved_ids] = data['breadth']
+            store._indptr = {}
+            store._indices = {}
+            for relation in RELATIONS:
+                indptr, indices = data[f'{relation}_indptr'], data[f'{relation}_indices']
+                if remap:
+                    indptr, indices = _remap_csr(indptr, indices, saved_ids, size)
+                store._indptr[relation] = indptr
+                store._indices[relation] = indices
+        store._freeze()
+        return store
+
+
+def _npz_file_name(file_name: str) -> str:
+    """
+        Returns file_name with the .npz extension numpy.savez gives it.
+    """
+    return file_name if file_name.endswith('.npz') else file_name + '.npz'
+
+
+def _remap_csr(indptr: np.ndarray, indices: np.ndarray, new_ids: np.ndarray, size: int) \
+        -> tuple[np.ndarray, np.ndarray]:
+    """
+        Returns the CSR arrays of a relation whose course with ID i is renumbered to new_ids[i], with size rows.
+    """
+    counts = np.diff(indptr)
+    order = np.argsort(new_ids, kind='stable')
+    new_counts = np.zeros(size + 1, dtype=np.int64)
+    new_counts[new_ids + 1] = counts
+    rows = [indices[indptr[old]:indptr[old + 1]] for old in order.tolist()]
+    new_indices = new_ids[np.concatenate(rows)] if rows else indices
+    return np.cumsum(new_counts), new_indices.astype(np.int32)
@@ -0,0 +1,181 @@
+"""
+    Cohort Eligibility
+
+    This module checks many students at once. A cohort stores a students by course IDs boolean NumPy matrix of
+    completed courses (the columns are the IDs in course_ids.COURSE_IDS), so that checking every student against a
+    list of courses, programs or focuses takes one vectorized pass per requirement instead of one Python level call
+    per student. Each function returns the same answers as the single student function in main with the same name.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+
+import core_classes as cc
+import program_rules
+import requisite_expressions
+from course_ids import COURSE_IDS, CourseIds
+from equivalence_groups import EQUIVALENCE_GROUPS
+
+
+@dataclass
+class Cohort:
+    """
+        A group of students and their completed courses.
+
+        Instance Attributes:
+        - students: The students in the cohort, in row order.
+        - completion: A boolean matrix where completion[i, j] is True if students[i] has completed the course with
+          ID j in course_ids.COURSE_IDS.
+
+        Representation Invariants:
+        - self.completion.shape[0] == len(self.students)
+    """
+    students: list[cc.Student]
+    completion: np.ndarray
+
+    def widen(self, ids: CourseIds = COURSE_IDS) -> np.ndarray:
+        """
+            Pads the completion matrix with empty columns for course IDs interned since it was created, so it can be
+            indexed by every ID in ids, and returns it.
+        """
+        missing = len(ids) - self.completion.shape[1]
+        if missing > 0:
+            self.completion = np.pad(self.completion, ((0, 0), (0, missing)))
+        return self.completion
+
+
+def create_cohort(students: list[cc.Student]) -> Cohort:
+    """
+        Creates a cohort from a list of students, building its completion matrix from their student indexes.
+    """
+    rows, columns = [], []
+    for row, student in enumerate(students):
+        for course_id in CourseIds.id_list(student.index.completed):
+            rows.append(row)
+            columns.append(course_id)
+    completion = np.zeros((len(students), len(COURSE_IDS)), dtype=bool)
+    completion[rows, columns] = True
+    return Cohort(students, completion)
+
+
+def stem_masks(ids: CourseIds = COURSE_IDS) -> dict[str, int]:
+    """
+        Returns a dictionary mapping the first 6 characters of every course code in ids (the code without its campus
+        suffix) to the bitmask of the courses with that stem.
+    """
+    stems = {}
+    for course_id in range(len(ids)):
+        code = ids.code(course_id)
+        stems[code[:6]] = stems.get(code[:6], 0) | (1 << course_id)
+    return stems
+
+
+def compile_course_clauses(course: cc.Course, ids: CourseIds = COURSE_IDS, stems: Optional[dict[str, int]] = None) \
+        -> list[tuple[int, list[int]]]:
+    """
+        Compiles the prerequisites of a course into clauses that must all be met. Each clause is a pair of a stem
+        mask, any course of which meets the clause, and a list of option masks, all courses of which meet the clause.
+        Only prerequisites that check_eligibility_course enforces produce a clause.
+
+        A course with a prerequisite expression compiles to the clauses of the expression (see
+        requisite_expressions.compile_expression), which have the same form, with every course widened to the
+        courses of its stem the way check_eligibility_course matches them. stems, if given, is the result of
+        stem_masks(ids), so that compiling every course of a catalog does not rebuild it once per course.
+    """
+    if stems is None:
+        stems = stem_masks(ids)
+    if course.prerequisite_expression != '':
+        return [_widen_clause(single, options, ids, stems)
+                for single, options in requisite_expressions.compile_expression(course.prerequisite_expression)]
+    clauses = []
+    for prerequisite in course.prerequisites:
+        group_id = EQUIVALENCE_GROUPS.group_id(prerequisite)
+        if prerequisite != '' and group_id is not None:
+            clauses.append((stems.get(prerequisite[:6], 0), list(EQUIVALENCE_GROUPS.option_masks(group_id))))
+    return clauses
+
+
+def _widen_clause(single: int, options: tuple[int, ...], ids: CourseIds, stems: dict[str, int]) \
+        -> tuple[int, list[int]]:
+    """
+        Returns an expression clause in which any course with the same stem as a course of the clause can take its
+        place: the single course mask gains every course of their stems, and each option mask is replaced by one
+        option for every choice of a course of each of its courses' stems.
+    """
+    def stem_of(course_id: int) -> int:
+        return stems.get(ids.code(course_id)[:6], 0) | (1 << course_id)
+
+    widened = 0
+    for course_id in CourseIds.id_list(single):
+        widened |= stem_of(course_id)
+    widened_options = []
+    for option in options:
+        choices = [0]
+        for course_id in CourseIds.id_list(option):
+            choices = [choice | (1 << other) for choice in choices for other in CourseIds.id_list(stem_of(course_id))]
+        widened_options.extend(choice for choice in choices if choice not in widened_options)
+    return widened, widened_options
+
+
+def check_eligibility_courses(courses: list[str], cohort: Cohort, course_data: dict[str, cc.Course]) -> np.ndarray:
+    """
+        Returns a students by courses boolean matrix where entry [i, j] is True if the i-th student of the cohort is
+        eligible to take courses[j]. Raises a ValueError if a course is not in course_data.
+    """
+    if any(course not in course_data for course in courses):
+        raise ValueError
+    stems = stem_masks()
+    compiled = [compile_course_clauses(course_data[course], stems=stems) for course in courses]
+    completion = cohort.widen()
+    eligible = np.ones((len(cohort.students), len(courses)), dtype=bool)
+    for column, clauses in enumerate(compiled):
+        for stem_mask, options in clauses:
+            met = completion[:, CourseIds.id_list(stem_mask)].any(axis=1)
+            for option in options:
+                met |= completion[:, CourseIds.id_list(option)].all(axis=1)
+            eligible[:, column] &= met
+    return eligible
+
+
+def check_eligibility_programs(degrees: list[str], cohort: Cohort) -> np.ndarray:
+    """
+        Returns a students by degrees boolean matrix where entry [i, j] is True if the i-th student of the cohort has
+        completed the computer science program of type degrees[j].
+
+        Preconditions:
+        - all(degree in {'major', 'specialist'} for degree in degrees)
+    """
+    return _check_rule_sets([program_rules.PROGRAM_RULES[('computer science', degree)] for degree in degrees],
+                            cohort)
+
+
+def check_eligibility_focuses(focuses: list[str], cohort: Cohort) -> np.ndarray:
+    """
+        Returns a students by focuses boolean matrix where entry [i, j] is True if the i-th student of the cohort has
+        completed the requirements of focuses[j]. Raises a ValueError if a focus does not exist.
+    """
+    if any(focus not in program_rules.FOCUS_RULES for focus in focuses):
+        raise ValueError
+    return _check_rule_sets([program_rules.FOCUS_RULES[focus] for focus in focuses], cohort)
+
+
+def _check_rule_sets(rule_sets: list[program_rules.RuleSet], cohort: Cohort) -> np.ndarray:
+    """
+        Returns a students by rule sets boolean matrix of which students meet which rule sets.
+    """
+    completion = cohort.widen()
+    eligible = np.ones((len(cohort.students), len(rule_sets)), dtype=bool)
+    for column, rule_set in enumerate(rule_sets):
+        eligible[:, column] = rule_set.is_met_many(completion)
+    return eligible
+
+
+def get_FCE_counts(cohort: Cohort) -> np.ndarray:
+    """
+        Returns a vector of the total number of full course equivalents(FCE's) obtained by each student of the cohort.
+        Like get_FCE_count in main, every record counts, so a retaken course counts every time it was taken; the
+        completion matrix only records that it was completed, so the counts are read from the students' indexes.
+    """
+    return np.fromiter((student.index.fce for student in cohort.students), dtype=float, count=len(cohort.students))
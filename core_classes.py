@@ -2,7 +2,11 @@
     This module includes data classes that are used by other classes in the project.
     This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
 """
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional, Union
+
+from course_ids import COURSE_IDS
 
 
 @dataclass
@@ -18,6 +22,9 @@ class Course:
         - corequisite: A list of courses that are to be taken simultaneously with this course.
         - exclusion: A list of courses that a student is excluded from taking due to similarities in course content.
         - breadth_requirements: An number representing the breadth requirement that this course satisfies.
+        - prerequisite_expression: The AND/OR structure of the prerequisites, as the canonical text of a
+          requisite_expressions tree, or '' if it is unknown or there are no prerequisites.
+        - corequisite_expression: The AND/OR structure of the corequisites, in the same form.
 
         Representation Invariants:
         - self.course_code != ''
@@ -32,6 +39,8 @@ class Course:
     corequisite: list[str]
     exclusion: list[str]
     breadth_requirements: int
+    prerequisite_expression: str = ''
+    corequisite_expression: str = ''
 
 
 @dataclass
@@ -53,6 +62,244 @@ class Record:
     weight: float
 
 
+_CODE_TUPLES: dict[tuple[str, ...], tuple[str, ...]] = {}
+_WEIGHTS = {0.5: 0.5, 1.0: 1.0}
+
+
+def intern_codes(codes: Iterable[str]) -> tuple[str, ...]:
+    """
+        Returns the course codes as a tuple of interned strings, skipping empty codes. Equal tuples are shared, so
+        courses with the same relations store them only once.
+    """
+    codes = tuple(sys.intern(code) for code in codes if code != '')
+    return _CODE_TUPLES.setdefault(codes, codes)
+
+
+@dataclass(frozen=True, slots=True)
+class CompactCourse:
+    """
+        A memory compact, immutable variant of Course with the same attributes, for keeping large catalogs
+        resident. It has no per-instance dictionary, its course code is interned, and its relations are interned
+        tuples of interned course codes shared with every other course that has the same relation (see
+        intern_codes). It can be used anywhere a Course is only read.
+
+        Instance Attributes:
+        - course_code: A string of characters representing the course code.
+        - course_description: A description of the course
+        - prerequisites: The courses that must be completed before taking this course.
+        - recommended: The other recommended courses to take.
+        - corequisite: The courses that are to be taken simultaneously with this course.
+        - exclusion: The courses that a student is excluded from taking due to similarities in course content.
+        - breadth_requirements: An number representing the breadth requirement that this course satisfies.
+        - prerequisite_expression: The AND/OR structure of the prerequisites (see Course).
+        - corequisite_expression: The AND/OR structure of the corequisites (see Course).
+
+        Representation Invariants:
+        - self.course_code != ''
+        - '' not in self.prerequisites + self.recommended + self.corequisite + self.exclusion
+    """
+    course_code: str
+    course_title: str
+    course_description: str
+    prerequisites: tuple[str, ...]
+    recommended: tuple[str, ...]
+    corequisite: tuple[str, ...]
+    exclusion: tuple[str, ...]
+    breadth_requirements: int
+    prerequisite_expression: str = ''
+    corequisite_expression: str = ''
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, 'course_code', sys.intern(self.course_code))
+        object.__setattr__(self, 'prerequisite_expression', sys.intern(self.prerequisite_expression))
+        object.__setattr__(self, 'corequisite_expression', sys.intern(self.corequisite_expression))
+        for relation in ('prerequisites', 'recommended', 'corequisite', 'exclusion'):
+            object.__setattr__(self, relation, intern_codes(getattr(self, relation)))
+
+    @classmethod
+    def from_course(cls, course: Union[Course, 'CompactCourse']) -> 'CompactCourse':
+        """
+            Returns the compact variant of a course, or the course itself if it is already compact.
+        """
+        if isinstance(course, CompactCourse):
+            return course
+        return cls(course.course_code, course.course_title, course.course_description, course.prerequisites,
+                   course.recommended, course.corequisite, course.exclusion, course.breadth_requirements,
+                   course.prerequisite_expression, course.corequisite_expression)
+
+
+@dataclass(frozen=True, slots=True)
+class CompactRecord:
+    """
+        A memory compact, immutable variant of Record with the same attributes. It has no per-instance dictionary,
+        and the usual weights are shared float objects. It can be used anywhere a Record is only read.
+
+        Instance Attributes:
+        - course_taken: A course that the student has completed.
+        - grade: The grade that the student has received for the course taken.
+        - weight: The weight of the course, worth either 0.5 or 1.0 credits.
+
+        Representation Invariants:
+        - 0 <= self.grade <= 100
+        - self.weight == (0.5 or 1.0)
+    """
+    course_taken: Union[Course, CompactCourse]
+    grade: int
+    weight: float
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, 'weight', _WEIGHTS.get(self.weight, self.weight))
+
+    @classmethod
+    def from_record(cls, record: Union[Record, 'CompactRecord'],
+                    catalog: Optional[dict[str, CompactCourse]] = None) -> 'CompactRecord':
+        """
+            Returns the compact variant of a record, or the record itself if it is already compact. Its course is
+            the course with the same code in catalog if there is one, so that records share the catalog's course
+            objects, and a compact variant of its course otherwise.
+        """
+        if isinstance(record, CompactRecord):
+            return record
+        course = record.course_taken
+        if catalog is not None and course.course_code in catalog:
+            course = catalog[course.course_code]
+        return cls(CompactCourse.from_course(course), record.grade, record.weight)
+
+
+def compact_courses(courses: Iterable[Union[Course, CompactCourse]]) -> list[CompactCourse]:
+    """
+        Returns the compact variants of the courses, in the same order.
+    """
+    return [CompactCourse.from_course(course) for course in courses]
+
+
+class RecordList(list):
+    """
+        A list of academic records that counts how many times it has been modified, so that indexes built from it
+        can tell when they are out of date.
+
+        Instance Attributes:
+        - version: The number of modifications made to the list so far.
+    """
+    version: int = 0
+
+    def _modified(self) -> None:
+        self.version += 1
+
+    def append(self, record: Record) -> None:
+        super().append(record)
+        self._modified()
+
+    def extend(self, records: Any) -> None:
+        super().extend(records)
+        self._modified()
+
+    def insert(self, position: Any, record: Record) -> None:
+        super().insert(position, record)
+        self._modified()
+
+    def remove(self, record: Record) -> None:
+        super().remove(record)
+        self._modified()
+
+    def pop(self, *args: Any) -> Record:
+        record = super().pop(*args)
+        self._modified()
+        return record
+
+    def clear(self) -> None:
+        super().clear()
+        self._modified()
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        super().sort(*args, **kwargs)
+        self._modified()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._modified()
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        super().__setitem__(key, value)
+        self._modified()
+
+    def __delitem__(self, key: Any) -> None:
+        super().__delitem__(key)
+        self._modified()
+
+    def __iadd__(self, records: Any) -> 'RecordList':
+        super().__iadd__(records)
+        self._modified()
+        return self
+
+    def __imul__(self, times: Any) -> 'RecordList':
+        super().__imul__(times)
+        self._modified()
+        return self
+
+
+class StudentIndex:
+    """
+        Lookup structures built from a student's academic history, kept up to date as records are added.
+
+        If the academic history is a RecordList, the index tells whether it is up to date from the list's version;
+        otherwise it keeps the records it has indexed, and compares them with the academic history.
+
+        Instance Attributes:
+        - records: A dictionary mapping each completed course code to the student's record for that course.
+        - stems: The first 6 characters of each completed course code (the code without its campus suffix).
+        - fce: The total number of full course equivalents(FCE's) in the academic history.
+        - completed: A bitmask over course_ids.COURSE_IDS of the completed courses.
+        - history: The academic history the index was built from.
+        - version: The version of history the index is up to date with, if history is a RecordList.
+    """
+    records: dict[str, Record]
+    stems: set[str]
+    fce: float
+    completed: int
+    history: list[Record]
+    version: int
+    _indexed: Optional[list[Record]]
+
+    def __init__(self, history: list[Record]) -> None:
+        self.records = {}
+        self.stems = set()
+        self.fce = 0
+        self.completed = 0
+        self.history = history
+        self.version = 0
+        self._indexed = None if isinstance(history, RecordList) else []
+        for record in history:
+            self.add(record)
+
+    def add(self, record: Record) -> None:
+        """
+            Adds a record that was appended to the academic history to the index.
+        """
+        code = record.course_taken.course_code
+        self.records[code] = record
+        self.stems.add(code[:6])
+        if len(code) > 6 and code[6] == 'H':
+            self.fce += 0.5
+        else:
+            self.fce += 1
+        self.completed |= 1 << COURSE_IDS.intern(code)
+        if self._indexed is None:
+            self.version = self.history.version
+        else:
+            self._indexed.append(record)
+
+    def is_current(self, history: list[Record]) -> bool:
+        """
+            Returns whether the index is up to date with the given academic history.
+        """
+        if self.history is not history:
+            return False
+        elif self._indexed is None:
+            return self.version == history.version
+        return history == self._indexed
+
+
 @dataclass
 class Student:
     """
@@ -62,7 +309,8 @@ class Student:
         - student_number: A 10-digit number that serves as the student's unique identifier.
         - student_name: The student's full name.
         - academic_history: A list of all the student's academic records, each consisting of a course and
-        their corresponding information.
+        their corresponding information. The student keeps the list it is given, so changes made to it through
+        other references are seen by the student; a RecordList makes checking the student's index cheaper.
 
         Representation Invariants:
         - len(self.student_number) == 10
@@ -71,3 +319,24 @@ class Student:
     student_number: int
     student_name: str
     academic_history: list[Record]
+    _index: Optional[StudentIndex] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def index(self) -> StudentIndex:
+        """
+            The lookup structures of the student's academic history. The index is rebuilt only when the academic
+            history was modified other than through add_record.
+        """
+        if self._index is None or not self._index.is_current(self.academic_history):
+            self._index = StudentIndex(self.academic_history)
+        return self._index
+
+    def add_record(self, record: Record) -> None:
+        """
+            Appends a record to the student's academic history, updating the index in place if it is up to date.
+        """
+        index = self._index
+        current = index is not None and index.is_current(self.academic_history)
+        self.academic_history.append(record)
+        if current:
+            index.add(record)
@@ -0,0 +1,117 @@
+"""
+    Course Graph
+
+    This module builds the prerequisite graph of a catalog (see main.Program.create_graph) once, and colours it for
+    any number of students. The nodes and edges of the graph only depend on the catalog; only the red and green
+    colours of the edges depend on the student. A CourseGraph therefore keeps the graph's structure with a fixed
+    order of its edges, and compiles the colouring rule of every edge (see main.edge_rules) into bitmasks over edge
+    positions: one for each prerequisite whose passing grade makes edges green, and one for each equivalence group
+    whose completion does. A student's colours are then the union of the bitmasks of their passed courses and
+    completed groups, instead of a new graph and a new maximum flow check per edge for each student.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+from typing import Optional, TYPE_CHECKING
+
+import core_classes as cc
+import main
+from equivalence_groups import EQUIVALENCE_GROUPS
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+
+class CourseGraph:
+    """
+        The prerequisite graph of a catalog, built once, and the colours of its edges for any student.
+
+        Instance Attributes:
+        - courses: A dictionary mapping course code to Course object.
+        - g: The graph's structure, without edge colours. It is shared and must not be modified.
+        - edges: The (prerequisite, course) edges of the graph in the order of g.edges, which is the order of every
+          colour vector.
+
+        Representation Invariants:
+        - self.edges == list(self.g.edges)
+    """
+    courses: dict[str, cc.Course]
+    g: 'nx.DiGraph'
+    edges: list[tuple[str, str]]
+    _course_edges: dict[str, int]
+    _group_edges: dict[int, int]
+
+    def __init__(self, courses: dict[str, cc.Course]) -> None:
+        """
+            Builds the graph's structure and compiles the colouring rule of every edge.
+        """
+        import networkx as nx
+
+        self.courses = courses
+        self.g = nx.DiGraph()
+        main.Program(courses, cc.Student('0000000000', 'Structure', [])).create_graph(self.g)
+        for _, _, data in self.g.edges(data=True):
+            del data['color']
+        self.edges = list(self.g.edges)
+        rules = main.edge_rules(courses, self.g)
+        self._course_edges = {}
+        self._group_edges = {}
+        for position, (source, target) in enumerate(self.edges):
+            prerequisite, group_id = rules[(target, source)]
+            self._course_edges[prerequisite] = self._course_edges.get(prerequisite, 0) | (1 << position)
+            if group_id is not None:
+                self._group_edges[group_id] = self._group_edges.get(group_id, 0) | (1 << position)
+
+    def green_edges(self, student: cc.Student) -> int:
+        """
+            Returns the bitmask over edge positions of the student's green edges, the edges whose prerequisites the
+            student fulfilled.
+        """
+        green = 0
+        for code, record in student.index.records.items():
+            if record.grade >= 50.0 and code in self._course_edges:
+                green |= self._course_edges[code]
+        satisfied = EQUIVALENCE_GROUPS.satisfied_mask(student.index.completed)
+        for group_id, edges in self._group_edges.items():
+            if satisfied >> group_id & 1:
+                green |= edges
+        return green
+
+    def colors(self, student: cc.Student) -> list[str]:
+        """
+            Returns the colours of the student's edges in the order of self.edges: 'g' for fulfilled prerequisites
+            and 'r' for unfulfilled ones, the same colours main.get_edges gives them.
+        """
+        bits = bin(self.green_edges(student))[2:].zfill(len(self.edges))
+        return ['g' if bit == '1' else 'r' for bit in reversed(bits)]
+
+    def graph(self, student: cc.Student) -> 'nx.DiGraph':
+        """
+            Returns a copy of the graph with the student's edge colours, the same graph main.Program.create_graph
+            builds for the student.
+        """
+        g = self.g.copy()
+        for (source, target), color in zip(self.edges, self.colors(student)):
+            g[source][target]['color'] = color
+        return g
+
+
+_CACHED_GRAPH: Optional[CourseGraph] = None
+
+
+def cached_graph(courses: dict[str, cc.Course]) -> CourseGraph:
+    """
+        Returns the CourseGraph of the catalog, building it only if the last catalog asked for was a different
+        dictionary. A catalog changed in place must be rebuilt with clear_cache first.
+    """
+    global _CACHED_GRAPH
+    if _CACHED_GRAPH is None or _CACHED_GRAPH.courses is not courses:
+        _CACHED_GRAPH = CourseGraph(courses)
+    return _CACHED_GRAPH
+
+
+def clear_cache() -> None:
+    """
+        Forgets the cached CourseGraph.
+    """
+    global _CACHED_GRAPH
+    _CACHED_GRAPH = None
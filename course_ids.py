@@ -0,0 +1,117 @@
+"""
+    Course ID Table
+
+    This module interns course codes into small integer IDs so that sets of courses can be stored and compared as
+    integer bitmasks (bit i is set when the course with ID i is in the set). Every compiled structure in the project
+    (requirement rules, student indexes, prerequisite closures) shares the module level COURSE_IDS table so that their
+    masks can be combined directly.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+from typing import Callable, Iterable, Optional
+
+
+class CourseIds:
+    """
+        A table assigning a dense integer ID to every course code that has been seen.
+
+        Instance Attributes:
+        - half_mask: A bitmask of every interned half credit (H) course.
+        - full_mask: A bitmask of every interned full credit (Y) course.
+
+        Representation Invariants:
+        - self.half_mask & self.full_mask == 0
+    """
+    half_mask: int
+    full_mask: int
+    _ids: dict[str, int]
+    _codes: list[str]
+    _watchers: list[Callable[[str, int], None]]
+
+    def __init__(self) -> None:
+        self.half_mask = 0
+        self.full_mask = 0
+        self._ids = {}
+        self._codes = []
+        self._watchers = []
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._ids
+
+    def intern(self, code: str) -> int:
+        """
+            Returns the ID of the given course code, assigning the next free ID if the code has not been seen before.
+        """
+        course_id = self._ids.get(code)
+        if course_id is None:
+            course_id = len(self._codes)
+            self._ids[code] = course_id
+            self._codes.append(code)
+            if len(code) > 6 and code[6] == 'H':
+                self.half_mask |= 1 << course_id
+            else:
+                self.full_mask |= 1 << course_id
+            for watcher in self._watchers:
+                watcher(code, course_id)
+        return course_id
+
+    def get(self, code: str) -> Optional[int]:
+        """
+            Returns the ID of the given course code without interning it, or None if the code has not been seen.
+        """
+        return self._ids.get(code)
+
+    def code(self, course_id: int) -> str:
+        """
+            Returns the course code with the given ID.
+        """
+        return self._codes[course_id]
+
+    def mask(self, codes: Iterable[str]) -> int:
+        """
+            Returns the bitmask of the given course codes, interning any codes that have not been seen.
+        """
+        mask = 0
+        for code in codes:
+            mask |= 1 << self.intern(code)
+        return mask
+
+    def codes(self, mask: int) -> list[str]:
+        """
+            Returns the course codes in the given bitmask in ID order.
+        """
+        return [self._codes[course_id] for course_id in self.id_list(mask)]
+
+    @staticmethod
+    def id_list(mask: int) -> list[int]:
+        """
+            Returns the course IDs in the given bitmask in increasing order.
+        """
+        course_ids = []
+        while mask:
+            low_bit = mask & -mask
+            course_ids.append(low_bit.bit_length() - 1)
+            mask ^= low_bit
+        return course_ids
+
+    def credits(self, mask: int) -> float:
+        """
+            Returns the number of full course equivalents in the given bitmask. Half credit (H) courses are worth 0.5
+            and every other course is worth 1.0.
+        """
+        return (mask & self.half_mask).bit_count() * 0.5 + (mask & self.full_mask).bit_count()
+
+    def watch(self, watcher: Callable[[str, int], None]) -> None:
+        """
+            Registers a function that is called with the code and ID of every course interned from now on, and
+            immediately calls it for every course that has already been interned.
+        """
+        self._watchers.append(watcher)
+        for course_id, code in enumerate(self._codes):
+            watcher(code, course_id)
+
+
+COURSE_IDS = CourseIds()
@@ -0,0 +1,640 @@
+"""
+    Course Planner
+
+    This module plans a route through a program or focus: given a student's completed courses, it finds a term by
+    term sequence of courses that meets every requirement of the program or focus, with the fewest terms or the
+    fewest credits. Every course in the plan has its prerequisites completed in an earlier term and its
+    corequisites completed in an earlier term or the same one, no course is taken once a course it excludes is
+    completed, and no term has more credits than the per term credit cap.
+
+    Plans are searched for in two levels, both over completion bitmasks of course_ids.COURSE_IDS:
+
+    - A branch and bound search chooses the set of courses to take. Starting from the student's completed courses,
+      it picks the unmet obligation with the fewest ways of meeting it (a prerequisite or corequisite of a chosen
+      course, or a requirement of the program) and branches on each of its ways, those with the best lower bounds
+      first. Sets of chosen courses that were already searched are skipped, and a branch is cut as soon as its
+      lower bound on terms and credits is no better than the best plan found. The bounds add up the credits of
+      obligations that share no courses, with the prerequisites their courses need in turn, and the terms that the
+      prerequisite chains of the chosen courses take.
+    - Each complete set of courses is packed into the fewest terms by an iterative deepening depth first search over
+      the sets of courses completed after each term, which remembers the sets that were found not to fit in the
+      terms left. Only terms that cannot fit another available course are tried, since taking a course earlier
+      never makes the rest of the plan longer.
+
+    Prerequisites are the ones check_eligibility_course enforces (see cohort.compile_course_clauses). Corequisites
+    are read from a course's corequisite expression, or, when it has none, as one of its listed corequisites. A
+    course cannot be taken once a course it lists as an exclusion is completed, or in the same term, so a course
+    that excludes a later course of the plan is taken before it. Courses that are not in the catalog are only
+    planned for requirements the catalog's courses cannot meet, and can be taken in any term, since their
+    prerequisites are unknown.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import functools
+import math
+import operator
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import cohort
+import core_classes as cc
+import program_rules
+import requisite_expressions
+from course_ids import COURSE_IDS, CourseIds
+
+DEFAULT_CREDIT_CAP = 2.5
+MAX_PLAN_TERMS = 12
+PLAN_OBJECTIVES = ('terms', 'credits')
+
+Clause = tuple[int, tuple[int, ...]]
+
+
+@dataclass(frozen=True)
+class CoursePlan:
+    """
+        A plan of courses to take, term by term.
+
+        Instance Attributes:
+        - terms: The course codes to take in each term, in order.
+        - credits: The total number of credits of the courses in the plan.
+
+        Representation Invariants:
+        - all(term != () for term in self.terms)
+    """
+    terms: tuple[tuple[str, ...], ...]
+    credits: float
+
+
+class CoursePlanner:
+    """
+        Plans routes through programs and focuses for any student, from one catalog.
+
+        Instance Attributes:
+        - courses: A dictionary mapping course code to Course object.
+        - ids: The code to ID table the planner's bitmasks are over.
+    """
+    courses: dict[str, cc.Course]
+    ids: CourseIds
+    _prerequisites: dict[int, tuple[Clause, ...]]
+    _corequisites: dict[int, tuple[Clause, ...]]
+    _exclusions: dict[int, int]
+    _excluded_by: dict[int, int]
+
+    def __init__(self, courses: dict[str, cc.Course], ids: CourseIds = COURSE_IDS) -> None:
+        """
+            Compiles the prerequisites, corequisites and exclusions of every course of the catalog into bitmasks.
+        """
+        self.courses = courses
+        self.ids = ids
+        self._prerequisites = {}
+        self._corequisites = {}
+        self._exclusions = {}
+        self._excluded_by = {}
+        for code in courses:
+            ids.intern(code)
+        stems = cohort.stem_masks(ids)
+        for code, course in courses.items():
+            course_id = ids.intern(code)
+            self._prerequisites[course_id] = tuple(dict.fromkeys(
+                (single, tuple(options)) for single, options in cohort.compile_course_clauses(course, ids, stems)))
+            if course.corequisite_expression != '':
+                self._corequisites[course_id] = requisite_expressions.compile_expression(
+                    course.corequisite_expression)
+            elif any(corequisite != '' for corequisite in course.corequisite):
+                self._corequisites[course_id] = ((ids.mask(code for code in course.corequisite if code != ''), ()),)
+            excluded = ids.mask(code for code in course.exclusion if code != '')
+            if excluded:
+                self._exclusions[course_id] = excluded
+            for excluded_id in CourseIds.id_list(excluded):
+                self._excluded_by[excluded_id] = self._excluded_by.get(excluded_id, 0) | (1 << course_id)
+
+    def plan(self, student: cc.Student, rule_set: program_rules.RuleSet, credit_cap: float = DEFAULT_CREDIT_CAP,
+             objective: str = 'terms', max_terms: int = MAX_PLAN_TERMS, avoided: Iterable[str] = ()) \
+            -> Optional[CoursePlan]:
+        """
+            Returns a plan that takes the student from their completed courses to meeting every requirement of the
+            rule set in at most max_terms terms of at most credit_cap credits each, or None if there is no such plan.
+            With the 'terms' objective the plan has the fewest terms, and the fewest credits among those; with the
+            'credits' objective it has the fewest credits, and the fewest terms among those. Courses in avoided are
+            never planned. Raises a ValueError if the objective is not one of PLAN_OBJECTIVES.
+
+            Preconditions:
+            - credit_cap >= 1.0
+            - max_terms >= 0
+        """
+        if objective not in PLAN_OBJECTIVES:
+            raise ValueError
+        search = _PlanSearch(self, student.index.completed, rule_set, credit_cap, objective, max_terms,
+                             self.ids.mask(avoided))
+        return search.run()
+
+    def clauses(self, course_id: int) -> tuple[tuple[Clause, ...], tuple[Clause, ...]]:
+        """
+            Returns the prerequisite and corequisite clauses of the course with the given ID. Every clause must be
+            met; a clause is met by any course of its first mask, or by all courses of one of its other masks.
+        """
+        return self._prerequisites.get(course_id, ()), self._corequisites.get(course_id, ())
+
+    def exclusions(self, course_id: int) -> int:
+        """
+            Returns the bitmask of the courses the course with the given ID lists as exclusions. The course cannot be
+            taken once one of them is completed.
+        """
+        return self._exclusions.get(course_id, 0)
+
+    def excluded_by(self, course_id: int) -> int:
+        """
+            Returns the bitmask of the catalog's courses that list the course with the given ID as an exclusion, and
+            so cannot be taken after it.
+        """
+        return self._excluded_by.get(course_id, 0)
+
+
+def plan_program(student: cc.Student, program: str, degree_type: str = 'major',
+                 planner: Optional[CoursePlanner] = None, **options: object) -> Optional[CoursePlan]:
+    """
+        Returns the plan of planner (or of a planner of main.course_data if planner is None) for the student and the
+        given program or focus; options are passed on to CoursePlanner.plan. Raises a ValueError if the program
+        does not exist.
+
+        Preconditions:
+        - degree_type == 'major' or degree_type == 'specialist'
+    """
+    if planner is None:
+        import main
+
+        planner = CoursePlanner(main.course_data)
+    return planner.plan(student, program_rules.get_rule_set(program, degree_type), **options)
+
+
+def _is_met(clause: Clause, completed: int) -> bool:
+    """
+        Returns whether the completion bitmask meets the clause.
+    """
+    single, options = clause
+    return bool(completed & single) or any(completed & option == option for option in options)
+
+
+@dataclass
+class _Obligation:
+    """
+        An unmet obligation of a set of chosen courses: a prerequisite or corequisite of a chosen course, or a
+        requirement.
+
+        Instance Attributes:
+        - needed: The fewest credits of courses that meet the obligation.
+        - cost: The fewest credits of courses that meet the obligation, with the prerequisites and corequisites
+          they need.
+        - term: The earliest term by which the obligation can be met.
+        - ways: The ways of meeting the obligation, as bitmasks of courses to add to the chosen courses, best first.
+        - candidates: The bitmask of the courses of every way.
+        - reach: The bitmask of the courses of every way and of the courses they may need.
+
+        Representation Invariants:
+        - self.ways != []
+    """
+    needed: float
+    cost: float
+    term: float
+    ways: list[int]
+    candidates: int
+    reach: int
+
+
+class _PlanSearch:
+    """
+        The state of one CoursePlanner.plan search.
+
+        Instance Attributes:
+        - planner: The planner the search belongs to.
+        - completed: The student's completion bitmask.
+        - requirements: Every requirement of the rule set.
+        - credit_cap: The most credits in a term.
+        - objective: The objective, one of PLAN_OBJECTIVES.
+        - max_terms: The most terms in a plan.
+        - earliest: earliest[i] is the earliest term the course with ID i can be taken in with unlimited credits
+          per term (0 if it is completed, and math.inf if it cannot be planned).
+        - plannable: The IDs of the courses that can be planned and are not completed, by earliest term.
+        - requisites: requisites[i] lists, for every prerequisite and corequisite clause of the course with ID i,
+          the IDs of the courses of each of its ways.
+        - conflicts: conflicts[i] is the bitmask of the courses that exclude the course with ID i and that it
+          excludes, which can never be planned together with it.
+        - ancestors: ancestors[i] is the bitmask of every course the course with ID i may need, directly or not.
+        - closures: The lower bounds of _closure_credits, by course ID and the completed courses it may need.
+        - symmetry: symmetry[i] is the same for two courses if swapping them changes nothing about the search:
+          they have the same credits, clauses, exclusions and roles in the requirements and in other courses'
+          clauses. Only the first of interchangeable courses is branched on.
+        - best: The score, chosen courses and terms of the best plan found so far, or None.
+        - searched: The sets of chosen courses already searched.
+    """
+    planner: CoursePlanner
+    completed: int
+    requirements: list[program_rules.CompiledRequirement]
+    credit_cap: float
+    objective: str
+    max_terms: int
+    earliest: list[float]
+    plannable: list[int]
+    requisites: dict[int, list[tuple[tuple[int, ...], ...]]]
+    conflicts: dict[int, int]
+    ancestors: dict[int, int]
+    closures: dict[tuple[int, int], float]
+    symmetry: dict[int, tuple]
+    best: Optional[tuple[tuple[float, float], int, list[int]]]
+    searched: set[int]
+
+    def __init__(self, planner: CoursePlanner, completed: int, rule_set: program_rules.RuleSet, credit_cap: float,
+                 objective: str, max_terms: int, avoided: int) -> None:
+        self.planner = planner
+        self.completed = completed
+        self.requirements = [requirement for _, stage in rule_set.stages for requirement in stage]
+        self.credit_cap = credit_cap
+        self.objective = objective
+        self.max_terms = max_terms
+        self.earliest = self._earliest_terms(avoided)
+        self.plannable = sorted((course_id for course_id, term in enumerate(self.earliest) if 0 < term < math.inf),
+                                key=self.earliest.__getitem__)
+        self.requisites = {course_id: list(dict.fromkeys(
+            tuple(dict.fromkeys([(option_id,) for option_id in CourseIds.id_list(single)]
+                                + [tuple(CourseIds.id_list(option)) for option in options]))
+            for single, options in sum(planner.clauses(course_id), ()))) for course_id in self.plannable}
+        self.conflicts = {course_id: planner.exclusions(course_id) & planner.excluded_by(course_id)
+                          for course_id in self.plannable}
+        self.ancestors = self._ancestors()
+        self.closures = {}
+        self.symmetry = self._symmetry_classes()
+        self.best = None
+        self.searched = set()
+
+    def run(self) -> Optional[CoursePlan]:
+        """
+            Searches for the best plan and returns it, or None if there is no plan.
+        """
+        obligations = self._obligations(0)
+        if obligations is not None:
+            self._choose(0, obligations, self._bound(0, obligations))
+        if self.best is None:
+            return None
+        ids = self.planner.ids
+        _, chosen, terms = self.best
+        return CoursePlan(tuple(tuple(ids.codes(term)) for term in terms), ids.credits(chosen))
+
+    def _earliest_terms(self, avoided: int) -> list[float]:
+        """
+            Returns the earliest term every course can be taken in, assuming any number of credits per term, by
+            relaxing the terms of the catalog's courses until none of them changes. Avoided courses and courses that
+            exclude a completed course cannot be planned, and neither can courses that are not in the catalog,
+            unless they are ways of meeting a requirement that the catalog's courses cannot meet.
+        """
+        planner = self.planner
+        catalog = [course_id for course_id in map(planner.ids.intern, planner.courses)
+                   if not (self.completed | avoided) >> course_id & 1
+                   and not planner.exclusions(course_id) & self.completed]
+        catalog_mask = planner.ids.mask(planner.courses)
+        unknown = 0
+        for requirement in self.requirements:
+            ways = requirement.ways(self.completed)
+            catalog_ways = [way for way in ways if not way & ~catalog_mask]
+            if ways and (catalog_ways == [] or planner.ids.credits(functools.reduce(operator.or_, catalog_ways))
+                         < requirement.shortfall(self.completed)):
+                unknown |= functools.reduce(operator.or_, ways) & ~catalog_mask
+        earliest = [0 if self.completed >> course_id & 1 else 1 if (unknown & ~avoided) >> course_id & 1
+                    else math.inf for course_id in range(len(planner.ids))]
+        changed = True
+        while changed:
+            changed = False
+            for course_id in catalog:
+                prerequisites, corequisites = planner.clauses(course_id)
+                term = max([1] + [1 + self._clause_term(clause, earliest) for clause in prerequisites]
+                           + [self._clause_term(clause, earliest) for clause in corequisites])
+                if term < earliest[course_id]:
+                    earliest[course_id] = term
+                    changed = True
+        return earliest
+
+    def _symmetry_classes(self) -> dict[int, tuple]:
+        """
+            Returns the class of every course that is a way of meeting a requirement or clause on its own, such that
+            courses of the same class are interchangeable in every plan.
+        """
+        planner = self.planner
+        roles = {}
+        for course_id in map(planner.ids.intern, planner.courses):
+            for kind, clauses in zip('pc', planner.clauses(course_id)):
+                for index, (single, options) in enumerate(clauses):
+                    for member, way in [(single, -1)] + [(option, position) for position, option in enumerate(options)]:
+                        for role_id in CourseIds.id_list(member):
+                            roles.setdefault(role_id, []).append((kind, course_id, index, way))
+        for index, requirement in enumerate(self.requirements):
+            for position, way in enumerate(requirement.ways(0)):
+                for role_id in CourseIds.id_list(way):
+                    roles.setdefault(role_id, []).append(('r', index, 0, -1 if way & (way - 1) == 0 else position))
+        relevant = self.completed | planner.ids.mask(planner.courses)
+        return {course_id: (planner.ids.credits(1 << course_id), planner.clauses(course_id),
+                            planner.exclusions(course_id) & relevant, planner.excluded_by(course_id) & relevant,
+                            tuple(sorted(course_roles)))
+                for course_id, course_roles in roles.items()}
+
+    @staticmethod
+    def _clause_term(clause: Clause, earliest: list[float]) -> float:
+        """
+            Returns the earliest term by which the clause can be met, given the earliest term of every course.
+        """
+        single, options = clause
+        terms = [earliest[course_id] for course_id in CourseIds.id_list(single) if course_id < len(earliest)]
+        terms.extend(max((earliest[course_id] if course_id < len(earliest) else math.inf
+                          for course_id in CourseIds.id_list(option)), default=0) for option in options)
+        return min(terms, default=math.inf)
+
+    def _ancestors(self) -> dict[int, int]:
+        """
+            Returns the bitmask of every course each course that can be planned may need, directly or through the
+            courses it needs.
+        """
+        ancestors = {course_id: 0 for course_id in self.plannable}
+        changed = True
+        while changed:
+            changed = False
+            for course_id in self.plannable:
+                mask = ancestors[course_id]
+                for ways in self.requisites[course_id]:
+                    for way in ways:
+                        for requisite_id in way:
+                            mask |= 1 << requisite_id | ancestors.get(requisite_id, 0)
+                if mask != ancestors[course_id]:
+                    ancestors[course_id] = mask
+                    changed = True
+        return ancestors
+
+    def _closure_credits(self, course_id: int, completed: int) -> float:
+        """
+            Returns a lower bound on the credits of the courses that must be added to the completed courses to take
+            the course with the given ID: its own credits, plus those of a way of meeting each of its clauses with
+            the courses that way needs in turn (infinite if it cannot be planned). The bounds are memoized by the
+            completed courses the course may need.
+        """
+        if completed >> course_id & 1:
+            return 0.0
+        if self.earliest[course_id] == math.inf:
+            return math.inf
+        key = (course_id, completed & self.ancestors[course_id])
+        if key not in self.closures:
+            self.closures[key] = self.planner.ids.credits(1 << course_id)
+            self.closures[key] += max((min(max(self._closure_credits(requisite_id, completed) for requisite_id in way)
+                                           for way in ways) for ways in self.requisites[course_id]), default=0.0)
+        return self.closures[key]
+
+    def _obligations(self, chosen: int) -> Optional[list[_Obligation]]:
+        """
+            Returns the unmet obligations of the chosen courses, or None if one of them cannot be met. The obligations
+            are the prerequisites and corequisites of the chosen courses and the requirements.
+        """
+        ids = self.planner.ids
+        completed = self.completed | chosen
+        unmet = {}
+        for course_id in CourseIds.id_list(chosen):
+            for single, options in sum(self.planner.clauses(course_id), ()):
+                if not _is_met((single, options), completed) and (single, options) not in unmet:
+                    unmet[single, options] = (0.0, [1 << option_id for option_id in CourseIds.id_list(single)]
+                                              + list(options))
+        for requirement in self.requirements:
+            if not requirement.is_met(completed):
+                unmet[requirement] = (requirement.shortfall(completed), requirement.ways(completed))
+        obligations = []
+        for shortfall, ways in unmet.values():
+            usable = self._usable(completed, ways)
+            candidates = functools.reduce(operator.or_, (way for _, _, _, way in usable), 0)
+            if not usable or ids.credits(candidates) < shortfall:
+                return None
+            needed = max(shortfall, min(credits for _, _, credits, _ in usable))
+            reach = candidates
+            for course_id in CourseIds.id_list(candidates):
+                reach |= self.ancestors.get(course_id, 0)
+            obligations.append(_Obligation(needed, max(needed, usable[0][0]), min(term for _, term, _, _ in usable),
+                                           [way for _, _, _, way in usable], candidates, reach & ~completed))
+        return obligations
+
+    def _usable(self, completed: int, ways: list[int]) -> list[tuple[float, float, float, int]]:
+        """
+            Returns the credits with the courses they need, earliest term, credits and bitmask of the courses to add
+            to the completed courses of every way that can be planned, best first, keeping only the first of
+            interchangeable courses.
+        """
+        planner = self.planner
+        usable = {}
+        classes = set()
+        for way in sorted(ways):
+            way &= ~completed
+            course_ids = CourseIds.id_list(way)
+            if way in usable or any(self.earliest[course_id] == math.inf
+                                    or self.conflicts[course_id] & (completed | way) for course_id in course_ids):
+                continue
+            if len(course_ids) == 1 and course_ids[0] in self.symmetry:
+                if self.symmetry[course_ids[0]] in classes:
+                    continue
+                classes.add(self.symmetry[course_ids[0]])
+            credits = planner.ids.credits(way)
+            usable[way] = (max([credits] + [self._closure_credits(course_id, completed) for course_id in course_ids]),
+                           max(self.earliest[course_id] for course_id in course_ids), credits, way)
+        return sorted(usable.values())
+
+    def _bound(self, chosen: int, obligations: list[_Obligation]) -> tuple[float, float]:
+        """
+            Returns a lower bound on the score of every plan that takes the chosen courses, given their unmet
+            obligations. The score is a pair of the number of terms and the number of credits, in the order of the
+            objective.
+
+            Obligations that share no courses need their credits on top of each other, so the chosen courses'
+            credits are added to those of a greedy selection of obligations whose ways share no courses, or, if it
+            is more, of obligations whose ways and the courses they may need share no courses. The chosen courses
+            that cannot be taken before a term, plus every course taken after them, need enough terms from that
+            term on.
+        """
+        ids = self.planner.ids
+        packed = [0.0, 0.0]
+        covered = [0, 0]
+        for obligation in sorted(obligations, key=lambda obligation: obligation.needed, reverse=True):
+            if not obligation.candidates & covered[0]:
+                covered[0] |= obligation.candidates
+                packed[0] += obligation.needed
+        for obligation in sorted(obligations, key=lambda obligation: obligation.cost, reverse=True):
+            if not obligation.reach & covered[1]:
+                covered[1] |= obligation.reach
+                packed[1] += obligation.cost
+        credits = ids.credits(chosen) + max(packed)
+        terms = max((obligation.term for obligation in obligations), default=0)
+        later = 0.0
+        for term, course_credits in sorted(((self.earliest[course_id], ids.credits(1 << course_id))
+                                            for course_id in CourseIds.id_list(chosen)), reverse=True):
+            later += course_credits
+            terms = max(terms, term - 1 + math.ceil(later / self.credit_cap))
+        terms = max(terms, math.ceil(credits / self.credit_cap))
+        return (terms, credits) if self.objective == 'terms' else (credits, terms)
+
+    def _choose(self, chosen: int, obligations: list[_Obligation], bound: tuple[float, float]) -> None:
+        """
+            Searches every set of courses that adds to the chosen courses, given their unmet obligations and the
+            lower bound on their score, recording the best plan found. The obligation with the fewest ways is
+            branched on, trying the ways with the best bounds first.
+        """
+        if bound[0 if self.objective == 'terms' else 1] > self.max_terms \
+                or self.best is not None and bound >= self.best[0]:
+            return
+        if obligations:
+            children = []
+            for way in min(obligations, key=lambda obligation: len(obligation.ways)).ways:
+                if chosen | way not in self.searched:
+                    self.searched.add(chosen | way)
+                    child_obligations = self._obligations(chosen | way)
+                    if child_obligations is not None:
+                        children.append((self._bound(chosen | way, child_obligations), len(children), chosen | way,
+                                         child_obligations))
+            for child_bound, _, child, child_obligations in sorted(children):
+                self._choose(child, child_obligations, child_bound)
+            return
+        credits = self.planner.ids.credits(chosen)
+        limit = self.max_terms
+        if self.best is not None and self.objective == 'terms':
+            limit = self.best[0][0] - (credits >= self.best[0][1])
+        elif self.best is not None and credits == self.best[0][0]:
+            limit = self.best[0][1] - 1
+        terms = self._schedule(chosen, limit)
+        if terms is not None:
+            score = (len(terms), credits) if self.objective == 'terms' else (credits, len(terms))
+            if self.best is None or score < self.best[0]:
+                self.best = (score, chosen, terms)
+
+    def _schedule(self, chosen: int, limit: int) -> Optional[list[int]]:
+        """
+            Returns the bitmasks of the chosen courses to take in each term, in the fewest terms, or None if they
+            cannot be taken in at most limit terms. Schedules of increasing numbers of terms are searched for depth
+            first, trying the terms that take the most courses at the head of long prerequisite chains first.
+        """
+        goal = self.completed | chosen
+        terms = self._terms_needed(self.completed, goal)
+        if terms > limit:
+            return None
+        tails = {course_id: 1 for course_id in CourseIds.id_list(chosen)}
+        changed = True
+        while changed:
+            changed = False
+            for course_id, tail in list(tails.items()):
+                for single, options in self.planner.clauses(course_id)[0]:
+                    for prerequisite_id in CourseIds.id_list(functools.reduce(operator.or_, options, single)):
+                        if tails.get(prerequisite_id, math.inf) < min(tail + 1, len(tails)):
+                            tails[prerequisite_id] = tail + 1
+                            changed = True
+        failed = {}
+        while terms <= limit:
+            schedule = self._pack(self.completed, goal, terms, tails, failed)
+            if schedule is not None:
+                return schedule
+            terms += 1
+        return None
+
+    def _pack(self, completed: int, goal: int, terms: int, tails: dict[int, int], failed: dict[int, int]) \
+            -> Optional[list[int]]:
+        """
+            Returns the bitmasks of the courses to take in each term to go from the completed courses to the goal in
+            at most the given number of terms, or None if there is no such schedule. failed maps the completion
+            bitmasks already searched to the most terms they were found not to be enough in.
+        """
+        if completed == goal:
+            return []
+        if failed.get(completed, -1) >= terms or self._terms_needed(completed, goal) > terms:
+            return None
+        for taken in sorted(self._terms(completed, goal & ~completed),
+                            key=lambda taken: -sum(tails[course_id] for course_id in CourseIds.id_list(taken))):
+            schedule = self._pack(completed | taken, goal, terms - 1, tails, failed)
+            if schedule is not None:
+                return [taken] + schedule
+        failed[completed] = terms
+        return None
+
+    def _terms_needed(self, completed: int, goal: int) -> float:
+        """
+            Returns a lower bound on the number of terms it takes to go from the completed courses to the goal.
+
+            Every remaining course has an earliest term, from the remaining courses it needs, and for a number of
+            terms, a latest term, from the chain of remaining courses that need it. The bound is the fewest terms in
+            which the remaining courses that must be taken from one term to another fit in those terms' credits.
+        """
+        pending = goal & ~completed
+        remaining = CourseIds.id_list(pending)
+        earliest = dict.fromkeys(remaining, math.inf)
+        tails = dict.fromkeys(remaining, 1)
+        required = {}
+        for course_id in remaining:
+            required[course_id] = self.planner.excluded_by(course_id) & pending & ~(1 << course_id)
+            for single, options in self.planner.clauses(course_id)[0]:
+                ways = [1 << option_id for option_id in CourseIds.id_list(single & goal)] \
+                    + [option & ~completed for option in options if option & goal == option]
+                if not _is_met((single, options), completed) and ways:
+                    required[course_id] |= functools.reduce(operator.and_, ways)
+
+        def clause_term(clause: Clause) -> float:
+            single, options = clause
+            if _is_met(clause, completed):
+                return 0
+            return min([earliest.get(course_id, math.inf) for course_id in CourseIds.id_list(single & goal)]
+                       + [max(earliest.get(course_id, math.inf) for course_id in CourseIds.id_list(option & ~completed))
+                          for option in options if option & goal == option], default=math.inf)
+
+        changed = True
+        while changed:
+            changed = False
+            for course_id in remaining:
+                prerequisites, corequisites = self.planner.clauses(course_id)
+                term = max([1] + [1 + clause_term(clause) for clause in prerequisites]
+                           + [clause_term(clause) for clause in corequisites]
+                           + [1 + earliest[excluding_id] for excluding_id in CourseIds.id_list(
+                               self.planner.excluded_by(course_id) & pending & ~(1 << course_id))])
+                if term < earliest[course_id] and term <= len(remaining):
+                    earliest[course_id] = term
+                    changed = True
+                for required_id in CourseIds.id_list(required[course_id]):
+                    if tails[required_id] < min(tails[course_id] + 1, len(remaining)):
+                        tails[required_id] = tails[course_id] + 1
+                        changed = True
+        if any(term == math.inf for term in earliest.values()):
+            return math.inf
+        credits = {course_id: self.planner.ids.credits(1 << course_id) for course_id in remaining}
+        terms = max((earliest[course_id] + tails[course_id] - 1 for course_id in remaining), default=0)
+        while terms <= len(remaining):
+            latest = {course_id: terms - tails[course_id] + 1 for course_id in remaining}
+            if all(sum(credits[course_id] for course_id in remaining
+                       if earliest[course_id] >= first and latest[course_id] <= last)
+                   <= (last - first + 1) * self.credit_cap
+                   for first in set(earliest.values()) for last in set(latest.values()) if first <= last):
+                return terms
+            terms += 1
+        return math.inf
+
+    def _terms(self, completed: int, remaining: int) -> list[int]:
+        """
+            Returns the bitmasks of the remaining courses that can be taken in the next term after the completed
+            courses, without exceeding the credit cap, to which no remaining course whose corequisites are completed
+            can be added. A course is available once its prerequisites are completed and every remaining course that
+            excludes it is too.
+        """
+        available = [course_id for course_id in CourseIds.id_list(remaining)
+                     if not self.planner.excluded_by(course_id) & remaining & ~(1 << course_id)
+                     and all(_is_met(clause, completed) for clause in self.planner.clauses(course_id)[0])]
+        credits = [self.planner.ids.credits(1 << course_id) for course_id in available]
+        free = [all(_is_met(clause, completed) for clause in self.planner.clauses(course_id)[1])
+                for course_id in available]
+        subsets = []
+
+        def extend(index: int, taken: int, total: float, skipped: float) -> None:
+            if index == len(available):
+                if taken and total + skipped > self.credit_cap:
+                    subsets.append(taken)
+                return
+            if total + credits[index] <= self.credit_cap:
+                extend(index + 1, taken | (1 << available[index]), total + credits[index], skipped)
+            extend(index + 1, taken, total, min(skipped, credits[index]) if free[index] else skipped)
+
+        extend(0, 0, 0.0, math.inf)
+        return [taken for taken in subsets if all(
+            _is_met(clause, completed | taken)
+            for course_id in CourseIds.id_list(taken) for clause in self.planner.clauses(course_id)[1])]
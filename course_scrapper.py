@@ -2,166 +2,565 @@
     Scrapper for Courses
     This module scraps course Data from Academic Calendar and writes it into a csv file. It also converts a CSV file
     with course data into course objects to use it for the rest of the project. We can specify which courses to scrap
-    by changing the Courses To Scrap string.
+    by changing the Courses To Scrap string. The spider itself lives in calendar_spider, so that reading the csv file
+    does not import scrapy or BeautifulSoup.
 
     This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
 """
+import contextlib
 import csv
+import gc
+import hashlib
+import itertools
+import json
+import marshal
+import mmap
 import os
 import re
-from scrapy.crawler import CrawlerProcess
-import bs4.element
-import scrapy
-from bs4 import BeautifulSoup as Soupy
+import sys
+from typing import Callable, Iterable, Iterator, Optional, TYPE_CHECKING
 
-from core_classes import Course
+import instrumentation
+from core_classes import Course, compact_courses
+from requisite_expressions import format_expression, parse_expression
 
+if TYPE_CHECKING:
+    import bs4
+    from lxml import etree
+
+CSV_FILE = "CourseData.csv"
 CSV_SPLIT_CHAR = "|"
 LIST_SPLIT_CHAR = ","
+SNAPSHOT_SUFFIX = ".snapshot"
+SNAPSHOT_FORMAT = 3
+REFRESH_STATE_SUFFIX = ".state.json"
+CHANGE_REPORT_SUFFIX = ".changes.json"
+COURSE_BLOCK_CLASS = "no-break views-row"
+STREAM_CHUNK_SIZE = 64 * 1024
+PARALLEL_CHUNK_SIZE = 64
 COURSES_TO_SCRAP = {'CSC', 'MAT135H1', 'MAT136H1', 'MAT137Y1', 'MAT157Y1', 'MAT221H1', 'MAT223H1', 'MAT240H1',
                     'MAT235Y1', 'MAT237Y1', 'MAT257Y1', 'STA237H1', 'STA247H1', 'STA257H1'}
+ANY_COURSE_CODE_PATTERN = re.compile(r"[A-Z]{3}[0-9]{3}[HY][0-9]")
+COURSE_CODE_PATTERN = re.compile(r"[(" + str.join("|", COURSES_TO_SCRAP) + ")]+[0-9]+[A-Z]\d")
+TITLE_FIELD = "views-field views-field-title"
+BODY_FIELD = "views-field views-field-body"
+PREREQUISITE_FIELD = "views-field views-field-field-prerequisite"
+RECOMMENDED_FIELD = "views-field views-field-field-recommended"
+COREQUISITE_FIELD = "views-field views-field-field-corequisite"
+EXCLUSION_FIELD = "views-field views-field-field-exclusion"
+BREADTH_FIELD = "views-field views-field-field-breadth-requirements"
 
 
-def categorize_courses(course_data: bs4.ResultSet, wanted_courses: set[str]) -> list[Course]:
+def categorize_courses(course_data: Iterable['bs4.element.Tag'], wanted_courses: Optional[set[str]]) -> list[Course]:
     """
-        This function takes a course data object which is a resul set from the webpage, and also a list of wanted
+        This function takes a course data object which is a resul set from the webpage (or any iterable of course
+        blocks, such as the one produced by iter_course_blocks), and also a list of wanted
         courses which is to specify which courses we want to scrap from the webpage. After that, this function
         applies some filters to scrapped data to create course objects and then returns a list containing desired
         courses.
+
+        Each block is walked once by _block_fields to find all of its fields, instead of searching it again for
+        every field.
+
+        If wanted_courses is None, every course is kept, and the course codes of every department are recognised in
+        its prerequisites, exclusions, recommendations and corequisites.
+
+        The AND/OR structure of the prerequisite and corequisite texts is kept in the courses' prerequisite and
+        corequisite expressions (see requisite_expressions).
     """
     courses = []
-    course_code_pattern = re.compile(r"[(" + str.join("|", COURSES_TO_SCRAP) + ")]+[0-9]+[A-Z]\d")
+    pattern = COURSE_CODE_PATTERN if wanted_courses is not None else ANY_COURSE_CODE_PATTERN
     for tag in course_data:
-        course_title = tag.find(class_="views-field views-field-title").text.replace("\n", "")
+        fields = _block_fields(tag)
+        course_title = fields[TITLE_FIELD].text.replace("\n", "")
         course_code = course_title.split(" ")[0]
-        if any([str.__contains__(course_code, x) for x in wanted_courses]):
+        if wanted_courses is None or any([str.__contains__(course_code, x) for x in wanted_courses]):
             try:
-                body = tag.find(class_="views-field views-field-body").find(class_="field-content").find(
-                    'p').getText().rstrip().replace("\n", "")
-            except AttributeError:
+                body = fields[BODY_FIELD].find(class_="field-content").find('p').getText().rstrip().replace("\n", "")
+            except (KeyError, AttributeError):
                 body = ""
-            try:
-                prerequisite = tag.find(class_="views-field views-field-field-prerequisite").contents[
-                    1].text.rstrip().replace("\n", "")
-                prerequisite = course_code_pattern.findall(prerequisite)
-            except AttributeError:
-                prerequisite = []
-            try:
-                recommended = tag.find(class_="views-field views-field-field-recommended").contents[
-                    1].text.rstrip().replace("\n", "")
-                recommended = course_code_pattern.findall(recommended)
-            except AttributeError:
-                recommended = []
-            try:
-                corequisite = tag.find(class_="views-field views-field-field-corequisite").contents[
-                    1].text.rstrip().replace("\n", "")
-                corequisite = course_code_pattern.findall(corequisite)
-            except AttributeError:
-                corequisite = []
-            try:
-                exclusion = tag.find(class_="views-field views-field-field-exclusion").contents[
-                    1].text.rstrip().replace("\n", "")
-                exclusion = course_code_pattern.findall(exclusion)
-            except AttributeError:
-                exclusion = []
-            try:
-                breadth_requirements_text = \
-                    tag.find(class_="views-field views-field-field-breadth-requirements").contents[
-                        1].text.rstrip().replace("\n", "")
-                if str.__contains__(breadth_requirements_text, "1"):
-                    breadth_requirements = 1
-                elif str.__contains__(breadth_requirements_text, "2"):
-                    breadth_requirements = 2
-                elif str.__contains__(breadth_requirements_text, "3"):
-                    breadth_requirements = 3
-                elif str.__contains__(breadth_requirements_text, "4"):
-                    breadth_requirements = 4
-                elif str.__contains__(breadth_requirements_text, "5"):
-                    breadth_requirements = 5
-                else:
-                    breadth_requirements = 0
-            except AttributeError:
-                breadth_requirements = 0
+            breadth_requirements_text = _field_text(fields, BREADTH_FIELD)
+            breadth_requirements = next((int(breadth) for breadth in "12345"
+                                         if str.__contains__(breadth_requirements_text, breadth)), 0)
+            prerequisite_text = _field_text(fields, PREREQUISITE_FIELD)
+            corequisite_text = _field_text(fields, COREQUISITE_FIELD)
             course_object = Course(course_title=course_title, course_code=course_code, course_description=body,
-                                   prerequisites=prerequisite, exclusion=exclusion, recommended=recommended,
-                                   corequisite=corequisite, breadth_requirements=breadth_requirements)
+                                   prerequisites=pattern.findall(prerequisite_text),
+                                   exclusion=pattern.findall(_field_text(fields, EXCLUSION_FIELD)),
+                                   recommended=pattern.findall(_field_text(fields, RECOMMENDED_FIELD)),
+                                   corequisite=pattern.findall(corequisite_text),
+                                   breadth_requirements=breadth_requirements,
+                                   prerequisite_expression=format_expression(parse_expression(prerequisite_text)),
+                                   corequisite_expression=format_expression(parse_expression(corequisite_text)))
             courses.append(course_object)
     return courses
 
 
-def write_to_csv(courses: list[Course]) -> None:
+def _block_fields(tag: 'bs4.element.Tag') -> dict[str, 'bs4.element.Tag']:
+    """
+        Walks a course block once and returns a dictionary mapping each class attribute found in it to the first
+        element with that class attribute, the same element tag.find(class_=...) would return.
+    """
+    fields = {}
+    for element in tag.descendants:
+        classes = element.get('class') if hasattr(element, 'get') else None
+        if classes:
+            fields.setdefault(" ".join(classes), element)
+    return fields
+
+
+def _field_text(fields: dict[str, 'bs4.element.Tag'], field_class: str) -> str:
+    """
+        Returns the cleaned text of the value of a labelled field (its second child), or "" if the block does not
+        have the field.
+    """
+    field = fields.get(field_class)
+    if field is None:
+        return ""
+    return field.contents[1].text.rstrip().replace("\n", "")
+
+
+def categorize_courses_parallel(course_data: Iterable, wanted_courses: Optional[set[str]],
+                                processes: Optional[int] = None, chunk_size: int = PARALLEL_CHUNK_SIZE) -> list[Course]:
+    """
+        Does the same as categorize_courses, but splits the course blocks into chunks of chunk_size blocks and
+        categorizes the chunks on a pool of processes (os.cpu_count() processes if processes is None). The course
+        blocks may be tags or their raw HTML strings; only the raw HTML is sent to the workers. The courses are
+        returned in the same order as the blocks, so the result is the same as the one categorize_courses returns.
+
+        Preconditions:
+        - processes is None or processes >= 1
+        - chunk_size >= 1
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunks = _html_chunks(course_data, chunk_size)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        results = pool.map(_categorize_html, chunks, itertools.repeat(wanted_courses))
+        return [course for chunk_courses in results for course in chunk_courses]
+
+
+def _html_chunks(course_data: Iterable, chunk_size: int) -> Iterator[list[str]]:
+    """
+        Yields the raw HTML of the course blocks in lists of at most chunk_size blocks.
+    """
+    blocks = iter(course_data)
+    chunk = [str(block) for block in itertools.islice(blocks, chunk_size)]
+    while chunk:
+        yield chunk
+        chunk = [str(block) for block in itertools.islice(blocks, chunk_size)]
+
+
+def _categorize_html(html_blocks: list[str], wanted_courses: Optional[set[str]]) -> list[Course]:
+    """
+        Parses the raw HTML of each course block and categorizes the blocks. This is the work done by each process
+        of categorize_courses_parallel.
+    """
+    from bs4 import BeautifulSoup as Soupy
+
+    return categorize_courses([Soupy(html, 'html.parser').div for html in html_blocks], wanted_courses)
+
+
+def iter_course_blocks(chunks: Iterable[bytes], encoding: str = 'utf-8') -> Iterator['bs4.element.Tag']:
+    """
+        Parses the calendar print page incrementally from an iterable of byte chunks, and yields each course block
+        (an element with the COURSE_BLOCK_CLASS class) as a small BeautifulSoup tag as soon as its closing tag has been
+        read. Yielded blocks are cleared from the parse tree, so memory use stays proportional to one course block
+        rather than to the whole page.
+    """
+    from bs4 import BeautifulSoup as Soupy
+
+    for html in iter_course_block_html(chunks, encoding):
+        yield Soupy(html, 'html.parser').div
+
+
+def iter_course_block_html(chunks: Iterable[bytes], encoding: str = 'utf-8') -> Iterator[str]:
+    """
+        Does the same as iter_course_blocks, but yields the raw HTML of each course block instead of a tag.
+    """
+    from lxml import etree
+
+    parser = etree.HTMLPullParser(events=('end',), tag='div', encoding=encoding)
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from _completed_blocks(parser, etree.tostring)
+    parser.close()
+    yield from _completed_blocks(parser, etree.tostring)
+
+
+def _completed_blocks(parser: 'etree.HTMLPullParser', to_string: Callable) -> Iterator[str]:
+    """
+        Yields the raw HTML of the course blocks whose closing tags the parser has read since it was last asked,
+        removing each one (and anything before it) from the parse tree.
+    """
+    for _, element in parser.read_events():
+        if element.get('class') == COURSE_BLOCK_CLASS:
+            html = to_string(element, encoding='unicode', with_tail=False)
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+            yield html
+
+
+def categorize_calendar_file(file_name: str, wanted_courses: set[str] = COURSES_TO_SCRAP,
+                             encoding: str = 'utf-8', processes: Optional[int] = 1) -> list[Course]:
+    """
+        Streams a saved copy of the calendar print page through iter_course_blocks and returns the categorized
+        courses, reading the file STREAM_CHUNK_SIZE bytes at a time.
+
+        If processes is not 1, the blocks are categorized by categorize_courses_parallel on that many processes
+        (every core if processes is None) instead, which returns the same courses in the same order.
+    """
+    with open(file_name, 'rb') as page:
+        chunks = iter(lambda: page.read(STREAM_CHUNK_SIZE), b'')
+        if processes != 1:
+            return categorize_courses_parallel(iter_course_block_html(chunks, encoding), wanted_courses, processes)
+        return categorize_courses(iter_course_blocks(chunks, encoding), wanted_courses)
+
+
+def write_to_csv(courses: list[Course], file_name: str = CSV_FILE) -> None:
     """
         This function creates a CSV file using a list of courses. The data follows the sturcuture:
         ["Course Code", "Course Title", "Course Description", "Prerequisites", "Exclusion", "Recommended", "Corequisite"
-        ,"Breadth Requirement"] for columns.
+        ,"Breadth Requirement", "Prerequisite Expression", "Corequisite Expression"] for columns. The file is
+        written to a temporary file and renamed into place, so readers never see a partially written file.
+    """
+    _write_rows([_course_row(course) for course in courses], file_name)
+
+
+def _course_row(course: Course) -> list[str]:
+    """
+        Returns the row of the dataset for a course.
     """
-    if os.path.exists("CourseData.csv"):
-        os.remove("CourseData.csv")
-    course_file = open('CourseData.csv', mode='w', encoding="utf-8", newline="")
-    course_writer = csv.writer(course_file, delimiter=CSV_SPLIT_CHAR, quotechar='"', quoting=csv.QUOTE_MINIMAL)
-    course_writer.writerow(
-        ["Course Code", "Course Title", "Course Description", "Prerequisites", "Exclusion", "Recommended",
-         "Corequisite", "Breadth Requirement"])
-    for course in courses:
-        course_writer.writerow([course.course_code, course.course_title, course.course_description,
-                                LIST_SPLIT_CHAR.join(course.prerequisites), LIST_SPLIT_CHAR.join(course.exclusion),
-                                LIST_SPLIT_CHAR.join(course.recommended), LIST_SPLIT_CHAR.join(course.corequisite),
-                                course.breadth_requirements])
-    course_file.close()
+    return [course.course_code, course.course_title, course.course_description,
+            LIST_SPLIT_CHAR.join(course.prerequisites), LIST_SPLIT_CHAR.join(course.exclusion),
+            LIST_SPLIT_CHAR.join(course.recommended), LIST_SPLIT_CHAR.join(course.corequisite),
+            str(course.breadth_requirements), course.prerequisite_expression, course.corequisite_expression]
 
 
-def read_from_csv(file_name: str) -> list[Course]:
+def _write_rows(rows: list[list[str]], file_name: str) -> None:
+    """
+        Atomically replaces the dataset file_name with the header followed by the given rows.
+    """
+    temporary_name = file_name + '.tmp'
+    with open(temporary_name, mode='w', encoding="utf-8", newline="") as course_file:
+        course_writer = csv.writer(course_file, delimiter=CSV_SPLIT_CHAR, quotechar='"', quoting=csv.QUOTE_MINIMAL)
+        course_writer.writerow(
+            ["Course Code", "Course Title", "Course Description", "Prerequisites", "Exclusion", "Recommended",
+             "Corequisite", "Breadth Requirement", "Prerequisite Expression", "Corequisite Expression"])
+        course_writer.writerows(rows)
+    os.replace(temporary_name, file_name)
+
+
+def _read_rows(file_name: str) -> dict[str, list[str]]:
+    """
+        Returns the rows of the dataset file_name keyed by course code, in file order, or an empty dictionary if the
+        file does not exist.
+    """
+    if not os.path.exists(file_name):
+        return {}
+    with open(file_name, encoding="utf-8", newline="") as csv_file:
+        reader = csv.reader(csv_file, delimiter=CSV_SPLIT_CHAR)
+        next(reader, None)
+        return {row[0]: row for row in reader}
+
+
+def upsert_csv(courses: list[Course], codes: list[str], file_name: str = CSV_FILE) -> dict:
+    """
+        Updates the dataset file_name so that it holds exactly the courses in codes, in that order. Rows for the given
+        courses are inserted or replaced, rows of the other courses in codes are kept as they are, and rows of
+        courses not in codes are removed. The file is only rewritten (atomically) if its contents change.
+
+        Returns a change report: the codes of the added, changed and removed courses, the number of unchanged
+        courses, and whether the file was written.
+
+        Preconditions:
+        - every course code in codes is either the code of one of courses or already in the dataset
+    """
+    old_rows = _read_rows(file_name)
+    new_rows = {course.course_code: _course_row(course) for course in courses}
+    rows = [new_rows[code] if code in new_rows else old_rows[code] for code in codes]
+    report = {'added': [code for code in codes if code not in old_rows],
+              'changed': [code for code in codes if code in old_rows and code in new_rows
+                          and new_rows[code] != old_rows[code]],
+              'removed': [code for code in old_rows if code not in set(codes)]}
+    report['unchanged'] = len(codes) - len(report['added']) - len(report['changed'])
+    report['written'] = bool(report['added'] or report['changed'] or report['removed']) or list(old_rows) != codes
+    if report['written']:
+        _write_rows(rows, file_name)
+    return report
+
+
+def read_refresh_state(file_name: str = CSV_FILE) -> dict:
+    """
+        Returns the refresh state saved next to the dataset file_name by refresh_csv: the HTTP validators of the
+        page it was made from ('etag' and 'last_modified') and the course code of each course block's digest
+        ('blocks', with '' for blocks of courses that are not wanted).
+
+        The state is only returned if it was saved for the current contents of the dataset; otherwise, or if there is
+        no state, an empty dictionary is returned so the next refresh downloads and parses everything.
+    """
+    try:
+        with open(file_name + REFRESH_STATE_SUFFIX, encoding="utf-8") as state_file:
+            state = json.load(state_file)
+        with open(file_name, 'rb') as source:
+            digest = hashlib.sha256(source.read()).hexdigest()
+    except (OSError, ValueError):
+        return {}
+    return state if state.get('dataset') == digest else {}
+
+
+def _write_refresh_state(state: dict, file_name: str) -> None:
+    """
+        Atomically saves the refresh state of the dataset file_name, recording the digest of its current contents.
+    """
+    with open(file_name, 'rb') as source:
+        state = dict(state, dataset=hashlib.sha256(source.read()).hexdigest())
+    temporary_name = file_name + REFRESH_STATE_SUFFIX + '.tmp'
+    with open(temporary_name, 'w', encoding="utf-8") as state_file:
+        json.dump(state, state_file)
+    os.replace(temporary_name, file_name + REFRESH_STATE_SUFFIX)
+
+
+def refresh_csv(course_blocks: Iterable[str], validators: Optional[dict] = None,
+                wanted_courses: set[str] = COURSES_TO_SCRAP, file_name: str = CSV_FILE,
+                processes: Optional[int] = 1) -> dict:
+    """
+        Incrementally updates the dataset file_name from the raw HTML of the course blocks of a freshly downloaded
+        page (as yielded by iter_course_block_html), and saves the page's HTTP validators for the next conditional
+        request.
+
+        Each block is identified by its SHA-256 digest. Blocks whose digest is in the saved refresh state are
+        unchanged and are not parsed; only new or edited blocks are categorized and upserted with upsert_csv. The
+        change report of upsert_csv is written next to the dataset as JSON and returned, with 'status' set to
+        'updated' or 'unchanged'.
+
+        If processes is not 1, the new or edited blocks are categorized on that many processes (every core if
+        processes is None), in chunks of PARALLEL_CHUNK_SIZE blocks, like categorize_courses_parallel does.
+    """
+    known = read_refresh_state(file_name).get('blocks', {})
+    digests, new_blocks = [], {}
+    for html in course_blocks:
+        digest = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        digests.append(digest)
+        if digest not in known:
+            new_blocks.setdefault(digest, html)
+    codes_by_digest, courses = dict(known), []
+    for digest, new_courses in zip(new_blocks, _categorize_each(list(new_blocks.values()), wanted_courses,
+                                                                processes)):
+        codes_by_digest[digest] = new_courses[0].course_code if new_courses else ''
+        courses.extend(new_courses)
+    blocks, codes = {}, []
+    for digest in digests:
+        blocks[digest] = codes_by_digest[digest]
+        if blocks[digest] != '':
+            codes.append(blocks[digest])
+    report = upsert_csv(courses, codes, file_name)
+    report['status'] = 'updated' if report['written'] else 'unchanged'
+    _write_refresh_state(dict(validators or {}, blocks=blocks), file_name)
+    write_change_report(report, file_name)
+    return report
+
+
+def _categorize_each(html_blocks: list[str], wanted_courses: Optional[set[str]],
+                     processes: Optional[int] = 1) -> list[list[Course]]:
+    """
+        Returns the courses categorize_courses finds in each course block's raw HTML, block by block, on that many
+        processes (every core if processes is None) if processes is not 1.
+    """
+    if processes == 1 or len(html_blocks) <= 1:
+        return [_categorize_html([html], wanted_courses) for html in html_blocks]
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(_categorize_html, [[html] for html in html_blocks], itertools.repeat(wanted_courses),
+                             chunksize=PARALLEL_CHUNK_SIZE))
+
+
+def not_modified_report(file_name: str = CSV_FILE) -> dict:
+    """
+        Writes and returns the change report of a refresh whose conditional request was answered with 304 Not
+        Modified, so the dataset file_name was left untouched.
+    """
+    report = {'status': 'not_modified', 'added': [], 'changed': [], 'removed': [],
+              'unchanged': len(_read_rows(file_name)), 'written': False}
+    write_change_report(report, file_name)
+    return report
+
+
+def write_change_report(report: dict, file_name: str = CSV_FILE) -> None:
+    """
+        Writes a change report as JSON next to the dataset file_name.
+    """
+    with open(file_name + CHANGE_REPORT_SUFFIX, 'w', encoding="utf-8") as report_file:
+        json.dump(report, report_file, indent=2)
+
+
+@instrumentation.timed('read_from_csv')
+def read_from_csv(file_name: str, use_snapshot: bool = True, compact: bool = False) -> list[Course]:
     """
         This function creates a list of courses from the dataset. That dataset must follow the structure from the
-        write_to_csv.
+        write_to_csv. Empty list cells become empty lists, and datasets written before the expression columns were
+        added give courses with empty expressions. If compact is True, the courses are returned as
+        core_classes.CompactCourse objects instead, which take much less memory.
+
+        If use_snapshot is True, the courses are loaded from the compiled snapshot next to the dataset when the
+        snapshot was made from the current dataset, and otherwise the dataset is parsed and a new snapshot is written.
     """
-    with open(file_name) as csv_file:
+    if use_snapshot:
+        courses = read_snapshot(file_name)
+        if courses is not None:
+            return compact_courses(courses) if compact else courses
+    with open(file_name) as csv_file, _collection_paused():
         reader = csv.reader(csv_file, delimiter=CSV_SPLIT_CHAR)
         reader.__next__()
         course_so_far = []
         for row in reader:
             course = Course(course_code=row[0], course_title=row[1], course_description=row[2],
-                            prerequisites=row[3].split(LIST_SPLIT_CHAR), exclusion=row[4].split(LIST_SPLIT_CHAR),
-                            recommended=row[5].split(LIST_SPLIT_CHAR), corequisite=row[6].split(LIST_SPLIT_CHAR),
-                            breadth_requirements=int(row[7]))
+                            prerequisites=_split_list(row[3]), exclusion=_split_list(row[4]),
+                            recommended=_split_list(row[5]), corequisite=_split_list(row[6]),
+                            breadth_requirements=int(row[7]), prerequisite_expression=_optional_cell(row, 8),
+                            corequisite_expression=_optional_cell(row, 9))
             course_so_far.append(course)
-    return course_so_far
-
-
-class CalendarSpider(scrapy.Spider):
-    """
-        This is a spider to perform scrapping on Course Calendar. It inherits from scrapy.spider class.
-    """
-    name = "CoursesSpider"
-
-    def start_requests(self) -> list[scrapy.Request]:
-        """
-         It starts the request to the web page (Academic Calendar) and returns the result of the request. After that, it
-         parses the request using Parse function
-        """
-        urls = [
-            'https://artsci.calendar.utoronto.ca/print/view/pdf/course_search/print_page/debug',
-        ]
-        requests = list()
-        for url in urls:
-            requests.append(scrapy.Request(url=url, callback=self.parse))
-        return requests
-
-    def parse(self, response: scrapy.http.response) -> None:
-        """
-            Parses given response from the request into a raw data format and sends the result to categorize_courses to
-            clean and categorize raw data into a courses list and then return that list to write_to_csv to write a csv
-            file using the categorized data.
-        """
-        soup = Soupy(response.text, "html.parser")
-        calendar_content = soup.findAll(class_="no-break views-row")
-        self.log(calendar_content)
-        write_to_csv(categorize_courses(calendar_content, COURSES_TO_SCRAP))
+    if use_snapshot:
+        write_snapshot(course_so_far, file_name)
+    return compact_courses(course_so_far) if compact else course_so_far
+
+
+def read_shards(directory: str, use_snapshot: bool = True) -> list[Course]:
+    """
+        Reads every dataset shard (a .csv file, such as the per-department shards written by a full calendar crawl)
+        in directory with read_from_csv and returns their courses, shard by shard in file name order.
+    """
+    courses = []
+    for shard in sorted(os.listdir(directory)):
+        if shard.endswith('.csv'):
+            courses.extend(read_from_csv(os.path.join(directory, shard), use_snapshot))
+    return courses
+
+
+def _split_list(cell: str) -> list[str]:
+    """
+        Splits a list cell of the dataset into course codes.
+    """
+    return cell.split(LIST_SPLIT_CHAR) if cell != '' else []
+
+
+def _optional_cell(row: list[str], column: int) -> str:
+    """
+        Returns a cell of a dataset row, or '' if the row is from a dataset written before the column was added.
+    """
+    return row[column] if len(row) > column else ''
+
+
+def _source_key(file_name: str, digest: Optional[bytes] = None) -> tuple:
+    """
+        Returns the key identifying the current contents of the dataset: the snapshot format, the dataset's size,
+        modification time and SHA-256 digest. The digest is computed unless it is given.
+    """
+    stat = os.stat(file_name)
+    if digest is None:
+        with open(file_name, 'rb') as source:
+            digest = hashlib.sha256(source.read()).digest()
+    return SNAPSHOT_FORMAT, stat.st_size, stat.st_mtime_ns, digest
+
+
+def write_snapshot(courses: list[Course], file_name: str) -> None:
+    """
+        Writes a compiled snapshot of the courses read from the dataset file_name next to it. The snapshot stores the
+        attribute dictionary of every course, with its relation lists already split, so loading it builds no course
+        one attribute at a time. Course codes are interned, so marshal stores each of them once and loads them
+        interned. The snapshot is written to a temporary file and renamed into place, and is silently skipped if it
+        cannot be written.
+    """
+    def codes(code_list: list[str]) -> list[str]:
+        return [sys.intern(code) for code in code_list]
+
+    attributes = [{'course_code': sys.intern(course.course_code), 'course_title': course.course_title,
+                   'course_description': course.course_description, 'prerequisites': codes(course.prerequisites),
+                   'recommended': codes(course.recommended), 'corequisite': codes(course.corequisite),
+                   'exclusion': codes(course.exclusion), 'breadth_requirements': course.breadth_requirements,
+                   'prerequisite_expression': course.prerequisite_expression,
+                   'corequisite_expression': course.corequisite_expression} for course in courses]
+    temporary_name = file_name + SNAPSHOT_SUFFIX + '.tmp'
+    try:
+        key = marshal.dumps(_source_key(file_name))
+        with open(temporary_name, 'wb') as snapshot:
+            snapshot.write(len(key).to_bytes(4, 'little') + key + marshal.dumps(attributes))
+        os.replace(temporary_name, file_name + SNAPSHOT_SUFFIX)
+    except OSError:
+        pass
+
+
+def read_snapshot(file_name: str) -> Optional[list[Course]]:
+    """
+        Returns the courses stored in the snapshot of the dataset file_name, or None if there is no usable snapshot
+        or it was made from different contents of the dataset.
+
+        A snapshot whose size and modification time match the dataset is used without reading the dataset. If only
+        the modification time differs, the dataset's digest decides, and a matching snapshot is re-keyed.
+
+        The snapshot is memory mapped instead of read, and each course is made by giving a new Course the attribute
+        dictionary loaded from the snapshot, without calling its constructor.
+    """
+    try:
+        with open(file_name + SNAPSHOT_SUFFIX, 'rb') as snapshot, \
+                mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            key_length = int.from_bytes(data[:4], 'little')
+            key = marshal.loads(data[4:4 + key_length])
+            stat = os.stat(file_name)
+            if key[:3] != (SNAPSHOT_FORMAT, stat.st_size, stat.st_mtime_ns):
+                if key[:2] != (SNAPSHOT_FORMAT, stat.st_size) or _source_key(file_name)[3] != key[3]:
+                    return None
+                rekey = True
+            else:
+                rekey = False
+            with _collection_paused(), memoryview(data) as view:
+                attributes = marshal.loads(view[4 + key_length:])
+    except (OSError, EOFError, ValueError, TypeError):
         return None
+    with _collection_paused():
+        courses = []
+        for course_attributes in attributes:
+            course = object.__new__(Course)
+            course.__dict__ = course_attributes
+            courses.append(course)
+    if rekey:
+        write_snapshot(courses, file_name)
+    return courses
+
+
+@contextlib.contextmanager
+def _collection_paused() -> Iterator[None]:
+    """
+        Pauses the cyclic garbage collector in the body of the with statement. Loading a catalog creates hundreds of
+        thousands of containers and none of them are garbage, but each batch of them makes the collector scan every
+        container created so far again.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def __getattr__(name: str) -> type:
+    """
+        Loads CalendarSpider from calendar_spider the first time it is accessed, so that reading course data does not
+        import scrapy or BeautifulSoup.
+    """
+    if name == 'CalendarSpider':
+        from calendar_spider import CalendarSpider
+        return CalendarSpider
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == '__main__':
     """Uncomment to Start Crawler to Scrap Data and create a csv file with scrapped course data"""
+#     from scrapy.crawler import CrawlerProcess
+#     from calendar_spider import CalendarSpider
 #     process = CrawlerProcess(settings={
 #         "FEEDS": {
 #             "items.json": {"format": "json"},
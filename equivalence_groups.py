@@ -0,0 +1,158 @@
+"""
+    Equivalence Groups
+
+    This module keeps a registry of groups of interchangeable courses, such as the different first year calculus
+    routes. Each course code maps to the ID of its group, and each group stores the rule for satisfying it as a list
+    of options, any one of which satisfies the group when all of its courses are completed. Options are compiled into
+    bitmasks over course_ids.COURSE_IDS, and the set of groups a completion bitmask satisfies is computed once and
+    cached as a bitmask over group IDs.
+
+    Groups that are drawn as a single node in the prerequisite graph also store the node's label and the
+    prerequisites drawn for that node. New alternatives are added by registering another group.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from course_ids import COURSE_IDS, CourseIds
+
+
+@dataclass(frozen=True)
+class EquivalenceGroup:
+    """
+        A group of interchangeable courses.
+
+        Instance Attributes:
+        - courses: The course codes that belong to the group.
+        - options: The ways of satisfying the group. The group is satisfied when every course of any one option is
+          completed.
+        - node: The label of the graph node drawn for the group, or None if its courses are drawn individually.
+        - prerequisites: The prerequisites drawn for the group's graph node.
+
+        Representation Invariants:
+        - self.courses != ()
+        - self.options != ()
+        - all(course in self.courses for option in self.options for course in option)
+    """
+    courses: tuple[str, ...]
+    options: tuple[tuple[str, ...], ...]
+    node: Optional[str] = None
+    prerequisites: tuple[str, ...] = ()
+
+
+DEFAULT_GROUPS = (
+    EquivalenceGroup(('CSC110Y1', 'CSC111H1', 'CSC108H1', 'CSC148H1', 'CSC165H1'),
+                     (('CSC110Y1', 'CSC111H1'), ('CSC108H1', 'CSC148H1', 'CSC165H1')),
+                     node='(CSC110Y1, CSC111H1)/\n(CSC108H1, CSC148H1, CSC165H1)'),
+    EquivalenceGroup(('MAT135H1', 'MAT136H1', 'MAT137Y1', 'MAT157Y1'),
+                     (('MAT135H1', 'MAT136H1'), ('MAT137Y1',), ('MAT157Y1',)),
+                     node='(MAT135H1, MAT136H1)/\nMAT137Y1/MAT157Y1'),
+    EquivalenceGroup(('MAT221H1', 'MAT223H1', 'MAT240H1'),
+                     (('MAT221H1',), ('MAT223H1',), ('MAT240H1',)),
+                     node='MAT221H1/MAT223H1/\nMAT240H1'),
+    EquivalenceGroup(('MAT235Y1', 'MAT237Y1', 'MAT257Y1'),
+                     (('MAT235Y1',), ('MAT237Y1',), ('MAT257Y1',)),
+                     node='MAT235Y1/MAT237Y1/\nMAT257Y1',
+                     prerequisites=('MAT135H1', 'MAT136H1', 'MAT137Y1', 'MAT157Y1')),
+    EquivalenceGroup(('STA237H1', 'STA247H1', 'STA255H1', 'STA257H1'),
+                     (('STA237H1',), ('STA247H1',), ('STA255H1',), ('STA257H1',)),
+                     node='STA237H1/STA247H1/\nSTA255H1/STA257H1',
+                     prerequisites=('MAT135H1', 'MAT136H1', 'MAT137Y1', 'MAT157Y1')),
+    EquivalenceGroup(('CSC236H1', 'CSC240H1'), (('CSC236H1',), ('CSC240H1',))),
+    EquivalenceGroup(('CSC263H1', 'CSC265H1'), (('CSC263H1',), ('CSC265H1',))),
+)
+
+
+class GroupRegistry:
+    """
+        A registry mapping course codes to the IDs of their equivalence groups.
+
+        Representation Invariants:
+        - every course code belongs to at most one group
+    """
+    _ids: CourseIds
+    _groups: list[EquivalenceGroup]
+    _option_masks: list[tuple[int, ...]]
+    _group_of_course: dict[str, int]
+    _group_of_node: dict[str, int]
+
+    def __init__(self, groups: tuple[EquivalenceGroup, ...] = (), ids: CourseIds = COURSE_IDS) -> None:
+        self._ids = ids
+        self._groups = []
+        self._option_masks = []
+        self._group_of_course = {}
+        self._group_of_node = {}
+        self.satisfied_mask = lru_cache(maxsize=4096)(self._satisfied_mask)
+        for group in groups:
+            self.register(group)
+
+    def register(self, group: EquivalenceGroup) -> int:
+        """
+            Adds a group to the registry and returns its ID. Raises a ValueError if one of its courses already
+            belongs to another group.
+        """
+        if any(course in self._group_of_course for course in group.courses):
+            raise ValueError
+        group_id = len(self._groups)
+        self._groups.append(group)
+        self._option_masks.append(tuple(self._ids.mask(option) for option in group.options))
+        for course in group.courses:
+            self._group_of_course[course] = group_id
+        if group.node is not None:
+            self._group_of_node[group.node] = group_id
+        self.satisfied_mask.cache_clear()
+        return group_id
+
+    def groups(self) -> list[EquivalenceGroup]:
+        """
+            Returns every registered group in ID order.
+        """
+        return list(self._groups)
+
+    def group(self, group_id: int) -> EquivalenceGroup:
+        """
+            Returns the group with the given ID.
+        """
+        return self._groups[group_id]
+
+    def group_id(self, course: str) -> Optional[int]:
+        """
+            Returns the ID of the group containing the given course code, or None if it is not in a group.
+        """
+        return self._group_of_course.get(course)
+
+    def node_group_id(self, node: str) -> Optional[int]:
+        """
+            Returns the ID of the group drawn as the given graph node, or None if no group has that node.
+        """
+        return self._group_of_node.get(node)
+
+    def option_masks(self, group_id: int) -> tuple[int, ...]:
+        """
+            Returns the compiled options of the group with the given ID.
+        """
+        return self._option_masks[group_id]
+
+    def _satisfied_mask(self, completed: int) -> int:
+        """
+            Returns a bitmask over group IDs of the groups satisfied by the completion bitmask. Available through the
+            cached satisfied_mask attribute.
+        """
+        satisfied = 0
+        for group_id, options in enumerate(self._option_masks):
+            if any(completed & option == option for option in options):
+                satisfied |= 1 << group_id
+        return satisfied
+
+    def is_satisfied(self, course: str, completed: int) -> bool:
+        """
+            Returns whether the group containing the given course code is satisfied by the completion bitmask. A
+            course that is not in a group is never satisfied through a group.
+        """
+        group_id = self._group_of_course.get(course)
+        return group_id is not None and bool(self.satisfied_mask(completed) >> group_id & 1)
+
+
+EQUIVALENCE_GROUPS = GroupRegistry(DEFAULT_GROUPS)
@@ -0,0 +1,228 @@
+"""
+    Graph Layout
+
+    This module computes layered (Sugiyama style) layouts for prerequisite graphs, such as the ones built by
+    main.Program.create_graph for any department. Each course is placed on a layer below all of its prerequisites
+    (longest path layering, after reversing the edges of any prerequisite cycle), the order of the courses within each
+    layer is chosen by barycenter sweeps to reduce edge crossings, and each layer is spread evenly across the width of
+    the figure, with the first layer at the top.
+
+    A layout only depends on the graph's nodes and edges, not on edge colours, so it is the same for every student.
+    Layouts are cached in memory and on disk, keyed by a hash of the graph's structure, so the same catalog is only
+    laid out once. The memory cache keeps the LAYOUT_CACHE_SIZE most recently used layouts, and the disk cache is
+    kept next to this module unless another directory is given, whatever the working directory is.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Hashable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import networkx as nx
+    import numpy as np
+
+LAYOUT_FORMAT = 1
+LAYOUT_SWEEPS = 8
+LAYOUT_CACHE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.layout_cache')
+LAYOUT_CACHE_SIZE = 16
+
+_LAYOUTS: OrderedDict[str, dict[str, tuple[float, float]]] = OrderedDict()
+
+
+def structure_key(g: 'nx.DiGraph') -> str:
+    """
+        Returns a hash of the graph's nodes and edges (ignoring their attributes) that identifies its layout.
+
+        Preconditions:
+        - all(isinstance(node, str) for node in g.nodes)
+    """
+    structure = [LAYOUT_FORMAT, sorted(g.nodes), sorted(g.edges)]
+    return hashlib.sha256(json.dumps(structure).encode('utf-8')).hexdigest()
+
+
+def cached_layout(g: 'nx.DiGraph', directory: str = LAYOUT_CACHE_DIRECTORY) -> dict[str, tuple[float, float]]:
+    """
+        Returns the layered layout of the graph, computing it with layered_layout only if no layout of a graph with
+        the same structure is cached in memory or in directory. New layouts are written to directory as
+        <structure key>.json, and are silently not written if the directory cannot be written to. Only the
+        LAYOUT_CACHE_SIZE most recently used layouts are kept in memory.
+
+        Preconditions:
+        - all(isinstance(node, str) for node in g.nodes)
+    """
+    key = structure_key(g)
+    if key in _LAYOUTS:
+        _LAYOUTS.move_to_end(key)
+        return _LAYOUTS[key]
+    file_name = os.path.join(directory, key + '.json')
+    try:
+        with open(file_name, encoding='utf-8') as layout_file:
+            positions = {node: (x, y) for node, x, y in json.load(layout_file)}
+    except (OSError, ValueError, TypeError):
+        positions = layered_layout(g)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(file_name + '.tmp', 'w', encoding='utf-8') as layout_file:
+                json.dump([[node, x, y] for node, (x, y) in positions.items()], layout_file)
+            os.replace(file_name + '.tmp', file_name)
+        except OSError:
+            pass
+    _LAYOUTS[key] = positions
+    while len(_LAYOUTS) > LAYOUT_CACHE_SIZE:
+        _LAYOUTS.popitem(last=False)
+    return positions
+
+
+def layered_layout(g: 'nx.DiGraph', sweeps: int = LAYOUT_SWEEPS) -> dict[Hashable, tuple[float, float]]:
+    """
+        Returns a layered layout of the graph, mapping each node to an (x, y) position with 0 <= x, y <= 1. Nodes on
+        the first layer (with no prerequisites) are at y = 1 and nodes on the last layer are at y = 0.
+
+        Edges that span several layers are routed through dummy nodes while ordering the layers, and the order with
+        the fewest crossings over the given number of down and up sweeps is kept. Nodes and dummy nodes are numbered,
+        and the edges between each pair of adjacent layers are kept in NumPy arrays, so each sweep is vectorized.
+    """
+    import numpy as np
+
+    nodes = sorted(g.nodes, key=str)
+    successors = {node: sorted(g.successors(node), key=str) for node in nodes}
+    edges = _acyclic_edges(nodes, successors)
+    layer = _longest_path_layers(nodes, edges)
+    depth = max(layer.values(), default=0)
+
+    number = {node: index for index, node in enumerate(nodes)}
+    node_layers = [layer[node] for node in nodes]
+    pairs = [([], []) for _ in range(depth)]
+    for source, target in edges:
+        previous = number[source]
+        for dummy_layer in range(layer[source] + 1, layer[target]):
+            node_layers.append(dummy_layer)
+            pairs[dummy_layer - 1][0].append(previous)
+            pairs[dummy_layer - 1][1].append(len(node_layers) - 1)
+            previous = len(node_layers) - 1
+        pairs[layer[target] - 1][0].append(previous)
+        pairs[layer[target] - 1][1].append(number[target])
+    uppers = [np.array(upper, dtype=np.int64) for upper, _ in pairs]
+    lowers = [np.array(lower, dtype=np.int64) for _, lower in pairs]
+
+    node_layers = np.array(node_layers, dtype=np.int64)
+    layers = [np.flatnonzero(node_layers == index) for index in range(depth + 1)]
+    slot = np.empty(len(node_layers), dtype=np.int64)
+    position = np.empty(len(node_layers))
+    for current in layers:
+        slot[current] = np.arange(len(current))
+        position[current] = np.arange(len(current))
+
+    def order_layer(index: int, own: np.ndarray, other: np.ndarray) -> None:
+        current = layers[index]
+        sums = np.bincount(slot[own], weights=position[other], minlength=len(current))
+        counts = np.bincount(slot[own], minlength=len(current))
+        own_slots = slot[current]
+        barycenters = np.where(counts[own_slots] > 0, sums[own_slots] / np.maximum(counts[own_slots], 1),
+                               position[current])
+        layers[index] = current[np.argsort(barycenters, kind='stable')]
+        position[layers[index]] = np.arange(len(current))
+
+    def crossings() -> int:
+        return sum(_inversions(position[lower][np.lexsort((position[lower], position[upper]))])
+                   for upper, lower in zip(uppers, lowers))
+
+    best_layers, best_crossings = list(layers), crossings()
+    for _ in range(sweeps):
+        if best_crossings == 0:
+            break
+        for index in range(1, depth + 1):
+            order_layer(index, lowers[index - 1], uppers[index - 1])
+        for index in range(depth - 1, -1, -1):
+            order_layer(index, uppers[index], lowers[index])
+        current_crossings = crossings()
+        if current_crossings < best_crossings:
+            best_layers, best_crossings = list(layers), current_crossings
+
+    positions = {}
+    for index, current in enumerate(best_layers):
+        real = current[current < len(nodes)].tolist()
+        for order, node in enumerate(real):
+            positions[nodes[node]] = ((order + 0.5) / len(real), 1 - index / depth if depth > 0 else 1.0)
+    return positions
+
+
+def _acyclic_edges(nodes: list, successors: dict) -> list[tuple]:
+    """
+        Returns the graph's edges with every edge that closes a cycle (a back edge of a depth first search) reversed,
+        so that the edges form a directed acyclic graph. Self loops are dropped.
+    """
+    state = {}
+    edges = []
+    for root in nodes:
+        if root in state:
+            continue
+        state[root] = 'open'
+        stack = [(root, iter(successors[root]))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                state[node] = 'done'
+                stack.pop()
+            elif child == node:
+                continue
+            elif state.get(child) == 'open':
+                edges.append((child, node))
+            else:
+                edges.append((node, child))
+                if child not in state:
+                    state[child] = 'open'
+                    stack.append((child, iter(successors[child])))
+    return list(dict.fromkeys(edges))
+
+
+def _longest_path_layers(nodes: list, edges: list[tuple]) -> dict:
+    """
+        Returns the layer of each node of a directed acyclic graph: 0 for nodes without incoming edges, and one more
+        than the deepest of its predecessors for the others.
+    """
+    incoming = {node: 0 for node in nodes}
+    outgoing = {node: [] for node in nodes}
+    for source, target in edges:
+        incoming[target] += 1
+        outgoing[source].append(target)
+    layer = {node: 0 for node in nodes}
+    ready = [node for node in nodes if incoming[node] == 0]
+    while ready:
+        node = ready.pop()
+        for target in outgoing[node]:
+            layer[target] = max(layer[target], layer[node] + 1)
+            incoming[target] -= 1
+            if incoming[target] == 0:
+                ready.append(target)
+    return layer
+
+
+def _inversions(values: 'np.ndarray') -> int:
+    """
+        Returns the number of pairs of values that are strictly out of order, counted by a bottom up merge: at each
+        level, every value in the right half of a block is compared with the values in the left half of the block.
+    """
+    import numpy as np
+
+    indexes = np.arange(len(values))
+    inversions = 0
+    width = 1
+    while width < len(values):
+        block = indexes // (2 * width)
+        right = (indexes // width) % 2
+        order = np.lexsort((right, values, block))
+        is_left = right[order] == 0
+        sorted_block = block[order]
+        lefts_before = np.cumsum(is_left) - is_left
+        lefts_before_block = lefts_before[np.searchsorted(sorted_block, sorted_block)]
+        lefts_in_block = np.bincount(block, weights=right == 0)
+        is_right = ~is_left
+        inversions += int(np.sum(lefts_in_block[sorted_block[is_right]]
+                                 - (lefts_before[is_right] - lefts_before_block[is_right])))
+        width *= 2
+    return inversions
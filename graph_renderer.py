@@ -0,0 +1,253 @@
+"""
+    Graph Renderer
+
+    This module renders per-student prerequisite graphs to PNG or SVG files without opening a window, for reports
+    that draw a graph for every student. Every student's graph has the same nodes and edges (see
+    main.Program.create_graph); only the colours of the edges differ. A GraphRenderer therefore lays out and draws
+    the graph once, and each student's file is produced by swapping the edge colours:
+
+    - The arrows are converted once into a single collection of paths, so recolouring them is one call.
+    - For PNG output, the nodes and labels are rasterized once into a transparent overlay, which is composited
+      over the arrows with NumPy, so their text is not rendered again for every student.
+    - For SVG output, the graph is written once with a placeholder colour for every edge, and each student's file
+      is that text with the placeholders replaced.
+
+    render_students renders a whole batch of students, optionally on several processes.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import os
+import re
+from typing import Iterable, Optional, TYPE_CHECKING
+
+import core_classes as cc
+import course_graph
+import graph_layout
+import instrumentation
+import main
+
+if TYPE_CHECKING:
+    import matplotlib
+    import networkx as nx
+    import numpy as np
+
+FIGURE_SIZE = (19.2, 10.8)
+FIGURE_DPI = 100
+NODE_SIZE = 600
+FONT_SIZE = 5.4
+PNG_COMPRESS_LEVEL = 1
+RENDER_FORMATS = ('png', 'svg')
+SVG_HASH_SALT = 'graph_renderer'
+
+_WORKER_RENDERER = None
+
+
+class GraphRenderer:
+    """
+        A headless renderer of one graph structure, drawn with different edge colours.
+
+        Instance Attributes:
+        - edges: The edges of the graph, in the order their colours are given to render.
+        - file_format_default: The format used by render when none is given and file_name has no known extension.
+
+        Representation Invariants:
+        - self.file_format_default in RENDER_FORMATS
+    """
+    edges: list[tuple[str, str]]
+    file_format_default: str
+    _figure: 'matplotlib.figure.Figure'
+    _arrows: 'matplotlib.collections.PathCollection'
+    _static: list
+    _overlay: Optional[tuple[tuple, 'np.ndarray', 'np.ndarray']]
+    _svg_parts: Optional[list[str]]
+
+    def __init__(self, g: 'nx.DiGraph', pos: Optional[dict[str, tuple[float, float]]] = None,
+                 figure_size: tuple[float, float] = FIGURE_SIZE, dpi: float = FIGURE_DPI,
+                 file_format_default: str = 'png') -> None:
+        """
+            Draws the graph once, at the positions given or at its cached layered layout (see graph_layout), on a
+            figure of figure_size inches at dpi dots per inch. Raises a ValueError if file_format_default is not one
+            of RENDER_FORMATS.
+        """
+        import networkx as nx
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.collections import PathCollection
+        from matplotlib.figure import Figure
+
+        if file_format_default not in RENDER_FORMATS:
+            raise ValueError
+        if pos is None:
+            pos = graph_layout.cached_layout(g)
+        self.edges = list(g.edges)
+        self.file_format_default = file_format_default
+        self._figure = Figure(figsize=figure_size, dpi=dpi)
+        FigureCanvasAgg(self._figure)
+        axes = self._figure.add_axes((0, 0, 1, 1))
+        axes.set_axis_off()
+        arrows = nx.draw_networkx_edges(g, pos, ax=axes, arrows=True, node_size=NODE_SIZE) if self.edges else []
+        self._static = [nx.draw_networkx_nodes(g, pos, ax=axes, node_size=NODE_SIZE),
+                        *nx.draw_networkx_labels(g, pos, ax=axes, font_size=FONT_SIZE).values()]
+        self._figure.canvas.draw()
+        paths = [arrow.get_path() for arrow in arrows]
+        for arrow in arrows:
+            arrow.remove()
+        self._arrows = PathCollection(paths, transform=axes.transData, linewidths=1.0, zorder=1)
+        axes.add_collection(self._arrows, autolim=False)
+        self._overlay = None
+        self._svg_parts = None
+
+    @instrumentation.timed('render')
+    def render(self, colors: list[str], file_name: str, file_format: Optional[str] = None) -> None:
+        """
+            Writes the graph with the given edge colours (any Matplotlib colour, in the order of self.edges) to
+            file_name, as a PNG or SVG file. The format is file_format, or file_name's extension if file_format is
+            None, or self.file_format_default if file_name has neither. Raises a ValueError if the number of colours
+            is not the number of edges or if the format is not one of RENDER_FORMATS.
+
+            SVG files only keep the red, green and blue components of the colours.
+        """
+        if len(colors) != len(self.edges):
+            raise ValueError
+        if file_format is None:
+            extension = os.path.splitext(file_name)[1][1:].lower()
+            file_format = extension if extension in RENDER_FORMATS else self.file_format_default
+        if file_format not in RENDER_FORMATS:
+            raise ValueError
+        if file_format == 'svg':
+            from matplotlib.colors import to_hex
+
+            hex_colors = [to_hex(color) for color in colors]
+            with open(file_name, 'w', encoding='utf-8') as svg_file:
+                svg_file.write(''.join(part if index % 2 == 0 else hex_colors[int(part[1:], 16) - 1]
+                                       for index, part in enumerate(self._svg_template())))
+        else:
+            self._render_png(colors, file_name)
+
+    def _render_png(self, colors: list[str], file_name: str) -> None:
+        """
+            Draws the arrows with the given colours and writes them to file_name as a PNG file, with the rasterized
+            nodes and labels composited over them. The overlay is rasterized the first time it is needed.
+        """
+        import numpy as np
+        from PIL import Image
+
+        if self._overlay is None:
+            self._show_static(True)
+            self._arrows.set_visible(False)
+            self._figure.patch.set_alpha(0.0)
+            self._figure.canvas.draw()
+            pixels = np.asarray(self._figure.canvas.buffer_rgba())
+            covered = np.nonzero(pixels[:, :, 3])
+            alpha = pixels[covered][:, 3:].astype(np.float32) / 255
+            self._overlay = (covered, pixels[covered][:, :3] * alpha, 1 - alpha)
+            self._figure.patch.set_alpha(1.0)
+            self._arrows.set_visible(True)
+        self._show_static(False)
+        self._arrows.set_edgecolor(colors)
+        self._arrows.set_facecolor(colors)
+        self._figure.canvas.draw()
+        pixels = np.array(self._figure.canvas.buffer_rgba())[:, :, :3]
+        covered, color, transparency = self._overlay
+        pixels[covered] = np.rint(color + pixels[covered] * transparency).astype(np.uint8)
+        Image.fromarray(pixels).save(file_name, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
+
+    def _show_static(self, visible: bool) -> None:
+        """
+            Shows or hides the nodes and labels, which are drawn as vector artists for the overlay and SVG output
+            and hidden while drawing the arrows of PNG output.
+        """
+        for artist in self._static:
+            artist.set_visible(visible)
+
+    def _svg_template(self) -> list[str]:
+        """
+            Returns the SVG text of the graph split around the colour of each edge: the parts at odd indices are
+            placeholder colours, where '#' followed by the hexadecimal number i + 1 stands for the colour of
+            self.edges[i]. The template is written the first time it is needed, with a fixed salt for the ids of its
+            elements, so that every process writes the same files.
+        """
+        if self._svg_parts is None:
+            import io
+
+            import matplotlib
+
+            placeholders = [f'#{index + 1:06x}' for index in range(len(self.edges))]
+            self._show_static(True)
+            self._arrows.set_edgecolor(placeholders)
+            self._arrows.set_facecolor(placeholders)
+            text = io.StringIO()
+            with matplotlib.rc_context({'svg.hashsalt': SVG_HASH_SALT}):
+                self._figure.savefig(text, format='svg', metadata={'Date': None})
+            pattern = '(' + '|'.join(placeholders) + ')' if placeholders else '(?!)'
+            self._svg_parts = re.split(pattern, text.getvalue())
+        return self._svg_parts
+
+
+def edge_colors(courses: dict[str, cc.Course], student: cc.Student, g: 'nx.DiGraph') -> list[str]:
+    """
+        Returns the colours main.get_edges gives the student's edges of the graph, in the order of g.edges: 'g' for
+        fulfilled prerequisites and 'r' for unfulfilled ones.
+
+        Preconditions:
+        - g was built by main.Program.create_graph with the courses
+    """
+    colors = main.get_edges(courses, main.create_student_mapping(student), g)
+    return [colors[(target, source)] for source, target in g.edges]
+
+
+def render_students(courses: dict[str, cc.Course], students: Iterable[cc.Student], directory: str,
+                    file_format: str = 'png', processes: int = 1, g: Optional['nx.DiGraph'] = None) -> list[str]:
+    """
+        Renders the prerequisite graph of every student to directory, as <student number>.<file_format>, and returns
+        the names of the files in the order of the students. The graph's structure is built once (g, or the
+        catalog's course_graph.cached_graph), and each student only changes its edge colours.
+
+        With more than one process, the files are rendered on a pool of processes that each draw the graph once.
+        Raises a ValueError if file_format is not one of RENDER_FORMATS.
+
+        Preconditions:
+        - processes >= 1
+        - all student numbers are different
+    """
+    if file_format not in RENDER_FORMATS:
+        raise ValueError
+    students = list(students)
+    if not students:
+        return []
+    os.makedirs(directory, exist_ok=True)
+    file_names = [os.path.join(directory, f'{student.student_number}.{file_format}') for student in students]
+    if g is None:
+        structure = course_graph.cached_graph(courses)
+        g = structure.g
+        jobs = [(file_name, structure.colors(student)) for file_name, student in zip(file_names, students)]
+    else:
+        jobs = [(file_name, edge_colors(courses, student, g)) for file_name, student in zip(file_names, students)]
+    if processes == 1:
+        renderer = GraphRenderer(g, file_format_default=file_format)
+        for file_name, colors in jobs:
+            renderer.render(colors, file_name, file_format)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pos = graph_layout.cached_layout(g)
+        with ProcessPoolExecutor(max_workers=processes, initializer=_start_worker,
+                                 initargs=(g, pos, file_format)) as pool:
+            list(pool.map(_render_job, jobs, chunksize=max(1, len(jobs) // (processes * 4))))
+    return file_names
+
+
+def _start_worker(g: 'nx.DiGraph', pos: dict[str, tuple[float, float]], file_format: str) -> None:
+    """
+        Draws the graph once in a process of render_students' pool.
+    """
+    global _WORKER_RENDERER
+    _WORKER_RENDERER = GraphRenderer(g, pos, file_format_default=file_format)
+
+
+def _render_job(job: tuple[str, list[str]]) -> None:
+    """
+        Renders one student's file with the renderer of the current process. This is the work done by each process
+        of render_students.
+    """
+    file_name, colors = job
+    _WORKER_RENDERER.render(colors, file_name, _WORKER_RENDERER.file_format_default)
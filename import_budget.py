@@ -0,0 +1,60 @@
+"""
+    Import Time Budget
+
+    This module measures how long a fresh interpreter takes to import the modules needed for the headless
+    eligibility API (main, without building or drawing graphs), and checks the result against a budget. It also
+    checks that none of the scraping, graphing or plotting dependencies were imported along the way. Run it as a
+    script to print the measurement; it exits with status 1 when the budget is exceeded.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import json
+import os
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET = 0.25
+HEADLESS_MODULES = ['main']
+HEAVY_MODULES = {'scrapy', 'twisted', 'bs4', 'matplotlib', 'networkx', 'numpy'}
+
+_MEASURE_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+for module in sys.argv[1:]:
+    __import__(module)
+seconds = time.perf_counter() - start
+print(json.dumps({'seconds': seconds, 'modules': sorted({name.split('.')[0] for name in sys.modules})}))
+'''
+
+
+def measure_import(modules: list[str], repeats: int = 5) -> dict:
+    """
+        Imports the given modules in repeats fresh interpreters and returns the fastest import time in seconds and
+        the heavy dependencies that were imported.
+    """
+    times = []
+    heavy = set()
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', _MEASURE_SCRIPT] + modules, check=True, capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        result = json.loads(output)
+        times.append(result['seconds'])
+        heavy |= HEAVY_MODULES.intersection(result['modules'])
+    return {'seconds': min(times), 'heavy_modules': sorted(heavy)}
+
+
+def check_import_budget(budget: float = IMPORT_TIME_BUDGET) -> dict:
+    """
+        Measures the import of the headless eligibility API and returns the measurement together with whether it
+        stayed within the budget without importing any heavy dependency.
+    """
+    result = measure_import(HEADLESS_MODULES)
+    result['budget'] = budget
+    result['within_budget'] = result['seconds'] <= budget and result['heavy_modules'] == []
+    return result
+
+
+if __name__ == '__main__':
+    measurement = check_import_budget()
+    print(json.dumps(measurement, indent=2))
+    sys.exit(0 if measurement['within_budget'] else 1)
@@ -0,0 +1,261 @@
+"""
+    Stage Instrumentation
+
+    This module records where the time of a run goes, stage by stage: reading the dataset (read_from_csv), building
+    the course mapping (create_course_mapping), building the prerequisite graph (create_graph, and the loop that
+    adds its edges), colouring its edges (get_edges) and laying out and drawing it (visualize_graph). For each stage
+    it records the number of calls, the total and the longest wall time, and optionally the bytes the stage
+    allocated and kept, and its peak allocation, measured with tracemalloc. A cProfile dump of the whole run can be
+    written too.
+
+    Stages may be recorded from several threads at once, such as the worker threads of query_service. Their calls
+    are added to the same statistics, but tracemalloc traces the whole process, so the allocations of a stage
+    include those of stages running at the same time in other threads.
+
+    Instrumentation is off unless it is turned on, and then costs one check per stage call. It is turned on for a
+    block of code with the instrumented context manager, or for the whole process with environment variables, so
+    a slow production run can be diagnosed without changing any code:
+
+    - SPYDERWEB_STAGES: records stages when set to anything but '' or '0'. Unless it is '1', it is the name of a
+      JSON file the report is written to when the process exits.
+    - SPYDERWEB_ALLOCATIONS: also records allocations when set to '1' (tracemalloc slows the run down).
+    - SPYDERWEB_PROFILE: the name of a file the cProfile statistics of the whole process are written to when it
+      exits (readable with pstats).
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import atexit
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+STAGES_VARIABLE = 'SPYDERWEB_STAGES'
+ALLOCATIONS_VARIABLE = 'SPYDERWEB_ALLOCATIONS'
+PROFILE_VARIABLE = 'SPYDERWEB_PROFILE'
+
+_Function = TypeVar('_Function', bound=Callable[..., Any])
+
+
+class StageRecorder:
+    """
+        The statistics of every stage recorded while instrumentation is on.
+
+        Instance Attributes:
+        - allocations: Whether the allocations of each stage are recorded.
+        - stages: A dictionary mapping each stage name to its statistics: 'calls', 'seconds' (in total),
+          'max_seconds' and, if allocations are recorded, 'allocated_bytes' (still allocated when the stage
+          returned, in total) and 'peak_bytes' (the largest allocation above the start of a call).
+
+        Representation Invariants:
+        - all(statistics['calls'] >= 1 for statistics in self.stages.values())
+    """
+    allocations: bool
+    stages: dict[str, dict[str, float]]
+    _threads: threading.local
+    _lock: threading.Lock
+
+    def __init__(self, allocations: bool = False) -> None:
+        self.allocations = allocations
+        self.stages = {}
+        self._threads = threading.local()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def record(self, name: str) -> Iterator[None]:
+        """
+            Records one call of the stage with the given name around the body of the with statement.
+
+            Allocation peaks of nested stages are tracked with a stack, since tracemalloc keeps a single peak: the
+            peak is reset when a stage starts, and the peak seen so far is handed to the enclosing stage. Each thread
+            has its own stack, since stages nest within a thread.
+        """
+        peaks = self._peaks()
+        if self.allocations:
+            if peaks:
+                peaks[-1] = max(peaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            start_bytes = tracemalloc.get_traced_memory()[0]
+            peaks.append(start_bytes)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            if self.allocations:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, peaks.pop())
+                if peaks:
+                    peaks[-1] = max(peaks[-1], peak)
+            with self._lock:
+                statistics = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+                statistics['calls'] += 1
+                statistics['seconds'] += seconds
+                statistics['max_seconds'] = max(statistics['max_seconds'], seconds)
+                if self.allocations:
+                    statistics['allocated_bytes'] = statistics.get('allocated_bytes', 0) + current - start_bytes
+                    statistics['peak_bytes'] = max(statistics.get('peak_bytes', 0), peak - start_bytes)
+
+    def _peaks(self) -> list[int]:
+        """
+            Returns the allocation peak stack of the current thread: the peak so far of each stage it is running,
+            innermost last.
+        """
+        if not hasattr(self._threads, 'peaks'):
+            self._threads.peaks = []
+        return self._threads.peaks
+
+    def merge(self, other: 'StageRecorder') -> None:
+        """
+            Adds the statistics of another recorder to this one.
+        """
+        theirs_by_name = other.report()['stages']
+        with self._lock:
+            for name, theirs in theirs_by_name.items():
+                ours = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+                for key, value in theirs.items():
+                    ours[key] = max(ours.get(key, 0), value) if key in ('max_seconds', 'peak_bytes') \
+                        else ours.get(key, 0) + value
+
+    def report(self) -> dict:
+        """
+            Returns the statistics of every stage as a JSON serializable dictionary.
+        """
+        with self._lock:
+            return {'allocations': self.allocations, 'stages': {name: dict(statistics)
+                                                                for name, statistics in self.stages.items()}}
+
+
+_recorder: Optional[StageRecorder] = None
+_profiling = False
+
+
+def enabled() -> bool:
+    """
+        Returns whether stages are being recorded.
+    """
+    return _recorder is not None
+
+
+def stage(name: str) -> contextlib.AbstractContextManager:
+    """
+        Returns a context manager that records one call of the stage with the given name around the body of a with
+        statement if stages are being recorded, and does nothing otherwise.
+    """
+    return _NOT_RECORDING if _recorder is None else _recorder.record(name)
+
+
+def timed(name: str) -> Callable[[_Function], _Function]:
+    """
+        Returns a decorator that records every call of the decorated function as the stage with the given name
+        while stages are being recorded.
+    """
+    def decorator(function: _Function) -> _Function:
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _recorder is None:
+                return function(*args, **kwargs)
+            with _recorder.record(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def report() -> Optional[dict]:
+    """
+        Returns the statistics of every stage recorded so far, or None if stages are not being recorded. See
+        StageRecorder.report.
+    """
+    return None if _recorder is None else _recorder.report()
+
+
+@contextlib.contextmanager
+def instrumented(allocations: bool = False, profile_file: Optional[str] = None) -> Iterator[dict]:
+    """
+        Records the stages run in the body of the with statement, and returns a dictionary that is filled with
+        their statistics (see StageRecorder.report) when the body finishes. If allocations is True, allocations
+        are recorded too. If profile_file is given, the body is also run under cProfile and its statistics are
+        written to profile_file, unless the process is already being profiled.
+
+        The stages are also added to the statistics of the enclosing instrumented block, or of the process when
+        stages are recorded for the whole process.
+    """
+    global _recorder, _profiling
+    outer = _recorder
+    _recorder = StageRecorder(allocations)
+    tracing = allocations and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    profiler = None
+    if profile_file is not None and not _profiling:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        _profiling = True
+        profiler.enable()
+    result = {}
+    try:
+        yield result
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            _profiling = False
+            profiler.dump_stats(profile_file)
+        if tracing:
+            tracemalloc.stop()
+        recorder, _recorder = _recorder, outer
+        if outer is not None:
+            outer.merge(recorder)
+        result.update(recorder.report())
+        result['profile_file'] = profile_file if profiler is not None else None
+
+
+def _enable_from_environment() -> None:
+    """
+        Turns instrumentation on for the whole process if the environment variables ask for it, and registers
+        writing the report and the profile when the process exits.
+    """
+    global _recorder, _profiling
+    stages_value = os.environ.get(STAGES_VARIABLE, '')
+    profile_file = os.environ.get(PROFILE_VARIABLE, '')
+    if stages_value not in ('', '0'):
+        allocations = os.environ.get(ALLOCATIONS_VARIABLE, '') == '1'
+        if allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _recorder = StageRecorder(allocations)
+        if stages_value != '1':
+            atexit.register(_write_report, stages_value)
+    if profile_file != '':
+        import cProfile
+
+        profiler = cProfile.Profile()
+        _profiling = True
+        profiler.enable()
+        atexit.register(_write_profile, profiler, profile_file)
+
+
+def _write_report(file_name: str) -> None:
+    """
+        Writes the report of the process's stages to a JSON file.
+    """
+    if _recorder is not None:
+        with open(file_name, 'w', encoding='utf-8') as report_file:
+            json.dump(_recorder.report(), report_file, indent=2)
+
+
+def _write_profile(profiler: Any, file_name: str) -> None:
+    """
+        Stops the process's profiler and writes its statistics to a file.
+    """
+    profiler.disable()
+    profiler.dump_stats(file_name)
+
+
+_NOT_RECORDING = contextlib.nullcontext()
+_enable_from_environment()
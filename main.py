@@ -6,14 +6,38 @@
     Refer to each function's docstring for more detailed information on each
     of the functions and its purpose.
 
+    networkx and matplotlib are only imported by the functions that build or draw
+    graphs, so the eligibility functions can be used without loading them.
+
+    Loading the data, building, colouring and drawing the graph are recorded as stages
+    by the instrumentation module when it is turned on.
+
 
     This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
 """
 from dataclasses import dataclass
+from typing import Iterable, Optional, TYPE_CHECKING
 import core_classes as cc
 import course_scrapper
-import networkx as nx
-import matplotlib.pyplot as plt
+import graph_layout
+import instrumentation
+import program_rules
+import requisite_expressions
+from course_ids import COURSE_IDS
+from equivalence_groups import EQUIVALENCE_GROUPS
+from reachability import ReachabilityIndex
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+# The catalog used by the functions below when no courses are given to them. It is empty until load_course_data
+# is called (or it is assigned), so the functions can be imported and used without running this file.
+course_data: dict[str, cc.Course] = {}
+
+# CSC courses that are not drawn as their own node; the first year courses among them are drawn as a group node.
+GRAPH_REMOVED_COURSES = ['CSC110Y1', 'CSC111H1', 'CSC108H1', 'CSC148H1', 'CSC165H1', 'CSC399Y1', 'CSC399H1',
+                         'CSC398Y0', 'CSC398H0', 'CSC396Y0', 'CSC495H1', 'CSC494Y1', 'CSC494H1', 'CSC491H1',
+                         'CSC490H1', 'CSC199H1', 'CSC197H1', 'CSC196H1']
 
 
 @dataclass
@@ -31,109 +55,152 @@ class Program:
     courses: dict[str, cc.Course]
     student: cc.Student
 
-    def create_graph(self, g: nx.DiGraph) -> None:
+    @instrumentation.timed('create_graph')
+    def create_graph(self, g: 'nx.DiGraph', incremental: bool = True, targets: Optional[Iterable[str]] = None) \
+            -> None:
         """
             Builds a directed graph from student data and course data. The nodes of the graph represent courses
             while the edges represent prerequisites.
 
             Edges are coloured red if the prerequisites are not met, and coloured green if they are met.
+
+            An edge is left out when its course is already reachable from its prerequisite. When incremental is True
+            this is answered from a ReachabilityIndex kept up to date as edges are added, otherwise each edge runs
+            nx.node_connectivity on the graph. Both modes build the same graph.
+
+            If targets is given, only the target nodes and their ancestors (see ancestor_nodes) are added, which
+            builds the subgraph of the whole graph on those nodes without visiting the rest of the catalog's
+            prerequisites. Raises a ValueError if a target is not a node of the whole graph.
         """
-        for course in self.courses:
-            if course[:3] == 'CSC':
-                g.add_node(course)
-        to_remove = ['CSC110Y1', 'CSC111H1', 'CSC108H1', 'CSC148H1', 'CSC165H1', 'CSC399Y1', 'CSC399H1', 'CSC398Y0',
-                     'CSC398H0', 'CSC396Y0', 'CSC495H1', 'CSC494Y1', 'CSC494H1', 'CSC491H1', 'CSC490H1', 'CSC199H1',
-                     'CSC197H1', 'CSC196H1']
-        g.remove_nodes_from(to_remove)
-        g.add_node('(CSC110Y1, CSC111H1)/\n(CSC108H1, CSC148H1, CSC165H1)')
-
-        prereq_courses = ['(MAT135H1, MAT136H1)/\nMAT137Y1/MAT157Y1', 'MAT221H1/MAT223H1/\nMAT240H1',
-                          'MAT235Y1/MAT237Y1/\nMAT257Y1', 'STA237H1/STA247H1/\nSTA255H1/STA257H1']
-        for course in prereq_courses:
-            if course == '(MAT135H1, MAT136H1)/\nMAT137Y1/MAT157Y1':
-                g.add_node(course)
-            else:
-                g.add_node(course)
+        if targets is not None:
+            g.add_nodes_from(ancestor_nodes(self.courses, targets))
+        else:
+            for course in self.courses:
+                if course[:3] == 'CSC':
+                    g.add_node(course)
+            g.remove_nodes_from(GRAPH_REMOVED_COURSES)
+            for group in EQUIVALENCE_GROUPS.groups():
+                if group.node is not None:
+                    g.add_node(group.node)
 
         courses_taken = create_student_mapping(self.student)
         edges = get_edges(self.courses, courses_taken, g)
-        for edge in edges:
-            if nx.node_connectivity(g, edge[1], edge[0]) == 0:
-                g.add_edge(edge[1], edge[0], color=edges[edge])
+        with instrumentation.stage('create_graph.add_edges'):
+            if incremental:
+                reachability = ReachabilityIndex()
+                for edge in edges:
+                    if not reachability.reaches(edge[1], edge[0]):
+                        reachability.add_edge(edge[1], edge[0])
+                        g.add_edge(edge[1], edge[0], color=edges[edge])
+            else:
+                import networkx as nx
+                for edge in edges:
+                    if nx.node_connectivity(g, edge[1], edge[0]) == 0:
+                        g.add_edge(edge[1], edge[0], color=edges[edge])
 
 
-def get_edges(courses: dict[str, cc.Course], student_data: dict[str, cc.Record], g: nx.DiGraph) \
+def ancestor_nodes(courses: dict[str, cc.Course], targets: Iterable[str]) -> list[str]:
+    """
+        Returns the given nodes of the prerequisite graph built by Program.create_graph and every node with a path to
+        one of them, in the order the whole graph has them. Only the prerequisites of the returned nodes are read.
+        Raises a ValueError if a target is not a node of the whole graph.
+
+        Every edge of the whole graph between two of these nodes is kept by create_graph when it builds the graph of
+        only these nodes: an edge is only left out when a path of earlier edges already connects its ends, and every
+        node on such a path is an ancestor of the edge's course.
+    """
+    def is_node(node: str) -> bool:
+        return EQUIVALENCE_GROUPS.node_group_id(node) is not None \
+            or (node in courses and node[:3] == 'CSC' and node not in removed)
+
+    removed = set(GRAPH_REMOVED_COURSES)
+    found = set()
+    stack = []
+    for target in targets:
+        if not is_node(target):
+            raise ValueError
+        if target not in found:
+            found.add(target)
+            stack.append(target)
+    while stack:
+        node = stack.pop()
+        node_group_id = EQUIVALENCE_GROUPS.node_group_id(node)
+        if node_group_id is not None:
+            prerequisites = EQUIVALENCE_GROUPS.group(node_group_id).prerequisites
+        else:
+            prerequisites = courses[node].prerequisites
+        for prerequisite in prerequisites:
+            group_id = EQUIVALENCE_GROUPS.group_id(prerequisite)
+            if group_id is not None and EQUIVALENCE_GROUPS.group(group_id).node is not None:
+                prerequisite = EQUIVALENCE_GROUPS.group(group_id).node
+            elif not is_node(prerequisite):
+                continue
+            if prerequisite not in found:
+                found.add(prerequisite)
+                stack.append(prerequisite)
+    group_nodes = [group.node for group in EQUIVALENCE_GROUPS.groups() if group.node in found]
+    return [course for course in courses if course in found] + group_nodes
+
+
+@instrumentation.timed('get_edges')
+def get_edges(courses: dict[str, cc.Course], student_data: dict[str, cc.Record], g: 'nx.DiGraph') \
         -> dict[tuple[str, str], str]:
     """
         Returns a dictionary mapping edges with their corresponding relationship.
 
         Each tuple key has a str value indicating whether the colour of the edge should be red or green.
         Red edges represent unfulfilled prerequisites, while green edges represent fulfilled prerequisites.
+        The colour of each edge is decided by the rule edge_rules gives it.
 
         Preconditions:
         - courses != {}
         - student_data != {}
     """
     edges = {}
-    for course in g.nodes():
+    satisfied = EQUIVALENCE_GROUPS.satisfied_mask(COURSE_IDS.mask(student_data))
+    for edge, (prerequisite, group_id) in edge_rules(courses, g).items():
+        if (prerequisite in student_data) and (student_data[prerequisite].grade >= 50.0):
+            edges[edge] = 'g'
+        elif group_id is not None and satisfied >> group_id & 1:
+            edges[edge] = 'g'
+        else:
+            edges[edge] = 'r'
+
+    return edges
 
-        if course in ['(CSC110Y1, CSC111H1)/\n(CSC108H1, CSC148H1, CSC165H1)',
-                      '(MAT135H1, MAT136H1)/\nMAT137Y1/MAT157Y1', 'MAT221H1/MAT223H1/\nMAT240H1']:
-            prerequisites = []
-        elif course in ['MAT235Y1/MAT237Y1/\nMAT257Y1']:
-            prerequisites = ['MAT135H1', 'MAT136H1', 'MAT137Y1', 'MAT157Y1']
-        elif course in ['STA237H1/STA247H1/\nSTA255H1/STA257H1']:
-            prerequisites = ['MAT135H1', 'MAT136H1', 'MAT137Y1', 'MAT157Y1']
+
+def edge_rules(courses: dict[str, cc.Course], g: 'nx.DiGraph') -> dict[tuple[str, str], tuple[str, Optional[int]]]:
+    """
+        Returns a dictionary mapping the (course, prerequisite node) edges of the graph's nodes to the rule that
+        colours them: the prerequisite whose passing grade (at least 50) makes the edge green, and the ID of the
+        equivalence group whose completion also makes it green, or None. When several prerequisites of a course
+        are drawn as the same group node, the last one decides the edge.
+
+        The rules only depend on the catalog and the graph's nodes, so they are the same for every student.
+    """
+    rules = {}
+    for course in g.nodes():
+        node_group_id = EQUIVALENCE_GROUPS.node_group_id(course)
+        if node_group_id is not None:
+            prerequisites = EQUIVALENCE_GROUPS.group(node_group_id).prerequisites
         else:
             prerequisites = courses[course].prerequisites
 
         for prerequisite in prerequisites:
-            if prerequisite in g.nodes or prerequisite in ['CSC110Y1', 'CSC111H1', 'CSC108H1', 'CSC148H1', 'CSC165H1',
-                                                           'MAT135H1', 'MAT136H1', 'MAT137Y1', 'MAT157Y1',
-                                                           'MAT221H1', 'MAT223H1', 'MAT240H1',
-                                                           'STA237H1', 'STA247H1', 'STA255H1', 'STA257H1']:
-
-                if prerequisite in ['CSC110Y1', 'CSC111H1', 'CSC108H1', 'CSC148H1', 'CSC165H1']:
-                    to_add = '(CSC110Y1, CSC111H1)/\n(CSC108H1, CSC148H1, CSC165H1)'
-                elif prerequisite in ['MAT135H1', 'MAT136H1', 'MAT137Y1', 'MAT157Y1']:
-                    to_add = '(MAT135H1, MAT136H1)/\nMAT137Y1/MAT157Y1'
-                elif prerequisite in ['MAT221H1', 'MAT223H1', 'MAT240H1']:
-                    to_add = 'MAT221H1/MAT223H1/\nMAT240H1'
-                elif prerequisite in ['MAT235Y1', 'MAT237Y1', 'MAT257Y1']:
-                    to_add = 'MAT235Y1/MAT237Y1/\nMAT257Y1'
-                elif prerequisite in ['STA237H1', 'STA247H1', 'STA255H1', 'STA257H1']:
-                    to_add = 'STA237H1/STA247H1/\nSTA255H1/STA257H1'
-                else:
-                    to_add = prerequisite
-
-                if (prerequisite in student_data) and (student_data[prerequisite].grade >= 50.0):
-                    edges[(course, to_add)] = 'g'
-                elif (prerequisite in ['CSC110Y1', 'CSC111H1', 'CSC108H1', 'CSC148H1', 'CSC165H1']) \
-                        and (('CSC110Y1' in student_data and 'CSC111H1' in student_data)
-                             or 'CSC108H1' and 'CSC148H1' and 'CSC165H1' in student_data):
-                    edges[(course, to_add)] = 'g'
-                elif (prerequisite in ['MAT135H1', 'MAT136H1', 'MAT137Y1', 'MAT157Y1']) \
-                        and (('MAT135H1' in student_data and 'MAT136H1' in student_data)
-                             or ('MAT137Y1' in student_data) or ('MAT157Y1' in student_data)):
-                    edges[(course, to_add)] = 'g'
-                elif (prerequisite in ['MAT221H1', 'MAT223H1', 'MAT240H1']) \
-                        and (('MAT221H1' in student_data) or ('MAT223H1' in student_data)
-                             or ('MAT240H1' in student_data)):
-                    edges[(course, to_add)] = 'g'
-                elif (prerequisite in ['MAT235Y1', 'MAT237Y1', 'MAT257Y1']) \
-                        and (('MAT235Y1' in student_data) or ('MAT237Y1' in student_data)
-                             or ('MAT257Y1' in student_data)):
-                    edges[(course, to_add)] = 'g'
-                elif (prerequisite in ['STA237H1', 'STA247H1', 'STA255H1', 'STA257H1']) \
-                        and (('STA237H1' in student_data) or ('STA247H1' in student_data)
-                             or ('STA255H1' in student_data) or ('STA257H1' in student_data)):
-                    edges[(course, to_add)] = 'g'
-                else:
-                    edges[(course, to_add)] = 'r'
+            group_id = EQUIVALENCE_GROUPS.group_id(prerequisite)
+            if group_id is not None and EQUIVALENCE_GROUPS.group(group_id).node is not None:
+                to_add = EQUIVALENCE_GROUPS.group(group_id).node
+            elif prerequisite in g.nodes:
+                to_add = prerequisite
+                group_id = None
+            else:
+                continue
+            rules[(course, to_add)] = (prerequisite, group_id)
 
-    return edges
+    return rules
 
 
+@instrumentation.timed('create_course_mapping')
 def create_course_mapping(lst: list) -> dict[str, cc.Course]:
     """
         Creates a dictionary mapping course codes to Course objects.
@@ -147,126 +214,107 @@ def create_course_mapping(lst: list) -> dict[str, cc.Course]:
     return courses
 
 
-def add_course_info(student: cc.Student, course: str, grade: int, weight: float) -> None:
+def load_course_data(file_name: str = course_scrapper.CSV_FILE) -> dict[str, cc.Course]:
+    """
+        Reads the course data CSV file written by course_scrapper.py, makes it the catalog used by the functions of
+        this module when no courses are given to them, and returns it.
+    """
+    global course_data
+    course_data = create_course_mapping(course_scrapper.read_from_csv(file_name))
+    return course_data
+
+
+def add_course_info(student: cc.Student, course: str, grade: int, weight: float,
+                    courses: Optional[dict[str, cc.Course]] = None) -> None:
     """
         Adds a Record object to the student's academic record. Raises a ValueError if the input course code is not in
-        the dataset.
+        the dataset (courses, or course_data if courses is None).
 
         Preconditions:
         - course != ''
         - 0 <= grade <= 100
     """
-    if course not in course_data:
+    if courses is None:
+        courses = course_data
+    if course not in courses:
         raise ValueError
-    record = cc.Record(course_data[course], grade, weight)
-    student.academic_history.append(record)
+    record = cc.Record(courses[course], grade, weight)
+    student.add_record(record)
 
 
 def create_student_mapping(student: cc.Student) -> dict[str, cc.Record]:
     """
         Creates a dictionary mapping the student's completed course code to their record for that course.
+
+        The dictionary is shared with the student's index and must not be modified.
     """
-    course_mapping = {}
-    for record in student.academic_history:
-        course_mapping[record.course_taken.course_code] = record
-    return course_mapping
+    return student.index.records
 
 
-def visualize_graph(g: nx.DiGraph) -> None:
+def create_student_mask(student: cc.Student) -> int:
+    """
+        Creates a bitmask over course_ids.COURSE_IDS of the student's completed courses.
+    """
+    return student.index.completed
+
+
+def visualize_graph(g: 'nx.DiGraph', pos: Optional[dict[str, tuple[float, float]]] = None) -> None:
     """
         Visualizes the directed graph. Nodes represent courses and edges represent prerequsites.
         Green edges represent fulfilled prerequisites and red edges represent unfulfilled prerequisites.
-        Calculates the positions of course nodes based on the course's level.
-        300 and 400 level courses each have 2 layers, while 100 and 200 level courses each have 1 layer.
+        Unless positions are given, the course nodes are placed with graph_layout's layered layout, with every
+        course below its prerequisites. The layout is cached by the graph's structure, so drawing the same
+        catalog for another student reuses it.
 
         Note: please fullscreen the Matplotlib window.
     """
-    pos = {}
-    count2, count3, count3_2, count4, count4_2 = 0, 0, 0, 0, 0
-    for node in g.nodes():
-        if node[3] == '2':
-            count2 += 1
-        elif node[3:5] == '30' or node[3:5] == '31':
-            count3 += 1
-        elif node[3] == '3':
-            count3_2 += 1
-        elif node[3:5] == '40' or node[3:5] == '41' or node[3:5] == '42' or node[3:5] == '43' or node[3:5] == '44':
-            count4 += 1
-        elif node[3:5] == '45' or node[3:5] == '46' or node[3:5] == '47' or node[3:5] == '48' or node[3:5] == '49':
-            count4_2 += 1
-
-    counter2, counter3, counter3_2, counter4, counter4_2 = 0, 0, 0, 0, 0
-    pos['(CSC110Y1, CSC111H1)/\n(CSC108H1, CSC148H1, CSC165H1)'] = (0.25, 1)
-    pos['(MAT135H1, MAT136H1)/\nMAT137Y1/MAT157Y1'] = (0.75, 1)
-    pos['CSC104H1'] = (1, 1)
-    pos['CSC120H1'] = (0.9, 1)
-
-    for node in g.nodes():
-        if node[3] == '2':
-            pos[node] = ((1 / count2) * (counter2 + 0.5), 0.8)
-            counter2 += 1
-        elif node[3:5] == '30' or node[3:5] == '31':
-            pos[node] = ((1 / count3) * (counter3 + 0.5), 0.6)
-            counter3 += 1
-        elif node[3] == '3':
-            pos[node] = ((1 / count3_2) * (counter3_2 + 0.5), 0.4)
-            counter3_2 += 1
-        elif node[3:5] == '40' or node[3:5] == '41' or node[3:5] == '42' or node[3:5] == '43' or node[3:5] == '44':
-            pos[node] = ((1 / count4) * (counter4 + 0.5), 0.2)
-            counter4 += 1
-        elif node[3:5] == '45' or node[3:5] == '46' or node[3:5] == '47' or node[3:5] == '48' or node[3:5] == '49':
-            pos[node] = ((1 / count4_2) * (counter4_2 + 0.5), 0)
-            counter4_2 += 1
+    import networkx as nx
+    import matplotlib.pyplot as plt
 
+    if pos is None:
+        with instrumentation.stage('visualize_graph.layout'):
+            pos = graph_layout.cached_layout(g)
     colors = [g[u][v]['color'] for u, v in g.edges()]
 
-    nx.draw_networkx_nodes(g, pos, node_size=600)
-    nx.draw_networkx_labels(g, pos, font_size=5.4)
-    nx.draw_networkx_edges(g, pos, arrows=True, edge_color=colors)
+    with instrumentation.stage('visualize_graph.draw'):
+        nx.draw_networkx_nodes(g, pos, node_size=600)
+        nx.draw_networkx_labels(g, pos, font_size=5.4)
+        nx.draw_networkx_edges(g, pos, arrows=True, edge_color=colors)
 
     plt.show()
 
 
-def check_eligibility_course(course: str, student: cc.Student) -> bool:
+def check_eligibility_course(course: str, student: cc.Student,
+                             courses: Optional[dict[str, cc.Course]] = None) -> bool:
     """
         Checks if a given student is eligible to take an input course.
 
-        Note: grouped courses (e.g ['MAT135H1', 'MAT136H1', 'MAT137Y1', 'MAT157Y1']) can satisfy prerequisites if
-        the student completed one prerequisite in the group.
+        If the course has a prerequisite expression, the student is eligible when they completed the courses of
+        one of its alternatives, which is checked against the expression's compiled bitmasks (see
+        requisite_expressions). Otherwise, grouped courses (e.g ['MAT135H1', 'MAT136H1', 'MAT137Y1', 'MAT157Y1']) can
+        satisfy prerequisites if the student completed one option of the group. The groups are registered in
+        equivalence_groups.EQUIVALENCE_GROUPS. Either way, a completed course meets a prerequisite with the same
+        first 6 characters (e.g. CSC148H5 meets CSC148H1). Raises a ValueError if the course is not in the dataset
+        (courses, or course_data if courses is None).
     """
-    if course not in course_data:
+    if courses is None:
+        courses = course_data
+    if course not in courses:
         raise ValueError
+    elif courses[course].prerequisite_expression != '':
+        return requisite_expressions.is_met(courses[course].prerequisite_expression,
+                                            requisite_expressions.stem_completion(student.index.stems))
     else:
-        courses = create_student_mapping(student)
-        courses_trimmed = [x[:6] for x in courses]
-        prerequisites = course_data[course].prerequisites
+        index = student.index
+        courses_trimmed = index.stems
+        satisfied = EQUIVALENCE_GROUPS.satisfied_mask(index.completed)
 
-        for prerequisite in prerequisites:
-            if (prerequisite == '') or (prerequisite[:6] in courses_trimmed):
+        for prerequisite in courses[course].prerequisites:
+            group_id = EQUIVALENCE_GROUPS.group_id(prerequisite)
+            if (prerequisite == '') or (prerequisite[:6] in courses_trimmed) or group_id is None:
                 ...
-            elif prerequisite in ['CSC110Y1', 'CSC111H1', 'CSC108H1', 'CSC148H1', 'CSC165H1']:
-                if not ('CSC110Y1' in courses and 'CSC111H1' in courses) and \
-                        not ('CSC108H1' in courses and 'CSC148H1' in courses and 'CSC165H1' in courses):
-                    return False
-            elif prerequisite in ['MAT135H1', 'MAT136H1', 'MAT137Y1', 'MAT157Y1']:
-                if not (('MAT135H1' in courses) and ('MAT136H1' in courses)) and \
-                        not (('MAT137Y1' in courses) or ('MAT157Y1' in courses)):
-                    return False
-            elif prerequisite in ['MAT221H1', 'MAT223H1', 'MAT240H1']:
-                if not (any(x in courses for x in ['MAT221H1', 'MAT223H1', 'MAT240H1'])):
-                    return False
-            elif prerequisite in ['MAT235Y1', 'MAT237Y1', 'MAT257Y1']:
-                if not (any(x in courses for x in ['MAT235Y1', 'MAT237Y1', 'MAT257Y1'])):
-                    return False
-            elif prerequisite in ['STA237H1', 'STA247H1', 'STA255H1', 'STA257H1']:
-                if not (any(x in courses for x in ['STA237H1', 'STA247H1', 'STA255H1', 'STA257H1'])):
-                    return False
-            elif prerequisite in ['CSC236H1', 'CSC240H1']:
-                if not (any(x in courses for x in ['CSC236H1', 'CSC240H1'])):
-                    return False
-            elif prerequisite in ['CSC263H1', 'CSC265H1']:
-                if not (any(x in courses for x in ['CSC263H1', 'CSC265H1'])):
-                    return False
+            elif not satisfied >> group_id & 1:
+                return False
         return True
 
 
@@ -275,90 +323,19 @@ def get_FCE_count(student: cc.Student) -> float:
         Returns the total number of full course equivalents(FCE's) obtained by a student using their
         academic history
     """
-    fce_so_far = 0
-    for course in student.academic_history:
-        if course.course_taken.course_code[6] == 'H':
-            fce_so_far += 0.5
-        else:
-            fce_so_far += 1
-    return fce_so_far
+    return student.index.fce
 
 
 def check_eligibility_program(degree: str, student: cc.Student) -> bool:
     """
         Checks whether a student has completed all the requirements for the computer science major or specialist program
         depending on which is specified, returning true if they are eligible and false if they are missing requirements.
-        (The checks are done thorugh if statements representing each year)
+        The requirements are declared in program_rules.PROGRAM_REQUIREMENTS.
+
         Preconditions:
         - degree == 'major' or degree == 'specialist'
     """
-    s_c = []  # s_c is student courses
-    for course in student.academic_history:
-        s_c.append(course.course_taken.course_code)
-    if degree == 'major':
-        if not ((('CSC108H1' in s_c and 'CSC148H1' in s_c and ('CSC165H1' in s_c or 'CSC240H1' in s_c)) or (
-                'CSC110Y1' in s_c and 'CSC111H1' in s_c)) and (
-                        'Mat137Y1' in s_c or 'MAT157Y1' in s_c or ('Mat135H1 in s_c' and 'MAT136H1' in s_c))):
-            return False
-        elif not ('CSC207H1' in s_c and ('CSC236H1' in s_c or 'CSC240H1' in s_c) and 'CSC258H1' in s_c and (
-                'CSC263H1' in s_c or 'CSC265H1' in s_c) and (
-                          'STA247H1' in s_c or 'STA237H1' in s_c or 'STA255H1' in s_c or 'STA257H1' in s_c)):
-            return False
-        later_year_credits = 0
-        for course in s_c:
-            if course[:4] == 'CSC2' or course[:4] == 'CSC3' or course[:4] == 'CSC4' or course == 'MAT223H1' \
-                    or course == 'MAT240H1' or course == 'MAT235Y1' or course == 'MAT237Y1' or course == 'MAT257Y1' or \
-                    course == 'STA414H1' or ((course[:4] == 'MAT3' or course[:4] == 'MAT4') and course not in
-                                             {'MAT329Y1', 'MAT390H1', 'MAT391H1'}):
-                if course[6] == 'H':
-                    later_year_credits += 0.5
-                else:
-                    later_year_credits += 1.0
-        if not (later_year_credits >= 3.0 and any(course[:4] == 'CSC4' for course in s_c) and any(
-                course[3] == '4' for course in s_c) and any(
-            course == 'MAT223H1' or course == 'MAT240H1' for course in s_c) and
-                any(course == 'MAT235Y1' or course == 'MAT237Y1' or course == 'MAT257Y1' for course in s_c)):
-            return False
-        return True
-    else:
-        if not ((('CSC108H1' in s_c and 'CSC148H1' in s_c and ('CSC165H1' in s_c or 'CSC240H1' in s_c)) or (
-                'CSC110Y1' in s_c and 'CSC111H1 in s_c')) and (
-                        'Mat137Y1' in s_c or 'MAT157Y1' in s_c or ('Mat135H1' in s_c and 'MAT136H1' in s_c))):
-            return False
-        elif not ('CSC207H1' in s_c and 'CSC209H1' in s_c and (
-                'CSC236H1' in s_c or 'CSC240H1' in s_c) and 'CSC258H1' in s_c and (
-                          'CSC263H1' in s_c or 'CSC265H1' in s_c) and ('MAT223H1' in s_c or 'MAT240H1' in s_c) and (
-                          'STA247H1' in s_c or 'STA237H1' in s_c or 'STA255H1' in s_c or 'STA257H1' in s_c)):
-            return False
-        later_year_credits = 0
-        csc_4_credits = 0
-        mat_sta_credits = 0
-        for course in s_c:
-            if course[:4] == 'CSC3' or course == 'CSC369H1' or course == 'CSC373H1' or \
-                    course[:4] == 'CSC4' or course == 'MAT224H1' or course == 'MAT247H1' or course == 'MAT235Y1' or \
-                    course == 'MAT237Y1' or course == 'MAT257Y1' or course == 'STA248H1' or course == 'STA238H1' or \
-                    course == 'STA261H1' or course[:4] == 'STA3' or course[:4] == 'STA4' or \
-                    ((course[:4] == 'MAT3' or course[:4] == 'MAT4') and course not in
-                     {'MAT329Y1', 'MAT390H1', 'MAT391H1'}):
-                if course[6] == 'H':
-                    later_year_credits += 0.5
-                else:
-                    later_year_credits += 1.0
-                if course[:4] == 'CSC4':
-                    if course[6] == 'H':
-                        csc_4_credits += 0.5
-                    else:
-                        csc_4_credits += 1.0
-                if course[:3] == 'MAT' or course[:3] == 'STA':
-                    if course[6] == 'H':
-                        mat_sta_credits += 0.5
-                    else:
-                        mat_sta_credits += 1.0
-        if not (later_year_credits >= 6.0 and any(
-                course == 'MAT235Y1' or course == 'MAT237Y1' or course == 'MAT257Y1' for course in
-                s_c) and csc_4_credits >= 1.5 and (later_year_credits - mat_sta_credits) >= 4.0):
-            return False
-        return True
+    return program_rules.PROGRAM_RULES[('computer science', degree)].is_met(create_student_mask(student))
 
 
 def check_eligibility_focus(focus: str, student: cc.Student) -> bool:
@@ -368,132 +345,17 @@ def check_eligibility_focus(focus: str, student: cc.Student) -> bool:
         the degree or returns False if missing certain requirements. Note that the specific
         degree type(major/specialist) does not matter here as some focuses are only available
         for the specialist and for those found in both types, the requirements are identical.
-        Also note that only MAT, CSC, and STA courses were included in the requirements.
+        Also note that only MAT, CSC, and STA courses were included in the requirements, which are declared in
+        program_rules.FOCUS_REQUIREMENTS. Raises a ValueError if the focus does not exist.
 
         Preconditions:
         - focus in {'scientific computing', 'game design', 'computer vision', 'computational linguistics and natural
           language processing', 'artificial intelligence', 'web and internet technologies', 'theory of computation',
           'human-computer interaction', 'computer systems'}
-        - degree == 'major' or degree == 'specialist'
     """
-    s_c = []  # s_c is student courses
-    for course in student.academic_history:
-        s_c.append(course.course_taken.course_code)
-    if focus == 'scientific computing':
-        category_2_counter = 0
-        category_3_counter = 0
-        for course in s_c:
-            if (course == 'CSC336H1' or course == 'CSC436H1' or course == 'CSC446H1' or course == 'CSC456H1'
-                    or course == 'CSC466H1'):
-                category_2_counter += 0.5
-            elif (course == 'CSC317H1' or course == 'CSC320H1' or course == 'CSC417H1' or course == 'CSC418H1' or
-                  course == 'CSC419H1' or course == 'CSC311H1' or course == 'CSC411H1' or course == 'CSC343H1' or
-                  course == 'CSC384H1' or course == 'CSC358H1' or course == 'CSC457H1' or course == 'CSC458H1'):
-                category_3_counter += 0.5
-        if not (any(course == 'MAT235Y1' or course == 'MAT237Y1' or course == 'MAT257Y1' for course in
-                    s_c) and category_2_counter >= 1.5 and category_3_counter >= 1.0):
-            return False
-        else:
-            return True
-    elif focus == 'game design':
-        if not ('CSC300H1' in s_c and 'CSC301H1' in s_c and 'CSC318H1' in s_c and 'CSC384H1' in s_c and
-                ('CSC317H1' in s_c or 'CSC417H1' in s_c or 'CSC418H1' in s_c or 'CSC419H1' in s_c)
-                and 'CSC404H1' in s_c):
-            return False
-        else:
-            return True
-    elif focus == 'computer vision':
-        if not (('MAT235Y1' in s_c or 'MAT237Y1' in s_c or 'MAT257Y1' in s_c) and 'CSC320H1' in s_c
-                and 'CSC336H1' in s_c and ('CSC311H1' in s_c or 'CSC411H1' in s_c) and 'CSC420H1' in s_c and
-                ('CSC412H1' in s_c or 'CSC417H1' in s_c or 'CSC317H1' in s_c or 'CSC418H1' in s_c or 'CSC419H1' in s_c
-                 or 'CSC2503H' in s_c)):
-            return False
-        else:
-            return True
-    elif focus == 'computational linguistics and natural language processing':
-        category_4_counter = 0
-        for course in s_c:
-            if course in {'CSC309H1', 'CSC413H1', 'CSC421H1', 'CSC321H1', 'CSC311H1', 'CSC411H1', 'CSC428H1',
-                          'CSC486H1'}:
-                category_4_counter += 0.5
-        if not ('CSC318H1' in s_c and 'CSC401H1' in s_c and 'CSC485H1' in s_c and category_4_counter >= 1.5):
-            return False
-        else:
-            return True
-    elif focus == 'artificial intelligence':
-        category_1_counter = 0
-        category_2_counter = 0
-        for course in s_c:
-            if course in {'CSC336H1', 'MAT235Y1', 'MAT237Y1', 'MAT257Y1', 'MAT224H1', 'MAT247H1', 'STA238H1',
-                          'STA248H1', 'STA261H1', 'STA302H1', 'STA347H1'}:
-                if course[6] == 'H':
-                    category_1_counter += 0.5
-                else:
-                    category_1_counter += 1.0
-            elif course in {'CSC401H1', 'CSC485H1', 'CSC320H1', 'CSC420H1', 'CSC413H1', 'CSC421H1', 'CSC321H1',
-                            'CSC311H1',
-                            'CSC411H1', 'STA314H1', 'CSC412H1', 'STA414H1', 'CSC304H1', 'CSC384H1', 'CSC486H1'}:
-                category_2_counter += 0.5
-        if not (category_1_counter >= 1.0 and category_2_counter >= 2.5):
-            return False
-        else:
-            return True
-    elif focus == 'web and internet technologies':
-        if not (('STA238H1' in s_c or 'STA248H1' in s_c or 'STA261H1' in s_c) and 'CSC309H1' in s_c and 'CSC343H1' in
-                s_c and ('CSC358H1' in s_c or 'CSC457H1' in s_c) and 'CSC458H1' in s_c and
-                ('CSC311H1' in s_c or 'CSC411H1' in s_c) and
-                ('CSC367H1' in s_c or 'CSC443H1' in s_c or 'CSC469H1' in s_c)):
-            return False
-        else:
-            return True
-    elif focus == 'theory of computation':
-        category_3_counter = 0
-        category_4_counter = 0
-        for course in s_c:
-            if course in {'CSC304H1', 'CSC336H1', 'CSC438H1', 'CSC448H1', 'CSC473H1', 'MAT309H1', 'MAT332H1',
-                          'MAT344H1'}:
-                category_3_counter += 0.5
-            elif course in {'MAT224H1', 'MAT247H1', 'MAT237Y1' 'MAT257Y1', 'MAT244H1', 'MAT267H1', 'MAT301H1',
-                            'MAT347Y1',
-                            'MAT315H1', 'MAT327H1', 'MAT334H1', 'MAT354H1', 'MAT335H1', 'MAT337H1', 'MAT357H1',
-                            'STA238H1', 'STA248H1', 'STA261H1', 'STA347H1'} \
-                    or course[:4] == 'MAT4':
-                if course[6] == 'H':
-                    category_4_counter += 0.5
-                else:
-                    category_4_counter += 1.0
-        if not (any(course == 'MAT137Y1' or course == 'MAT157Y1' or course == 'MAT237Y1' for course in
-                    s_c) and 'CSC463H1' in s_c and category_3_counter >= 2.0 and category_4_counter >= 2.0):
-            return False
-        else:
-            return True
-    elif focus == 'human-computer interaction':
-        category_3_counter = 0
-        for course in s_c:
-            if course in {'CSC309H1', 'CSC320H1', 'CSC321H1', 'CSC343H1', 'CSC384H1', 'CSC401H1', 'CSC404H1',
-                          'CSC418H1', 'CSC485H1', 'CSC490H1', 'CSC491H1'}:
-                category_3_counter += 0.5
-        if not ('CSC300H1' in s_c and 'CSC301H1' in s_c and 'CSC318H1' in s_c and 'CSC428H1' in s_c and
-                category_3_counter >= 1.0):
-            return False
-        else:
-            return True
-    else:
-        category_2_counter = 0
-        category_2_courses = []
-        category_3_counter = 0
-        for course in s_c:
-            if course in {'CSC358H1', 'CSC457H1', 'CSC443H1', 'CSC458H1'}:
-                category_2_counter += 0.5
-                category_2_courses.append(course)
-            if course in {'CSC358H1', 'CSC457H1', 'CSC458H1', 'CSC324H1', 'CSC385H1',
-                          'CSC488H1'} and course not in category_2_courses:
-                category_3_counter += 0.5
-        if not ('CSC343H1' in s_c and 'CSC367H1' in s_c and 'CSC469H1' in s_c and category_2_counter >= 1.0 and
-                category_3_counter >= 1.0):
-            return False
-        else:
-            return True
+    if focus not in program_rules.FOCUS_RULES:
+        raise ValueError
+    return program_rules.FOCUS_RULES[focus].is_met(create_student_mask(student))
 
 
 def get_requirements(program: str, degree_type: str, student: cc.Student) -> str:
@@ -501,9 +363,9 @@ def get_requirements(program: str, degree_type: str, student: cc.Student) -> str
         Given the program/focus, returns the missing requirements to
         complete the program. For the computer science major/specialist, the
         year corresponding to the missing credits will be returned and for
-        the focus, the category/group of courses missing will be returned. Note
-        that since there are multiple pathways to completing the requirements,
-        specific courses will not be returned but only the year or group of courses
+        the focus, each missing course, group of courses or credit count will be returned.
+        The explanation is produced from the same compiled rules used by check_eligibility_program
+        and check_eligibility_focus. Raises a ValueError if the program does not exist.
 
         Preconditions:
         - program in {'computer science', 'scientific computing', 'game design', 'computer vision', 'computational
@@ -511,330 +373,36 @@ def get_requirements(program: str, degree_type: str, student: cc.Student) -> str
           'theory of computation', 'human-computer interaction', 'computer systems'}
         - degree_type == 'major' or degree_type == 'specialist'
     """
-    s_c = []
-    for course in student.academic_history:
-        s_c.append(course.course_taken.course_code)
-    if program == 'computer science':
-        if degree_type == 'major':
-            if not ((('CSC108H1' in s_c and 'CSC148H1' in s_c and ('CSC165H1' in s_c or 'CSC240H1' in s_c)) or (
-                    'CSC110Y1' in s_c and 'CSC111H1' in s_c)) and (
-                            'Mat137Y1' in s_c or 'MAT157Y1' in s_c or ('Mat135H1 in s_c' and 'MAT136H1' in s_c))):
-                return 'missing first year requirements'
-            elif not ('CSC207H1' in s_c and ('CSC236H1' in s_c or 'CSC240H1' in s_c) and 'CSC258H1' in s_c and (
-                    'CSC263H1' in s_c or 'CSC265H1' in s_c) and (
-                              'STA247H1' in s_c or 'STA237H1' in s_c or 'STA255H1' in s_c or 'STA257H1' in s_c)):
-                return 'missing second year requirements'
-            later_year_credits = 0
-            for course in s_c:
-                if course[:4] == 'CSC2' or course[:4] == 'CSC3' or course[:4] == 'CSC4' or course == 'MAT223H1' or \
-                        course == 'MAT240H1' or course == 'MAT235Y1' or course == 'MAT237Y1' or course == 'MAT257Y1' or\
-                        course == 'STA414H1' or ((course[:4] == 'MAT3' or course[:4] == 'MAT4') and course not in
-                                                 {'MAT329Y1', 'MAT390H1', 'MAT391H1'}):
-                    if course[6] == 'H':
-                        later_year_credits += 0.5
-                    else:
-                        later_year_credits += 1.0
-            if not (later_year_credits >= 3.0 and any(course[:4] == 'CSC4' for course in s_c) and any(
-                    course[3] == '4' for course in s_c) and any(
-                course == 'MAT223H1' or course == 'MAT240H1' for course in s_c) and
-                    any(course == 'MAT235Y1' or course == 'MAT237Y1' or course == 'MAT257Y1' for course in s_c)):
-                return 'missing later year requirements(post second year)'
-            return 'no missing requirements, degree can be obtained'
-        else:
-            if not ((('CSC108H1' in s_c and 'CSC148H1' in s_c and ('CSC165H1' in s_c or 'CSC240H1' in s_c)) or (
-                    'CSC110Y1' in s_c and 'CSC111H1 in s_c')) and (
-                            'Mat137Y1' in s_c or 'MAT157Y1' in s_c or ('Mat135H1' in s_c and 'MAT136H1' in s_c))):
-                return 'missing first year credits'
-            elif not ('CSC207H1' in s_c and 'CSC209H1' in s_c and (
-                    'CSC236H1' in s_c or 'CSC240H1' in s_c) and 'CSC258H1' in s_c and (
-                              'CSC263H1' in s_c or 'CSC265H1' in s_c) and ('MAT223H1' in s_c or 'MAT240H1' in s_c) and (
-                              'STA247H1' in s_c or 'STA237H1' in s_c or 'STA255H1' in s_c or 'STA257H1' in s_c)):
-                return 'missing second year requirements'
-            later_year_credits = 0
-            csc_4_credits = 0
-            mat_sta_credits = 0
-            for course in s_c:
-                if course[:4] == 'CSC3' or course == 'CSC369H1' or course == 'CSC373H1' or \
-                        course[:4] == 'CSC4' or course == 'MAT224H1' or course == 'MAT247H1' or course == 'MAT235Y1' or\
-                        course == 'MAT237Y1' or course == 'MAT257Y1' or course == 'STA248H1' or course == 'STA238H1' or\
-                        course == 'STA261H1' or course[:4] == 'STA3' or course[:4] == 'STA4' or \
-                        ((course[:4] == 'MAT3' or course[:4] == 'MAT4') and course not in
-                         {'MAT329Y1', 'MAT390H1', 'MAT391H1'}):
-                    if course[6] == 'H':
-                        later_year_credits += 0.5
-                    else:
-                        later_year_credits += 1.0
-                    if course[:4] == 'CSC4':
-                        if course[6] == 'H':
-                            csc_4_credits += 0.5
-                        else:
-                            csc_4_credits += 1.0
-                    if course[:3] == 'MAT' or course[:3] == 'STA':
-                        if course[6] == 'H':
-                            mat_sta_credits += 0.5
-                        else:
-                            mat_sta_credits += 1.0
-            if not (later_year_credits >= 6.0 and any(
-                    course == 'MAT235Y1' or course == 'MAT237Y1' or course == 'MAT257Y1' for course in
-                    s_c) and csc_4_credits >= 1.5 and (later_year_credits - mat_sta_credits) >= 4.0):
-                return 'missing later year requirements(post second year)'
-            return 'no missing requirements, degree can be obtained'
-    if program == 'scientific computing':
-        category_2_counter = 0
-        category_3_counter = 0
-        for course in s_c:
-            if (course == 'CSC336H1' or course == 'CSC436H1' or course == 'CSC446H1' or course == 'CSC456H1' or
-                    course == 'CSC466H1'):
-                category_2_counter += 0.5
-            elif (course == 'CSC317H1' or course == 'CSC320H1' or course == 'CSC417H1' or course == 'CSC418H1'
-                  or course == 'CSC419H1' or course == 'CSC311H1' or course == 'CSC411H1' or course == 'CSC343H1' or
-                  course == 'CSC384H1' or course == 'CSC358H1' or course == 'CSC457H1' or course == 'CSC458H1'):
-                category_3_counter += 0.5
-        if not (any(course == 'MAT235Y1' or course == 'MAT237Y1' or course == 'MAT257Y1' for course in
-                    s_c) and category_2_counter >= 1.5 and category_3_counter >= 1.0):
-            if category_2_counter < 1.5 and category_3_counter < 1.0:
-                return 'missing ' + str(
-                    1.5 - category_2_counter) + ' credits from the following group of courses:' + \
-                    ' CSC336H1, CSC436H1, CSC446H1, CSC456H1, CSC466H1' + 'and missing' + str(1.0 - category_3_counter)\
-                    + 'credits from the following group of courses:' + ' CSC317H1 CSC320H1 CSC417H1,' + \
-                    ' CSC418H1, CSC419H1, CSC311H1, CSC411H1, CSC343H1, CSC384H1, CSC358H1, CSC457H1, CSC458H1'
-            elif category_2_counter < 1.5:
-                return 'missing ' + str(1.5 - category_2_counter) + ' credits from the following group of courses:' + \
-                    ' CSC336H1, CSC436H1, CSC446H1, CSC456H1, CSC466H1'
-            elif category_3_counter < 1.0:
-                return 'missing' + str(1.0 - category_3_counter) + 'credits from the following group of courses:' \
-                    + ' CSC317H1 CSC320H1 CSC417H1, ' \
-                      'CSC418H1, CSC419H1, CSC311H1, CSC411H1, CSC343H1, CSC384H1, CSC358H1, CSC457H1, CSC458H1'
-            else:
-                return 'missing a credit from the following list of courses:MAT235Y1, MAT237Y1, MAT257Y1'
-        else:
-            return 'no missing requirements, degree can be obtained'
-    elif program == 'game design':
-        requirement_counter = 0
-        for course in s_c:
-            if course == 'CSC300H1' or course == 'CSC301H1' or course == 'CSC318H1' or course == 'CSC384H1' or \
-                    course == 'CSC317H1' or course == 'CSC417H1' or course == 'CSC418H1' or course == 'CSC419H1' or \
-                    course == 'CSC404H1':
-                requirement_counter += 0.5
-        if requirement_counter < 3.0:
-            return 'missing ' + str(
-                3.0 - requirement_counter) + ' credits from the following group of courses that have not already ' \
-                                             'been completed: CSC300H, CSC301H1, CSC318H1, CSC384H1, CSC317H1, ' \
-                                             'CSC417H1, CSC418H1, CSC419H1, CSC404H1'
-        else:
-            return 'no missing requirements, degree can be obtained'
-    elif program == 'computer vision':
-        category_1_counter = 0
-        category_2_counter = 0
-        for course in s_c:
-            if course == 'MAT235Y1' or course == 'MAT237Y1' or course == 'MAT257Y1' or course == 'CSC320H1' \
-                    or course == 'CSC336H1' or course == 'CSC311H1' or course == 'CSC411H1' or course == 'CSC420H1':
-                if course[6] == 'H':
-                    category_1_counter += 0.5
-                else:
-                    category_1_counter += 1.0
-            elif course == 'CSC412H1' or course == 'CSC417H1' or course == 'CSC317H1' or course == 'CSC418H1' \
-                    or course == 'CSC419H1' or course == 'CSC2503H':
-                category_2_counter += 0.5
-        if not (category_1_counter >= 2.5 and category_2_counter >= 0.5):
-            if category_1_counter < 2.5 and category_2_counter < 0.5:
-                return 'missing ' + str(2.5 - category_1_counter) + ' credits from the following group of courses ' \
-                                                                    'not already completed: MAT235Y1, MAT237Y1,' \
-                                                                    ' MAT257Y1, CSC320H1, CSC336H1, CSC311H1, ' \
-                                                                    'CSC411H1, CSC420H1 and missing 0.5 credits from' \
-                                                                    ' the following list of courses: CSC412H1, ' \
-                                                                    'CSC417H1, CSC317H1, CSC418H1, CSC419H1'
-            elif category_1_counter < 2.5:
-                return 'missing ' + str(2.5 - category_1_counter) + ' credits from the following group of courses ' \
-                                                                    'not already completed: MAT235Y1, MAT237Y1, ' \
-                                                                    'MAT257Y1, CSC320H1, CSC336H1, CSC311H1, ' \
-                                                                    'CSC411H1, CSC420H1'
-            else:
-                return 'missing 0.5 credits from the following list of courses: CSC412H1, CSC417H1, ' \
-                       'CSC317H1, CSC418H1, CSC419H1'
-        else:
-            return 'no missing requirements, degree can be obtained'
-    elif program == 'computational linguistics and natural language processing':
-        category_4_counter = 0
-        for course in s_c:
-            if course in {'CSC309H1', 'CSC413H1', 'CSC421H1', 'CSC321H1', 'CSC311H1', 'CSC411H1', 'CSC428H1',
-                          'CSC486H1'}:
-                category_4_counter += 0.5
-        if not ('CSC318H1' in s_c and 'CSC401H1' in s_c and 'CSC485H1' in s_c and category_4_counter >= 1.5):
-            if 'CSC318H1' not in s_c and 'CSC401H1' not in s_c and 'CSC485H1' not in s_c and category_4_counter < 1:
-                return 'missing CSC318H1, CSC401H1 and CSC485H1, and missing ' \
-                    + str(1.0 - category_4_counter) + ' credits from the following group of courses not already ' \
-                                                      'taken: CSC309H1, CSC413H1, CSC421H1, CSC321H1, CSC311H1, ' \
-                                                      'CSC411H1, CSC428H1, CSC486H1'
-            elif 'CSC318H1' not in s_c:
-                return 'missing CSC318H1'
-            elif 'CSC401H1' not in s_c:
-                return 'missing CSC401H1'
-            elif 'CSC485H1' not in s_c:
-                return 'missing CSC485H1'
-            else:
-                return 'missing' + str(
-                    1.0 - category_4_counter) + ' credits from the following group of courses not already taken: ' \
-                    + 'CSC309H1, CSC413H1, CSC421H1, CSC321H1, CSC311H1, CSC411H1, CSC428H1, CSC486H1'
-        else:
-            return 'no missing requirements, degree can be obtained'
-    elif program == 'artificial intelligence':
-        category_1_counter = 0
-        category_2_counter = 0
-        for course in s_c:
-            if course in {'CSC336H1', 'MAT235Y1', 'MAT237Y1', 'MAT257Y1', 'MAT224H1', 'MAT247H1', 'STA238H1',
-                          'STA248H1', 'STA261H1', 'STA302H1', 'STA347H1'}:
-                if course[6] == 'H':
-                    category_1_counter += 0.5
-                else:
-                    category_1_counter += 1.0
-            elif course in {'CSC401H1', 'CSC485H1', 'CSC320H1', 'CSC420H1', 'CSC413H1', 'CSC421H1', 'CSC321H1',
-                            'CSC311H1',
-                            'CSC411H1', 'STA314H1', 'CSC412H1', 'STA414H1', 'CSC304H1', 'CSC384H1', 'CSC486H1'}:
-                category_2_counter += 0.5
-        if not (category_1_counter >= 1.0 and category_2_counter >= 2.5):
-            if category_1_counter < 1.0 and category_2_counter < 2.5:
-                return 'missing ' + str(
-                    1.0 - category_1_counter) + ' credits from the following group of courses not already ' \
-                                                'completed: CSC336H1, MAT235Y1, MAT237Y1, MAT257Y1, MAT224H1, ' \
-                                                'MAT247H1, STA238H1, STA248H1, STA261H1, STA302H1, STA347H1 and ' \
-                    + 'missing ' + str(2.5 - category_2_counter) + ' credits from the following group of courses ' \
-                                                                   'not already taken: CSC401H1, CSC485H1, ' \
-                                                                   'CSC320H1, CSC420H1, CSC413H1, CSC421H1, ' \
-                                                                   'CSC321H1, CSC311H1, CSC411H1, STA314H1, ' \
-                                                                   'CSC412H1, STA414H1, CSC304H1, CSC384H1, CSC486H1'
-            elif category_1_counter < 1.0:
-                return 'missing ' + str(1.0 - category_1_counter) + ' credits from the following group of courses not' \
-                                                                    ' already completed: CSC336H1, MAT235Y1, ' \
-                                                                    'MAT237Y1, MAT257Y1, MAT224H1, MAT247H1, ' \
-                                                                    'STA238H1, STA248H1, STA261H1, STA302H1, STA347H1'
-            else:
-                return 'missing ' + str(
-                    2.5 - category_2_counter) + ' credits from the following group of courses not already taken: ' \
-                    + 'CSC401H1, CSC485H1, CSC320H1, CSC420H1, CSC413H1, CSC421H1, CSC321H1, CSC311H1,' \
-                    + 'CSC411H1, STA314H1, CSC412H1, STA414H1, CSC304H1, CSC384H1, CSC486H1'
-        else:
-            return 'no missing requirements, degree can be obtained'
-    elif program == 'web and internet technologies':
-        requirement_counter = 0
-        for course in s_c:
-            if (course == 'STA238H1' or course == 'STA248H1' or course == 'STA261H1' or course == 'CSC309H1'
-                    or course == 'CSC343H1' or course == 'CSC358H1' or course == 'CSC457H1' or course == 'CSC458H1' or
-                    course == 'CSC311H1' or course == 'CSC411H1' or course == 'CSC367H1' or course == 'CSC443H1' or
-                    course == 'CSC469H1'):
-                requirement_counter += 0.5
-        if requirement_counter < 3.5:
-            return 'missing ' + str(
-                3.5 - requirement_counter) + ' credits from the following group of courses not already taken: ' \
-                + 'STA238H1, STA248H1, STA261H1, CSC309H1, CSC343H1, CSC358H1, CSC457H1, CSC458H1, CSC311H1, ' \
-                  'CSC411H1, CSC367H1, CSC443H1, CSC469H1'
-        else:
-            return 'no missing requirements, degree can be obtained'
-    elif program == 'theory of computation':
-        category_3_counter = 0
-        category_4_counter = 0
-        for course in s_c:
-            if course in {'CSC304H1', 'CSC336H1', 'CSC438H1', 'CSC448H1', 'CSC473H1', 'MAT309H1', 'MAT332H1',
-                          'MAT344H1'}:
-                category_3_counter += 0.5
-            elif course in {'MAT224H1', 'MAT247H1', 'MAT237Y1' 'MAT257Y1', 'MAT244H1', 'MAT267H1', 'MAT301H1',
-                            'MAT347Y1',
-                            'MAT315H1', 'MAT327H1', 'MAT334H1', 'MAT354H1', 'MAT335H1', 'MAT337H1', 'MAT357H1',
-                            'STA238H1', 'STA248H1', 'STA261H1', 'STA347H1'} \
-                    or course[:4] == 'MAT4':
-                if course[6] == 'H':
-                    category_4_counter += 0.5
-                else:
-                    category_4_counter += 1.0
-        if not (any(course == 'MAT137Y1' or course == 'MAT157Y1' or course == 'MAT237Y1' for course in s_c)
-                and 'CSC463H1' in s_c and category_3_counter >= 2.0 and category_4_counter >= 2.0):
-            if category_3_counter < 2.0 and category_4_counter < 2.0:
-                return 'missing ' + str(
-                    2.0 - category_3_counter) + ' credits from the following courses not already taken: ' \
-                    + 'CSC304H1, CSC336H1, CSC438H1, CSC448H1, CSC473H1; MAT309H1, MAT332H1, MAT344H1 and missing' \
-                    + str(2.0 - category_4_counter) \
-                    + 'credits from the following group of courses not already taken: MAT224H1, MAT247H1, ' \
-                      'MAT237Y1, MAT257Y1, MAT244H1, MAT267H1, MAT301H1, MAT347Y1,' \
-                    + 'MAT315H1, MAT327H1, MAT334H1, MAT354H1, MAT335H1, MAT337H1, MAT357H1, STA238H1,' \
-                      ' STA248H1, STA261H1, STA347H1'
-            elif category_3_counter < 2.0:
-                return 'missing ' + str(
-                    2.0 - category_3_counter) + ' credits from the following courses not already taken: ' \
-                    + 'CSC304H1, CSC336H1, CSC438H1, CSC448H1, CSC473H1; MAT309H1, MAT332H1, MAT344H1'
-            elif category_4_counter < 2.0:
-                return 'missing' + str(2.0 - category_4_counter) \
-                    + 'credits from the following group of courses not already taken: MAT224H1, MAT247H1, ' \
-                      'MAT237Y1, MAT257Y1, MAT244H1, MAT267H1, MAT301H1, MAT347Y1,' \
-                    + 'MAT315H1, MAT327H1, MAT334H1, MAT354H1, MAT335H1, MAT337H1, MAT357H1, STA238H1, ' \
-                      'STA248H1, STA261H1, STA347H1'
-            else:
-                return 'missing CSC463H1 and one of the following courses: MAT137Y1, MAT157Y1, MAT237Y1'
-        else:
-            return 'no missing requirements, degree can be obtained'
-    elif program == 'human-computer interaction':
-        category_3_counter = 0
-        for course in s_c:
-            if course in {'CSC309H1', 'CSC320H1', 'CSC321H1', 'CSC343H1', 'CSC384H1', 'CSC401H1', 'CSC404H1',
-                          'CSC418H1', 'CSC485H1', 'CSC490H1', 'CSC491H1'}:
-                category_3_counter += 0.5
-        if not ('CSC300H1' in s_c and 'CSC301H1' in s_c and 'CSC318H1' in s_c and 'CSC428H1' in s_c
-                and category_3_counter >= 1.0):
-            if category_3_counter < 1.0:
-                return 'missing ' + str(
-                    1.0 - category_3_counter) + ' credits from the following group of courses not already taken: ' \
-                    + ' CSC309H1, CSC320H1, CSC321H1, CSC343H1, CSC384H1, CSC401H1, CSC404H1, CSC418H1, ' \
-                      'CSC485H1, CSC490H1, CSC491H1'
-            else:
-                return 'missing 2 credits from the following group of courses: CSC300H1, CSC301H1, CSC318H1, CSC428H1'
-        else:
-            return 'no missing requirements, degree can be obtained'
-    else:
-        category_2_counter = 0
-        category_2_courses = []
-        category_3_counter = 0
-        for course in s_c:
-            if course in {'CSC358H1', 'CSC457H1', 'CSC443H1', 'CSC458H1'}:
-                category_2_counter += 0.5
-                category_2_courses.append(course)
-            if course in {'CSC358H1', 'CSC457H1', 'CSC458H1', 'CSC324H1', 'CSC385H1',
-                          'CSC488H1'} and course not in category_2_courses:
-                category_3_counter += 0.5
-        if not ('CSC343H1' in s_c and 'CSC367H1' in s_c and 'CSC469H1' in s_c and category_2_counter >= 1.0 and
-                category_3_counter >= 1.0):
-            if category_2_counter < 1.0 and category_3_counter < 1.0:
-                return 'missing ' + str(1.0 - category_2_counter) + ' credits from the following group of courses: ' \
-                    + 'CSC358H1, CSC457H1, CSC443H1, CSC458H1 and missing ' + str(1.0 - category_3_counter) \
-                    + ' credits from the following group of courses not already taken: CSC324H1, CSC385H1, CSC488H1'
-            elif category_2_counter < 1.0:
-                return 'missing ' + str(1.0 - category_2_counter) + ' credits from the following group of courses: ' \
-                    + 'CSC358H1, CSC457H1, CSC443H1, CSC458H1'
-            elif category_3_counter < 1.0:
-                return 'missing ' + str(1.0 - category_3_counter) + ' credits' \
-                    + 'from the following group of courses not already taken: CSC324H1, CSC385H1, CSC488H1'
-            else:
-                return 'missing 1.5 credits from the following group of courses: CSC343H1, CSC367H1, CSC469H1 '
-        else:
-            return 'no missing requirements, degree can be obtained'
+    return program_rules.get_rule_set(program, degree_type).explain(create_student_mask(student))
 
 
-def run_example(student: cc.Student) -> None:
+def run_example(student: cc.Student, courses: Optional[dict[str, cc.Course]] = None,
+                targets: Optional[Iterable[str]] = None) -> None:
     """
-        Runs an example of the graph visualizer with a Student object.
+        Runs an example of the graph visualizer with a Student object, on courses (or course_data if courses is
+        None). If targets is given, only the target courses and the courses leading to them are drawn.
+
+        The graph of the whole catalog is built once (see course_graph.cached_graph), so running examples for many
+        students only recolours its edges for each of them.
 
         Note: please fullscreen the Matplotlib window.
     """
-    graph = Program(course_data, student)
-    di_graph = nx.DiGraph()
-    graph.create_graph(di_graph)
-    visualize_graph(di_graph)
+    import networkx as nx
+    import course_graph
+
+    if courses is None:
+        courses = course_data
+    if targets is None:
+        visualize_graph(course_graph.cached_graph(courses).graph(student))
+    else:
+        di_graph = nx.DiGraph()
+        Program(courses, student).create_graph(di_graph, targets=targets)
+        visualize_graph(di_graph)
 
 
 if __name__ == '__main__':
-    # raw data taken from CourseScrapper.py
-    raw_data = CourseScrapper.read_from_csv('CourseData.csv')
-
-    # formatted data
-    course_data = create_course_mapping(raw_data)
+    # formatted data, read from the CSV file written by course_scrapper.py
+    course_data = load_course_data('CourseData.csv')
 
     # runs an example of the visualizer using a Student object
     student_example = cc.Student(1, 'Student', [cc.Record(course_data['CSC110Y1'], 80, 0.5),
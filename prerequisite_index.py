@@ -0,0 +1,194 @@
+"""
+    Prerequisite Index
+
+    This module precomputes the transitive closure of the prerequisite relation of a course mapping (as returned by
+    create_course_mapping in main). The ancestors (every course eventually required) and descendants (every course
+    eventually unlocked) of each course are stored as bitmasks over the course IDs in course_ids.COURSE_IDS, so each
+    query is a single bitmask lookup and the results can be combined directly with a student's completion bitmask.
+
+    When a course entry changes, only that course and its descendants have their ancestors recomputed, and only the
+    descendant bitmasks that actually gain or lose a course are touched.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+from typing import Iterable, TYPE_CHECKING
+
+import core_classes as cc
+from course_ids import COURSE_IDS, CourseIds
+
+if TYPE_CHECKING:
+    from catalog_store import CatalogStore
+
+
+class PrerequisiteIndex:
+    """
+        The ancestors and descendants of every course under the prerequisite relation.
+
+        A course in a prerequisite cycle is its own ancestor and descendant; otherwise a course is never included in
+        its own ancestors or descendants.
+    """
+    _ids: CourseIds
+    _prerequisites: dict[int, int]
+    _dependents: dict[int, int]
+    _ancestors: dict[int, int]
+    _descendants: dict[int, int]
+
+    def __init__(self, courses: dict[str, cc.Course], ids: CourseIds = COURSE_IDS) -> None:
+        self._ids = ids
+        self._prerequisites = {}
+        self._dependents = {}
+        self._ancestors = {}
+        self._descendants = {}
+        for course in courses.values():
+            self._set_prerequisites(course.course_code, course.prerequisites)
+        self._recompute(list(self._prerequisites))
+
+    @classmethod
+    def from_store(cls, store: 'CatalogStore') -> 'PrerequisiteIndex':
+        """
+            Returns the index of the catalog in a CatalogStore, built from the store's prerequisite arrays without
+            looking up any course code.
+        """
+        index = cls({}, store.ids)
+        indptr, indices = store.csr('prerequisites')
+        for course_id in store.courses.tolist():
+            mask = 0
+            for prerequisite in indices[indptr[course_id]:indptr[course_id + 1]].tolist():
+                mask |= 1 << prerequisite
+            index._set_prerequisite_mask(course_id, mask)
+        index._recompute(list(index._prerequisites))
+        return index
+
+    def ancestor_mask(self, course: str) -> int:
+        """
+            Returns the bitmask of every course that must eventually be completed before the given course.
+        """
+        course_id = self._ids.get(course)
+        return 0 if course_id is None else self._ancestors.get(course_id, 0)
+
+    def descendant_mask(self, course: str) -> int:
+        """
+            Returns the bitmask of every course that the given course eventually unlocks.
+        """
+        course_id = self._ids.get(course)
+        return 0 if course_id is None else self._descendants.get(course_id, 0)
+
+    def required_for(self, course: str) -> list[str]:
+        """
+            Returns the full ancestor chain of the given course: every course that appears in its prerequisites, in
+            their prerequisites, and so on.
+        """
+        return self._ids.codes(self.ancestor_mask(course))
+
+    def unlocks(self, course: str) -> list[str]:
+        """
+            Returns every course that the given course eventually unlocks, i.e. every course that has it somewhere in
+            its ancestor chain.
+        """
+        return self._ids.codes(self.descendant_mask(course))
+
+    def unlocks_any(self, courses: Iterable[str]) -> list[str]:
+        """
+            Returns every course eventually unlocked by at least one of the given courses.
+        """
+        mask = 0
+        for course in courses:
+            mask |= self.descendant_mask(course)
+        return self._ids.codes(mask)
+
+    def update_course(self, course: cc.Course) -> None:
+        """
+            Adds a course entry or replaces the entry with the same course code, and updates the closure of the
+            course and its descendants.
+        """
+        self._change_prerequisites(course.course_code, course.prerequisites)
+
+    def remove_course(self, course: str) -> None:
+        """
+            Removes the prerequisites of a course entry and updates the closure of the course and its descendants.
+            The course stays in the index as long as other courses list it as a prerequisite.
+        """
+        if course in self._ids:
+            self._change_prerequisites(course, [])
+
+    def _change_prerequisites(self, course: str, prerequisites: list[str]) -> None:
+        """
+            Replaces the direct prerequisites of a course and recomputes the closure of the affected courses.
+        """
+        course_id = self._ids.intern(course)
+        for prerequisite in self._ids.id_list(self._prerequisites.get(course_id, 0)):
+            self._dependents[prerequisite] &= ~(1 << course_id)
+        self._set_prerequisites(course, prerequisites)
+        affected = self._descendants.get(course_id, 0) | (1 << course_id)
+        self._recompute(self._ids.id_list(affected))
+
+    def _set_prerequisites(self, course: str, prerequisites: list[str]) -> None:
+        """
+            Records the direct prerequisite edges of a course, ignoring empty prerequisite entries.
+        """
+        course_id = self._ids.intern(course)
+        mask = self._ids.mask(prerequisite for prerequisite in prerequisites if prerequisite != '')
+        self._set_prerequisite_mask(course_id, mask)
+
+    def _set_prerequisite_mask(self, course_id: int, mask: int) -> None:
+        """
+            Records the direct prerequisite edges of the course with the given ID from the bitmask of its
+            prerequisites.
+        """
+        self._prerequisites[course_id] = mask
+        self._dependents.setdefault(course_id, 0)
+        for prerequisite in self._ids.id_list(mask):
+            self._prerequisites.setdefault(prerequisite, 0)
+            self._dependents[prerequisite] = self._dependents.get(prerequisite, 0) | (1 << course_id)
+
+    def _recompute(self, courses: list[int]) -> None:
+        """
+            Recomputes the ancestors of the given courses, assuming the ancestors of every other course are correct,
+            then updates the descendants of every course whose set of descendants changed.
+
+            Courses are processed in topological order so each course's ancestors are built from its prerequisites'
+            finished ancestors. Any courses left over are in a cycle and are resolved by iterating to a fixed point.
+        """
+        subset = 0
+        for course_id in courses:
+            subset |= 1 << course_id
+        remaining = {course_id: self._prerequisites.get(course_id, 0) & subset for course_id in courses}
+        ready = [course_id for course_id in courses if remaining[course_id] == 0]
+        new_ancestors = {}
+
+        def ancestors_of(course_id: int) -> int:
+            ancestors = 0
+            for prerequisite in self._ids.id_list(self._prerequisites.get(course_id, 0)):
+                if prerequisite in new_ancestors:
+                    ancestors |= (1 << prerequisite) | new_ancestors[prerequisite]
+                else:
+                    ancestors |= (1 << prerequisite) | self._ancestors.get(prerequisite, 0)
+            return ancestors
+
+        while ready:
+            course_id = ready.pop()
+            new_ancestors[course_id] = ancestors_of(course_id)
+            for dependent in self._ids.id_list(self._dependents.get(course_id, 0) & subset):
+                remaining[dependent] &= ~(1 << course_id)
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+
+        in_cycle = [course_id for course_id in courses if course_id not in new_ancestors]
+        for course_id in in_cycle:
+            new_ancestors[course_id] = 0
+        changed = bool(in_cycle)
+        while changed:
+            changed = False
+            for course_id in in_cycle:
+                ancestors = ancestors_of(course_id)
+                if ancestors != new_ancestors[course_id]:
+                    new_ancestors[course_id] = ancestors
+                    changed = True
+
+        for course_id, ancestors in new_ancestors.items():
+            old_ancestors = self._ancestors.get(course_id, 0)
+            for ancestor in self._ids.id_list(old_ancestors & ~ancestors):
+                self._descendants[ancestor] &= ~(1 << course_id)
+            for ancestor in self._ids.id_list(ancestors & ~old_ancestors):
+                self._descendants[ancestor] = self._descendants.get(ancestor, 0) | (1 << course_id)
+            self._ancestors[course_id] = ancestors
@@ -0,0 +1,443 @@
+"""
+    Program and Focus Requirements
+
+    This module declares the requirements of the computer science major, specialist and every focus as data, and
+    compiles them at load time into bitmasks over the course IDs in course_ids.COURSE_IDS. Checking a student and
+    explaining what the student is missing are both answered from the same compiled rules using a handful of integer
+    operations on the student's completion bitmask.
+
+    Requirements are written with three building blocks:
+    - Required: every listed course must be completed.
+    - OneOf: at least one option must be completed, where an option is a course or a tuple of courses.
+    - Credits: a minimum number of credits must be completed from a category of courses, which is given by explicit
+      course codes and course code prefixes (e.g. 'CSC4' for every 400 level CSC course).
+
+    Rules are checked against the set of courses a student completed, so a course the student took more than once
+    counts once towards a Credits rule. The checks this module replaced counted every record of a retaken course
+    towards the scientific computing and artificial intelligence focuses, which could meet them, for instance, with
+    CSC336H1 taken twice as the whole 1.0 credit of the artificial intelligence focus's first category. Such students
+    are no longer eligible.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import functools
+import operator
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Optional, Union
+
+from course_ids import COURSE_IDS, CourseIds
+
+NO_MISSING_REQUIREMENTS = 'no missing requirements, degree can be obtained'
+
+
+@dataclass(frozen=True)
+class Required:
+    """
+        A requirement that every course in courses is completed.
+    """
+    courses: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class OneOf:
+    """
+        A requirement that at least one of the options is completed. An option is either a single course code or a
+        tuple of course codes that must all be completed.
+    """
+    options: tuple[Union[str, tuple[str, ...]], ...]
+
+
+@dataclass(frozen=True)
+class Credits:
+    """
+        A requirement that at least amount credits are completed from a category of courses.
+
+        Instance Attributes:
+        - amount: The minimum number of credits needed from the category.
+        - courses: Course codes that belong to the category.
+        - prefixes: Course code prefixes whose courses belong to the category.
+        - excluded: Course codes that never belong to the category, even if they match a prefix.
+
+        Representation Invariants:
+        - self.amount > 0
+        - self.courses != () or self.prefixes != ()
+    """
+    amount: float
+    courses: tuple[str, ...] = ()
+    prefixes: tuple[str, ...] = ()
+    excluded: tuple[str, ...] = ()
+
+
+Requirement = Union[Required, OneOf, Credits]
+
+_FIRST_YEAR = (
+    OneOf((('CSC108H1', 'CSC148H1', 'CSC165H1'), ('CSC108H1', 'CSC148H1', 'CSC240H1'), ('CSC110Y1', 'CSC111H1'))),
+    OneOf(('MAT137Y1', 'MAT157Y1', ('MAT135H1', 'MAT136H1'))),
+)
+_MAT_LATER_YEAR_EXCLUSIONS = ('MAT329Y1', 'MAT390H1', 'MAT391H1')
+
+# Maps (program, degree type) to the stages of the program in the order they are checked. Each stage is a pair of
+# the description reported when the stage is incomplete and the requirements of that stage.
+PROGRAM_REQUIREMENTS = {
+    ('computer science', 'major'): (
+        ('first year requirements', _FIRST_YEAR),
+        ('second year requirements', (
+            Required(('CSC207H1', 'CSC258H1')),
+            OneOf(('CSC236H1', 'CSC240H1')),
+            OneOf(('CSC263H1', 'CSC265H1')),
+            OneOf(('STA247H1', 'STA237H1', 'STA255H1', 'STA257H1')),
+        )),
+        ('later year requirements(post second year)', (
+            Credits(3.0, courses=('MAT223H1', 'MAT240H1', 'MAT235Y1', 'MAT237Y1', 'MAT257Y1', 'STA414H1'),
+                    prefixes=('CSC2', 'CSC3', 'CSC4', 'MAT3', 'MAT4'), excluded=_MAT_LATER_YEAR_EXCLUSIONS),
+            Credits(0.5, prefixes=('CSC4',)),
+            OneOf(('MAT223H1', 'MAT240H1')),
+            OneOf(('MAT235Y1', 'MAT237Y1', 'MAT257Y1')),
+        )),
+    ),
+    ('computer science', 'specialist'): (
+        ('first year credits', _FIRST_YEAR),
+        ('second year requirements', (
+            Required(('CSC207H1', 'CSC209H1', 'CSC258H1')),
+            OneOf(('CSC236H1', 'CSC240H1')),
+            OneOf(('CSC263H1', 'CSC265H1')),
+            OneOf(('MAT223H1', 'MAT240H1')),
+            OneOf(('STA247H1', 'STA237H1', 'STA255H1', 'STA257H1')),
+        )),
+        ('later year requirements(post second year)', (
+            Credits(6.0, courses=('MAT224H1', 'MAT247H1', 'MAT235Y1', 'MAT237Y1', 'MAT257Y1', 'STA248H1',
+                                  'STA238H1', 'STA261H1'),
+                    prefixes=('CSC3', 'CSC4', 'STA3', 'STA4', 'MAT3', 'MAT4'), excluded=_MAT_LATER_YEAR_EXCLUSIONS),
+            OneOf(('MAT235Y1', 'MAT237Y1', 'MAT257Y1')),
+            Credits(1.5, prefixes=('CSC4',)),
+            Credits(4.0, prefixes=('CSC3', 'CSC4')),
+        )),
+    ),
+}
+
+# Maps each focus to its requirements. Only MAT, CSC and STA courses are included.
+FOCUS_REQUIREMENTS = {
+    'scientific computing': (
+        OneOf(('MAT235Y1', 'MAT237Y1', 'MAT257Y1')),
+        Credits(1.5, courses=('CSC336H1', 'CSC436H1', 'CSC446H1', 'CSC456H1', 'CSC466H1')),
+        Credits(1.0, courses=('CSC317H1', 'CSC320H1', 'CSC417H1', 'CSC418H1', 'CSC419H1', 'CSC311H1', 'CSC411H1',
+                              'CSC343H1', 'CSC384H1', 'CSC358H1', 'CSC457H1', 'CSC458H1')),
+    ),
+    'game design': (
+        Required(('CSC300H1', 'CSC301H1', 'CSC318H1', 'CSC384H1', 'CSC404H1')),
+        OneOf(('CSC317H1', 'CSC417H1', 'CSC418H1', 'CSC419H1')),
+    ),
+    'computer vision': (
+        OneOf(('MAT235Y1', 'MAT237Y1', 'MAT257Y1')),
+        Required(('CSC320H1', 'CSC336H1', 'CSC420H1')),
+        OneOf(('CSC311H1', 'CSC411H1')),
+        OneOf(('CSC412H1', 'CSC417H1', 'CSC317H1', 'CSC418H1', 'CSC419H1', 'CSC2503H')),
+    ),
+    'computational linguistics and natural language processing': (
+        Required(('CSC318H1', 'CSC401H1', 'CSC485H1')),
+        Credits(1.5, courses=('CSC309H1', 'CSC413H1', 'CSC421H1', 'CSC321H1', 'CSC311H1', 'CSC411H1', 'CSC428H1',
+                              'CSC486H1')),
+    ),
+    'artificial intelligence': (
+        Credits(1.0, courses=('CSC336H1', 'MAT235Y1', 'MAT237Y1', 'MAT257Y1', 'MAT224H1', 'MAT247H1', 'STA238H1',
+                              'STA248H1', 'STA261H1', 'STA302H1', 'STA347H1')),
+        Credits(2.5, courses=('CSC401H1', 'CSC485H1', 'CSC320H1', 'CSC420H1', 'CSC413H1', 'CSC421H1', 'CSC321H1',
+                              'CSC311H1', 'CSC411H1', 'STA314H1', 'CSC412H1', 'STA414H1', 'CSC304H1', 'CSC384H1',
+                              'CSC486H1')),
+    ),
+    'web and internet technologies': (
+        OneOf(('STA238H1', 'STA248H1', 'STA261H1')),
+        Required(('CSC309H1', 'CSC343H1', 'CSC458H1')),
+        OneOf(('CSC358H1', 'CSC457H1')),
+        OneOf(('CSC311H1', 'CSC411H1')),
+        OneOf(('CSC367H1', 'CSC443H1', 'CSC469H1')),
+    ),
+    'theory of computation': (
+        OneOf(('MAT137Y1', 'MAT157Y1', 'MAT237Y1')),
+        Required(('CSC463H1',)),
+        Credits(2.0, courses=('CSC304H1', 'CSC336H1', 'CSC438H1', 'CSC448H1', 'CSC473H1', 'MAT309H1', 'MAT332H1',
+                              'MAT344H1')),
+        Credits(2.0, courses=('MAT224H1', 'MAT247H1', 'MAT237Y1', 'MAT257Y1', 'MAT244H1', 'MAT267H1', 'MAT301H1',
+                              'MAT347Y1', 'MAT315H1', 'MAT327H1', 'MAT334H1', 'MAT354H1', 'MAT335H1', 'MAT337H1',
+                              'MAT357H1', 'STA238H1', 'STA248H1', 'STA261H1', 'STA347H1'),
+                prefixes=('MAT4',)),
+    ),
+    'human-computer interaction': (
+        Required(('CSC300H1', 'CSC301H1', 'CSC318H1', 'CSC428H1')),
+        Credits(1.0, courses=('CSC309H1', 'CSC320H1', 'CSC321H1', 'CSC343H1', 'CSC384H1', 'CSC401H1', 'CSC404H1',
+                              'CSC418H1', 'CSC485H1', 'CSC490H1', 'CSC491H1')),
+    ),
+    'computer systems': (
+        Required(('CSC343H1', 'CSC367H1', 'CSC469H1')),
+        Credits(1.0, courses=('CSC358H1', 'CSC457H1', 'CSC443H1', 'CSC458H1')),
+        Credits(1.0, courses=('CSC324H1', 'CSC385H1', 'CSC488H1')),
+    ),
+}
+
+
+class CompiledRequirement(ABC):
+    """
+        A requirement compiled into bitmasks over course IDs. Subclasses answer whether a completion bitmask meets the
+        requirement and describe what is missing when it does not.
+    """
+
+    @abstractmethod
+    def is_met(self, completed: int) -> bool:
+        """
+            Returns whether the courses in the completion bitmask meet this requirement.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def missing(self, completed: int) -> str:
+        """
+            Returns a description of what is missing from the completion bitmask to meet this requirement.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def is_met_many(self, completion: Any) -> Any:
+        """
+            Returns a boolean vector with an entry for each row of the completion matrix, which is a students by
+            course IDs boolean NumPy array, indicating whether that student meets this requirement.
+
+            Preconditions:
+            - completion.shape[1] >= len(course_ids.COURSE_IDS)
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def ways(self, completed: int) -> list[int]:
+        """
+            Returns bitmasks of courses that are not in the completion bitmask, such that every way of meeting this
+            requirement completes all courses of at least one of them. Used by course_planner to branch on how an
+            unmet requirement is met.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def shortfall(self, completed: int) -> float:
+        """
+            Returns the fewest credits that still have to be completed, on top of the completion bitmask, to meet
+            this requirement.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def courses(self) -> int:
+        """
+            Returns the bitmask of every course that counts toward this requirement, so completing a course outside
+            of it never changes whether the requirement is met.
+        """
+        raise NotImplementedError
+
+
+class _CompiledRequired(CompiledRequirement):
+    """
+        A compiled Required requirement.
+    """
+    mask: int
+    _ids: CourseIds
+    _course_bits: tuple[tuple[str, int], ...]
+
+    def __init__(self, requirement: Required, ids: CourseIds) -> None:
+        self._course_bits = tuple((code, 1 << ids.intern(code)) for code in requirement.courses)
+        self.mask = ids.mask(requirement.courses)
+        self._ids = ids
+
+    def is_met(self, completed: int) -> bool:
+        return completed & self.mask == self.mask
+
+    def missing(self, completed: int) -> str:
+        return 'missing ' + ', '.join(code for code, bit in self._course_bits if not completed & bit)
+
+    def is_met_many(self, completion: Any) -> Any:
+        return completion[:, CourseIds.id_list(self.mask)].all(axis=1)
+
+    def ways(self, completed: int) -> list[int]:
+        return [self.mask & ~completed] if self.mask & ~completed else []
+
+    def shortfall(self, completed: int) -> float:
+        return self._ids.credits(self.mask & ~completed)
+
+    def courses(self) -> int:
+        return self.mask
+
+
+class _CompiledOneOf(CompiledRequirement):
+    """
+        A compiled OneOf requirement.
+    """
+    option_masks: tuple[int, ...]
+    _ids: CourseIds
+    _description: str
+
+    def __init__(self, requirement: OneOf, ids: CourseIds) -> None:
+        self._ids = ids
+        options = [(option,) if isinstance(option, str) else option for option in requirement.options]
+        self.option_masks = tuple(ids.mask(option) for option in options)
+        self._description = ', '.join(option[0] if len(option) == 1 else '(' + ', '.join(option) + ')'
+                                      for option in options)
+
+    def is_met(self, completed: int) -> bool:
+        return any(completed & option == option for option in self.option_masks)
+
+    def missing(self, completed: int) -> str:
+        return 'missing one of the following courses: ' + self._description
+
+    def is_met_many(self, completion: Any) -> Any:
+        met = completion[:, CourseIds.id_list(self.option_masks[0])].all(axis=1)
+        for option in self.option_masks[1:]:
+            met |= completion[:, CourseIds.id_list(option)].all(axis=1)
+        return met
+
+    def ways(self, completed: int) -> list[int]:
+        if self.is_met(completed):
+            return []
+        return list(dict.fromkeys(option & ~completed for option in self.option_masks))
+
+    def shortfall(self, completed: int) -> float:
+        return min(self._ids.credits(option & ~completed) for option in self.option_masks)
+
+    def courses(self) -> int:
+        return functools.reduce(operator.or_, self.option_masks, 0)
+
+
+class _CompiledCredits(CompiledRequirement):
+    """
+        A compiled Credits requirement. The category mask is kept up to date as new course codes are interned, so
+        courses matched by a prefix are counted even if they were first seen after compilation.
+    """
+    amount: float
+    category_mask: int
+    _ids: CourseIds
+    _prefixes: tuple[str, ...]
+    _excluded: frozenset[str]
+    _description: str
+
+    def __init__(self, requirement: Credits, ids: CourseIds) -> None:
+        self.amount = requirement.amount
+        self.category_mask = ids.mask(requirement.courses)
+        self._ids = ids
+        self._prefixes = requirement.prefixes
+        self._excluded = frozenset(requirement.excluded)
+        self.category_mask &= ~ids.mask(requirement.excluded)
+        self._description = ', '.join(requirement.courses + tuple(prefix + 'xx' for prefix in requirement.prefixes))
+        if self._prefixes:
+            ids.watch(self._classify)
+
+    def _classify(self, code: str, course_id: int) -> None:
+        """
+            Adds a newly interned course to the category if it matches one of the prefixes.
+        """
+        if code.startswith(self._prefixes) and code not in self._excluded:
+            self.category_mask |= 1 << course_id
+
+    def credits(self, completed: int) -> float:
+        """
+            Returns the number of credits in the category completed in the completion bitmask.
+        """
+        return self._ids.credits(completed & self.category_mask)
+
+    def is_met(self, completed: int) -> bool:
+        return self.credits(completed) >= self.amount
+
+    def missing(self, completed: int) -> str:
+        return 'missing ' + str(self.amount - self.credits(completed)) \
+            + ' credits from the following group of courses: ' + self._description
+
+    def is_met_many(self, completion: Any) -> Any:
+        half = completion[:, CourseIds.id_list(self.category_mask & self._ids.half_mask)].sum(axis=1)
+        full = completion[:, CourseIds.id_list(self.category_mask & self._ids.full_mask)].sum(axis=1)
+        return half * 0.5 + full >= self.amount
+
+    def ways(self, completed: int) -> list[int]:
+        if self.is_met(completed):
+            return []
+        return [1 << course_id for course_id in CourseIds.id_list(self.category_mask & ~completed)]
+
+    def shortfall(self, completed: int) -> float:
+        return max(0.0, self.amount - self.credits(completed))
+
+    def courses(self) -> int:
+        return self.category_mask
+
+
+def compile_requirement(requirement: Requirement, ids: CourseIds = COURSE_IDS) -> CompiledRequirement:
+    """
+        Compiles a single requirement into bitmasks over the course IDs in ids.
+    """
+    if isinstance(requirement, Required):
+        return _CompiledRequired(requirement, ids)
+    elif isinstance(requirement, OneOf):
+        return _CompiledOneOf(requirement, ids)
+    else:
+        return _CompiledCredits(requirement, ids)
+
+
+class RuleSet:
+    """
+        The compiled requirements of a program or focus.
+
+        Instance Attributes:
+        - stages: Pairs of a stage description and the compiled requirements of that stage, in the order they are
+          checked. A stage description of None means each missing requirement is reported on its own.
+
+        Representation Invariants:
+        - self.stages != ()
+    """
+    stages: tuple[tuple[Optional[str], tuple[CompiledRequirement, ...]], ...]
+
+    def __init__(self, stages: tuple[tuple[Optional[str], tuple[Requirement, ...]], ...],
+                 ids: CourseIds = COURSE_IDS) -> None:
+        self.stages = tuple((description, tuple(compile_requirement(requirement, ids) for requirement in stage))
+                            for description, stage in stages)
+
+    def is_met(self, completed: int) -> bool:
+        """
+            Returns whether the courses in the completion bitmask meet every requirement.
+        """
+        return all(requirement.is_met(completed) for _, stage in self.stages for requirement in stage)
+
+    def is_met_many(self, completion: Any) -> Any:
+        """
+            Returns a boolean vector with an entry for each row of the completion matrix indicating whether that
+            student meets every requirement. See CompiledRequirement.is_met_many.
+        """
+        met = None
+        for _, stage in self.stages:
+            for requirement in stage:
+                met = requirement.is_met_many(completion) if met is None else met & requirement.is_met_many(completion)
+        return met
+
+    def explain(self, completed: int) -> str:
+        """
+            Returns the missing requirements for the completion bitmask. For staged programs only the first
+            incomplete stage is reported, otherwise every missing requirement is reported.
+        """
+        for description, stage in self.stages:
+            missing = [requirement.missing(completed) for requirement in stage if not requirement.is_met(completed)]
+            if missing and description is not None:
+                return 'missing ' + description
+            elif missing:
+                return ' and '.join(missing)
+        return NO_MISSING_REQUIREMENTS
+
+
+PROGRAM_RULES = {program: RuleSet(stages) for program, stages in PROGRAM_REQUIREMENTS.items()}
+FOCUS_RULES = {focus: RuleSet(((None, requirements),)) for focus, requirements in FOCUS_REQUIREMENTS.items()}
+
+
+def get_rule_set(program: str, degree_type: str = 'major') -> RuleSet:
+    """
+        Returns the compiled rules for a program or focus. Raises a ValueError if there is no such program or focus.
+
+        Preconditions:
+        - degree_type == 'major' or degree_type == 'specialist'
+    """
+    if (program, degree_type) in PROGRAM_RULES:
+        return PROGRAM_RULES[(program, degree_type)]
+    elif program in FOCUS_RULES:
+        return FOCUS_RULES[program]
+    raise ValueError
@@ -0,0 +1,278 @@
+"""
+    Query Service
+
+    This module serves the eligibility, requirements and graph edge queries of main.py over HTTP with JSON bodies,
+    from a long-running asyncio server. The catalog is read once when the service starts, and the indexes derived
+    from it (the compiled prerequisite expressions, the program rules and the prerequisite graph's structure) are
+    built once and shared by every query, so a query only builds the student it is about.
+
+    Connections are served concurrently by the event loop and kept alive between requests. Eligibility, requirements
+    and edge queries take a fraction of a millisecond and are answered directly on the event loop. Plan and unlock
+    queries take milliseconds, and a plan is a search that can take much longer for students with many courses left,
+    so they are answered in worker threads (see BLOCKING_PATHS) and the event loop keeps serving the other
+    connections meanwhile. The worker threads share the interpreter lock with the event loop, so they do not make
+    the service answer more queries per second; they keep a long plan from stalling every other connection.
+
+    Every query is a POST request whose body is a JSON object with a "student" and the query's other fields; a
+    student is {"student_number": "...", "student_name": "...", "records": [{"course": "CSC110Y1", "grade": 80}]}
+    (records may also give a "weight"; it defaults to 0.5 for H courses and 1.0 for Y courses):
+
+    - POST /eligibility/course {"student", "courses": [...]} -> {"eligible": {course: bool}}
+    - POST /eligibility/program {"student", "degree"} -> {"eligible": bool}
+    - POST /eligibility/focus {"student", "focus"} -> {"eligible": bool}
+    - POST /requirements {"student", "program", "degree_type"} -> {"requirements": str}
+    - POST /edges {"student", "targets"} -> {"edges": [[prerequisite, course, colour], ...]}
+      (targets is optional; if it is given, only the edges leading to the target nodes are returned)
+    - POST /plan {"student", "program", "degree_type", "objective"} -> {"terms": [[course, ...], ...], "credits"}
+      (degree_type defaults to "major" and objective to "terms"; terms and credits are null if there is no plan)
+    - POST /unlocks {"student", "limit"} -> {"unlocks": [{"course", "courses": [...], "milestones": [...]}, ...]}
+      (the courses the student can take next, ranked by what they unlock; limit is optional)
+    - GET /health -> {"status": "ok", "courses": int}
+
+    Queries that are not valid JSON, miss a field or name an unknown course, program or focus get a 400 response
+    with an {"error": str} body.
+
+    Usage: python query_service.py [port] [course data CSV file]
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import asyncio
+import json
+import sys
+from typing import Callable, Optional
+
+import ancestor_graphs
+import core_classes as cc
+import course_graph
+import course_planner
+import course_scrapper
+import main
+import requisite_expressions
+import unlock_ranking
+
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8000
+MAX_BODY_SIZE = 1 << 20
+BLOCKING_PATHS = frozenset({'/plan', '/unlocks'})
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large'}
+
+
+class QueryService:
+    """
+        The queries of the service, answered from one catalog loaded in memory.
+
+        Instance Attributes:
+        - courses: A dictionary mapping course code to Course object.
+        - graph: The prerequisite graph drawn by main.Program, built once and coloured per student by edge
+          queries.
+        - ancestors: The cached subgraphs of the prerequisite graph that lead to given nodes, used by edge queries
+          with targets.
+        - planner: The course planner of the catalog, used by plan queries.
+        - ranker: The unlock ranker of the catalog, used by unlock queries.
+
+        Representation Invariants:
+        - self.courses != {}
+    """
+    courses: dict[str, cc.Course]
+    graph: course_graph.CourseGraph
+    ancestors: ancestor_graphs.AncestorGraphs
+    planner: course_planner.CoursePlanner
+    ranker: unlock_ranking.UnlockRanker
+    _routes: dict[str, Callable[[dict], dict]]
+
+    def __init__(self, courses: dict[str, cc.Course]) -> None:
+        """
+            Builds the indexes derived from the catalog: compiles every prerequisite expression, builds the
+            prerequisite graph's structure and compiles the planner's and the unlock ranker's clauses.
+        """
+        self.courses = courses
+        for course in courses.values():
+            if course.prerequisite_expression != '':
+                requisite_expressions.compile_expression(course.prerequisite_expression)
+        self.graph = course_graph.CourseGraph(courses)
+        self.ancestors = ancestor_graphs.AncestorGraphs(courses)
+        self.planner = course_planner.CoursePlanner(courses)
+        self.ranker = unlock_ranking.UnlockRanker(courses)
+        self._routes = {'/eligibility/course': self.eligibility_course,
+                        '/eligibility/program': self.eligibility_program,
+                        '/eligibility/focus': self.eligibility_focus,
+                        '/requirements': self.requirements,
+                        '/edges': self.edges,
+                        '/plan': self.plan,
+                        '/unlocks': self.unlocks}
+
+    def student(self, query: dict) -> cc.Student:
+        """
+            Returns the student described by the query's "student" field. Raises a ValueError if a record's course
+            is not in the catalog.
+        """
+        data = query['student']
+        student = cc.Student(str(data.get('student_number', '0000000000')), str(data.get('student_name', 'Student')),
+                             [])
+        for record in data['records']:
+            course = record['course']
+            weight = record.get('weight', 0.5 if course[6:7] == 'H' else 1.0)
+            main.add_course_info(student, course, int(record['grade']), float(weight), self.courses)
+        return student
+
+    def eligibility_course(self, query: dict) -> dict:
+        """
+            Answers whether the student is eligible to take each of the query's courses.
+        """
+        student = self.student(query)
+        return {'eligible': {course: main.check_eligibility_course(course, student, self.courses)
+                             for course in query['courses']}}
+
+    def eligibility_program(self, query: dict) -> dict:
+        """
+            Answers whether the student completed the computer science program of the query's degree.
+        """
+        if query['degree'] not in ('major', 'specialist'):
+            raise ValueError
+        return {'eligible': main.check_eligibility_program(query['degree'], self.student(query))}
+
+    def eligibility_focus(self, query: dict) -> dict:
+        """
+            Answers whether the student completed the query's focus.
+        """
+        return {'eligible': main.check_eligibility_focus(query['focus'], self.student(query))}
+
+    def requirements(self, query: dict) -> dict:
+        """
+            Answers with the requirements the student is missing for the query's program and degree type.
+        """
+        if query['degree_type'] not in ('major', 'specialist'):
+            raise ValueError
+        return {'requirements': main.get_requirements(query['program'], query['degree_type'], self.student(query))}
+
+    def edges(self, query: dict) -> dict:
+        """
+            Answers with the edges of the student's prerequisite graph and their colours, 'g' for fulfilled
+            prerequisites and 'r' for unfulfilled ones. If the query has targets, only the edges of the subgraph of
+            the targets and their ancestors are returned.
+        """
+        if 'targets' in query:
+            if not isinstance(query['targets'], list):
+                raise ValueError
+            g = self.ancestors.graph(self.student(query), query['targets'])
+            return {'edges': [[source, target, color] for source, target, color in g.edges(data='color')]}
+        colors = self.graph.colors(self.student(query))
+        return {'edges': [[source, target, color] for (source, target), color in zip(self.graph.edges, colors)]}
+
+    def plan(self, query: dict) -> dict:
+        """
+            Answers with the student's plan through the query's program or focus, term by term.
+        """
+        if query.get('degree_type', 'major') not in ('major', 'specialist'):
+            raise ValueError
+        plan = course_planner.plan_program(self.student(query), query['program'], query.get('degree_type', 'major'),
+                                           self.planner, objective=query.get('objective', 'terms'))
+        if plan is None:
+            return {'terms': None, 'credits': None}
+        return {'terms': [list(term) for term in plan.terms], 'credits': plan.credits}
+
+    def unlocks(self, query: dict) -> dict:
+        """
+            Answers with the courses the student can take next, ranked by the courses and milestones they unlock.
+        """
+        limit = query.get('limit')
+        if limit is not None and (not isinstance(limit, int) or limit < 0):
+            raise ValueError
+        ranking = self.ranker.rank(self.student(query), limit=limit)
+        return {'unlocks': [{'course': unlock.course, 'courses': list(unlock.courses),
+                             'milestones': list(unlock.milestones)} for unlock in ranking]}
+
+    def handle(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        """
+            Answers one HTTP request, returning its status code and JSON body.
+        """
+        if path == '/health':
+            return (200, {'status': 'ok', 'courses': len(self.courses)}) if method == 'GET' \
+                else (405, {'error': 'method not allowed'})
+        if path not in self._routes:
+            return 404, {'error': 'not found'}
+        if method != 'POST':
+            return 405, {'error': 'method not allowed'}
+        try:
+            query = json.loads(body)
+            if not isinstance(query, dict):
+                raise ValueError
+            return 200, self._routes[path](query)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return 400, {'error': 'invalid query'}
+
+    async def respond(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        """
+            Answers one HTTP request like handle, in a worker thread if its path is in BLOCKING_PATHS so that the
+            event loop is not blocked while it is answered.
+        """
+        if path in BLOCKING_PATHS:
+            return await asyncio.to_thread(self.handle, method, path, body)
+        return self.handle(method, path, body)
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+            Serves the HTTP/1.1 requests of one connection until the client closes it or asks to close it.
+        """
+        try:
+            keep_alive = True
+            while keep_alive:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                line = await reader.readline()
+                while line not in (b'\r\n', b'\n', b''):
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                    line = await reader.readline()
+                parts = request_line.decode('latin-1').split()
+                length = headers.get('content-length', '0')
+                if len(parts) != 3 or not length.isdigit():
+                    status, payload, keep_alive = 400, {'error': 'bad request'}, False
+                elif int(length) > MAX_BODY_SIZE:
+                    status, payload, keep_alive = 413, {'error': 'payload too large'}, False
+                else:
+                    method, target, version = parts
+                    body = await reader.readexactly(int(length))
+                    status, payload = await self.respond(method, target.split('?')[0], body)
+                    keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                data = json.dumps(payload).encode('utf-8')
+                writer.write(f'HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n'
+                             f'Content-Length: {len(data)}\r\nConnection: {"keep-alive" if keep_alive else "close"}'
+                             f'\r\n\r\n'.encode('latin-1') + data)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = SERVICE_HOST, port: int = SERVICE_PORT,
+                    started: Optional[Callable[[int], None]] = None) -> None:
+        """
+            Serves queries on host and port until cancelled. If port is 0, a free port is chosen. started, if given,
+            is called with the port once the service accepts connections.
+        """
+        server = await asyncio.start_server(self.serve_connection, host, port)
+        if started is not None:
+            started(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+
+def run_service(file_name: str = course_scrapper.CSV_FILE, host: str = SERVICE_HOST, port: int = SERVICE_PORT) -> None:
+    """
+        Loads the course data CSV file once and serves queries on host and port until interrupted, printing the
+        address once the service accepts connections.
+    """
+    service = QueryService(main.load_course_data(file_name))
+    try:
+        asyncio.run(service.serve(host, port, lambda bound: print(f'Serving on http://{host}:{bound}', flush=True)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    run_service(sys.argv[2] if len(sys.argv) > 2 else course_scrapper.CSV_FILE, SERVICE_HOST,
+                int(sys.argv[1]) if len(sys.argv) > 1 else SERVICE_PORT)
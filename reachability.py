@@ -0,0 +1,98 @@
+"""
+    Incremental Reachability
+
+    This module keeps track of which nodes of a directed graph can reach each other while edges are being added.
+    The ancestors and descendants of every node are stored as integer bitsets, so asking whether one node reaches
+    another is a single bit test, and adding an edge only updates the nodes whose reachability actually changes.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+from typing import Hashable
+
+
+class ReachabilityIndex:
+    """
+        The transitive closure of a directed graph that only grows, maintained as edges are added.
+
+        A node always reaches itself, so it is included in its own ancestors and descendants.
+
+        Representation Invariants:
+        - len(self._nodes) == len(self._ancestors) == len(self._descendants)
+    """
+    _bits: dict[Hashable, int]
+    _nodes: list[Hashable]
+    _ancestors: list[int]
+    _descendants: list[int]
+
+    def __init__(self) -> None:
+        self._bits = {}
+        self._nodes = []
+        self._ancestors = []
+        self._descendants = []
+
+    def __contains__(self, node: Hashable) -> bool:
+        return node in self._bits
+
+    def add_node(self, node: Hashable) -> int:
+        """
+            Adds a node with no edges if it is not already in the index, and returns its bit position.
+        """
+        bit = self._bits.get(node)
+        if bit is None:
+            bit = len(self._nodes)
+            self._bits[node] = bit
+            self._nodes.append(node)
+            self._ancestors.append(1 << bit)
+            self._descendants.append(1 << bit)
+        return bit
+
+    def reaches(self, source: Hashable, target: Hashable) -> bool:
+        """
+            Returns whether there is a directed path from source to target. Nodes that are not in the index only reach
+            themselves.
+        """
+        if source not in self._bits or target not in self._bits:
+            return source == target
+        return bool(self._descendants[self._bits[source]] >> self._bits[target] & 1)
+
+    def add_edge(self, source: Hashable, target: Hashable) -> None:
+        """
+            Adds a directed edge from source to target, adding either node if needed, and updates the closure. Every
+            ancestor of source gains every descendant of target and vice versa.
+        """
+        source_bit = self.add_node(source)
+        target_bit = self.add_node(target)
+        if self._descendants[source_bit] >> target_bit & 1:
+            return
+        ancestors = self._ancestors[source_bit]
+        descendants = self._descendants[target_bit]
+        for bit in self._bit_positions(ancestors):
+            self._descendants[bit] |= descendants
+        for bit in self._bit_positions(descendants):
+            self._ancestors[bit] |= ancestors
+
+    def ancestors(self, node: Hashable) -> list[Hashable]:
+        """
+            Returns every node with a directed path to the given node, excluding the node itself.
+        """
+        bit = self._bits[node]
+        return [self._nodes[other] for other in self._bit_positions(self._ancestors[bit] & ~(1 << bit))]
+
+    def descendants(self, node: Hashable) -> list[Hashable]:
+        """
+            Returns every node with a directed path from the given node, excluding the node itself.
+        """
+        bit = self._bits[node]
+        return [self._nodes[other] for other in self._bit_positions(self._descendants[bit] & ~(1 << bit))]
+
+    @staticmethod
+    def _bit_positions(bits: int) -> list[int]:
+        """
+            Returns the positions of the set bits in increasing order.
+        """
+        positions = []
+        while bits:
+            low_bit = bits & -bits
+            positions.append(low_bit.bit_length() - 1)
+            bits ^= low_bit
+        return positions
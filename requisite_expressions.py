@@ -0,0 +1,248 @@
+"""
+    Requisite Expressions
+
+    This module parses the prerequisite and corequisite text of the Academic Calendar, such as
+    "(CSC110Y1, CSC111H1)/ (CSC108H1, CSC148H1); MAT137Y1/ MAT157Y1", into a boolean expression tree of courses, and
+    compiles trees into disjunctive normal form (DNF) over course_ids.COURSE_IDS: a tuple of bitmasks, where the
+    expression is met by a completion bitmask when it contains every course of at least one of the bitmasks. For
+    evaluation, each top level requirement of an expression is compiled to its own DNF, so that a student's
+    completion bitmask is checked with a few integer operations per requirement.
+
+    Following the calendar's conventions, "/" and "or" separate alternatives, ",", ";", "+" and "and" separate
+    requirements that must all be met, alternatives bind tighter than requirements, and brackets group. Anything
+    else in the text (grades, notes, permission of the department and so on) is ignored.
+
+    Trees are stored in the catalog in the canonical text form produced by format_expression, which
+    parse_expression reads back into the same tree.
+
+    Like the prerequisite lists of the catalog, expressions are met by a course with the same stem (the code without
+    its campus suffix) as a required course, such as CSC148H5 for CSC148H1. Expressions are compiled over the exact
+    courses, and a student's completion bitmask is widened to every course sharing a stem with a completed course
+    before it is checked (see stem_completion).
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Optional, Union
+
+from course_ids import COURSE_IDS
+
+_TOKEN_PATTERN = re.compile(r"(?P<code>[A-Z]{3}[0-9]{3}[HY][0-9])|(?P<open>[(\[])|(?P<close>[)\]])"
+                            r"|(?P<any>/|\b[Oo][Rr]\b)|(?P<all>[,;+]|\b[Aa][Nn][Dd]\b)")
+
+
+@dataclass(frozen=True)
+class CourseTerm:
+    """
+        A requirement met by completing a single course.
+
+        Instance Attributes:
+        - code: The course code of the course.
+    """
+    code: str
+
+
+@dataclass(frozen=True)
+class AllOf:
+    """
+        A requirement met when every one of its terms is met.
+
+        Representation Invariants:
+        - len(self.terms) >= 2
+        - not any(isinstance(term, AllOf) for term in self.terms)
+    """
+    terms: tuple['Expression', ...]
+
+
+@dataclass(frozen=True)
+class AnyOf:
+    """
+        A requirement met when any one of its options is met.
+
+        Representation Invariants:
+        - len(self.options) >= 2
+        - not any(isinstance(option, AnyOf) for option in self.options)
+    """
+    options: tuple['Expression', ...]
+
+
+Expression = Union[CourseTerm, AllOf, AnyOf]
+
+
+def parse_expression(text: str) -> Optional[Expression]:
+    """
+        Returns the expression tree of a prerequisite or corequisite text, or None if it does not mention any course.
+    """
+    tokens = [(match.lastgroup, match.group()) for match in _TOKEN_PATTERN.finditer(text)]
+    terms = []
+    position = 0
+    while position < len(tokens):
+        term, position = _parse_all(tokens, position)
+        if term is not None:
+            terms.append(term)
+        position += 1
+    return _combine(AllOf, terms)
+
+
+def _parse_all(tokens: list[tuple[str, str]], position: int) -> tuple[Optional[Expression], int]:
+    """
+        Parses requirements separated by "and" tokens (or by nothing), starting at position, up to the next closing
+        bracket or the end of the tokens. Returns their conjunction and the position it stopped at.
+    """
+    terms = []
+    while position < len(tokens) and tokens[position][0] != 'close':
+        if tokens[position][0] in ('all', 'any'):
+            position += 1
+        else:
+            term, position = _parse_any(tokens, position)
+            if term is not None:
+                terms.append(term)
+    return _combine(AllOf, terms), position
+
+
+def _parse_any(tokens: list[tuple[str, str]], position: int) -> tuple[Optional[Expression], int]:
+    """
+        Parses alternatives separated by "or" tokens, starting at a course code or an opening bracket at position.
+        Returns their disjunction and the position after the last alternative.
+    """
+    options = []
+    while position < len(tokens):
+        kind, value = tokens[position]
+        if kind == 'open':
+            option, position = _parse_all(tokens, position + 1)
+            position += 1
+        else:
+            option, position = CourseTerm(value), position + 1
+        if option is not None:
+            options.append(option)
+        if position < len(tokens) and tokens[position][0] == 'any':
+            position += 1
+            while position < len(tokens) and tokens[position][0] in ('any', 'all'):
+                position += 1
+            if position < len(tokens) and tokens[position][0] != 'close':
+                continue
+        break
+    return _combine(AnyOf, options), position
+
+
+def _combine(kind: type, items: list[Expression]) -> Optional[Expression]:
+    """
+        Returns an expression of the given kind (AllOf or AnyOf) over the items, flattening nested expressions of the
+        same kind and dropping repeated items. A single item is returned as is, and no items give None.
+    """
+    flat = []
+    for item in items:
+        children = (item.terms if kind is AllOf else item.options) if isinstance(item, kind) else (item,)
+        for child in children:
+            if child not in flat:
+                flat.append(child)
+    if not flat:
+        return None
+    return flat[0] if len(flat) == 1 else kind(tuple(flat))
+
+
+def format_expression(expression: Optional[Expression]) -> str:
+    """
+        Returns the canonical text of an expression tree, or '' for None. Alternatives are separated by "/" and
+        requirements by ", ", with brackets around requirements that are one of several alternatives.
+    """
+    if expression is None:
+        return ''
+    if isinstance(expression, CourseTerm):
+        return expression.code
+    if isinstance(expression, AllOf):
+        return ', '.join(format_expression(term) for term in expression.terms)
+    return '/'.join(f'({format_expression(option)})' if isinstance(option, AllOf) else format_expression(option)
+                    for option in expression.options)
+
+
+def to_dnf(expression: Optional[Expression]) -> tuple[int, ...]:
+    """
+        Compiles an expression tree into disjunctive normal form: a tuple of bitmasks over course_ids.COURSE_IDS, one
+        for each minimal set of courses that meets the expression. None compiles to the single empty bitmask, which
+        is always met.
+    """
+    if expression is None:
+        return 0,
+    if isinstance(expression, CourseTerm):
+        return 1 << COURSE_IDS.intern(expression.code),
+    if isinstance(expression, AnyOf):
+        return _minimal([mask for option in expression.options for mask in to_dnf(option)])
+    masks = [0]
+    for term in expression.terms:
+        masks = _minimal([mask | term_mask for mask in masks for term_mask in to_dnf(term)])
+    return masks
+
+
+def _minimal(masks: list[int]) -> tuple[int, ...]:
+    """
+        Returns the masks that do not contain another of the masks, in order and without repeats. Dropping the
+        others does not change which completion bitmasks meet the disjunction.
+    """
+    masks = list(dict.fromkeys(masks))
+    kept = set()
+    for mask in sorted(masks, key=lambda mask: bin(mask).count('1')):
+        if not any(mask & other == other for other in kept):
+            kept.add(mask)
+    return tuple(mask for mask in masks if mask in kept)
+
+
+@lru_cache(maxsize=None)
+def compile_expression(text: str) -> tuple[tuple[int, tuple[int, ...]], ...]:
+    """
+        Compiles the expression with the given canonical text into clauses that must all be met, one for each of its
+        top level requirements, so that the size of the result stays proportional to the text instead of growing
+        with the product of its alternatives. Each clause is the DNF of its requirement (see to_dnf) split into a
+        pair: a mask of the alternatives that are a single course, any of which meets the clause, and a tuple of
+        the remaining DNF bitmasks, all courses of one of which meet the clause. Results are cached, since course IDs
+        never change once interned.
+    """
+    expression = parse_expression(text)
+    terms = expression.terms if isinstance(expression, AllOf) else (expression,)
+    clauses = []
+    for term in terms:
+        single, options = 0, []
+        for mask in to_dnf(term):
+            if mask != 0 and mask & (mask - 1) == 0:
+                single |= mask
+            else:
+                options.append(mask)
+        clauses.append((single, tuple(options)))
+    return tuple(clauses)
+
+
+def stem_completion(stems: Iterable[str]) -> int:
+    """
+        Returns the bitmask of every course whose code starts with one of the given stems, the first 6 characters
+        of the codes of a student's completed courses (see core_classes.StudentIndex.stems). Checking an expression
+        against it meets a requirement on a course with any completed course of the same stem.
+    """
+    mask = 0
+    for stem in stems:
+        mask |= _STEM_MASKS.get(stem, 0)
+    return mask
+
+
+def _add_stem(code: str, course_id: int) -> None:
+    """
+        Adds a newly interned course to the bitmask of its stem.
+    """
+    _STEM_MASKS[code[:6]] = _STEM_MASKS.get(code[:6], 0) | (1 << course_id)
+
+
+_STEM_MASKS: dict[str, int] = {}
+COURSE_IDS.watch(_add_stem)
+
+
+def is_met(text: str, completed: int) -> bool:
+    """
+        Returns whether the completion bitmask meets the expression with the given canonical text. An empty text has
+        no requirements and is always met. To match courses by stem, pass the stem_completion of a student's
+        completed courses.
+    """
+    for single, options in compile_expression(text):
+        if not completed & single and not any(completed & mask == mask for mask in options):
+            return False
+    return True
@@ -0,0 +1,134 @@
+"""
+    A local stand-in for the Academic Calendar, for testing the calendar spider without the network.
+
+    The server serves a copy of the calendar print page at /print with an ETag and a Last-Modified header, and answers
+    conditional requests for an unchanged page with 304 Not Modified. The page can be replaced while the server runs.
+
+    For full calendar crawls, it serves a departments page at /departments linking to each department's course
+    listing at /section/<department>, whose pages (?page=1, ?page=2, ...) each link to the next one the way the
+    calendar's pager does. Chosen paths fail with 503 Service Unavailable the first time they are requested, and
+    every request is recorded.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import hashlib
+import http.server
+import threading
+from email.utils import formatdate
+from typing import Any, Iterable, Optional
+
+
+class CalendarServer:
+    """
+        A calendar server on a free local port, running in a background thread while used as a context manager.
+
+        Instance Attributes:
+        - page: The HTML of the print page.
+        - etag: The entity tag of the page, which changes whenever the page is replaced.
+        - last_modified: The HTTP date the page was last replaced.
+        - departments: The course blocks of each listing page of each department.
+        - failing: The paths that fail the first time they are requested.
+        - requests: The path, the request headers and the response status of every request so far.
+    """
+    page: bytes
+    etag: str
+    last_modified: str
+    departments: dict[str, list[list[str]]]
+    failing: set[str]
+    requests: list[tuple[str, dict[str, str], int]]
+
+    def __init__(self, page: bytes = b'', departments: Optional[dict[str, list[list[str]]]] = None,
+                 failing: Iterable[str] = ()) -> None:
+        self.departments = departments or {}
+        self.failing = set(failing)
+        self.requests = []
+        self._lock = threading.Lock()
+        self._version = 0
+        self.set_page(page)
+        self._server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.calendar = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """
+            The URL of the server, without a trailing slash.
+        """
+        return f'http://127.0.0.1:{self._server.server_address[1]}'
+
+    def set_page(self, page: bytes) -> None:
+        """
+            Replaces the print page, giving it a new entity tag and modification date, even if it is the same.
+        """
+        with self._lock:
+            self._version += 1
+            self.page = page
+            self.etag = f'"{hashlib.sha256(page).hexdigest()[:16]}-{self._version}"'
+            self.last_modified = formatdate(usegmt=True)
+
+    def statuses(self, path: str) -> list[int]:
+        """
+            Returns the response statuses of the requests for path, in order.
+        """
+        return [status for request_path, _, status in self.requests if request_path == path]
+
+    def respond(self, path: str, headers: dict[str, str]) -> tuple[int, dict[str, str], bytes]:
+        """
+            Returns the status, headers and body of the response to a GET request.
+        """
+        html = {'Content-Type': 'text/html; charset=utf-8'}
+        with self._lock:
+            if path in self.failing:
+                self.failing.remove(path)
+                return 503, {}, b''
+            elif path == '/print':
+                validators = {'ETag': self.etag, 'Last-Modified': self.last_modified}
+                if headers.get('If-None-Match') == self.etag:
+                    return 304, validators, b''
+                return 200, dict(validators, **html), self.page
+            elif path == '/departments':
+                links = ''.join(f'<li><a href="/section/{department}">{department}</a></li>'
+                                for department in self.departments)
+                return 200, html, f'<html><body><ul>{links}</ul></body></html>'.encode('utf-8')
+        department, _, page = path.removeprefix('/section/').partition('?page=')
+        page = int(page or 1)
+        if not path.startswith('/section/') or department not in self.departments \
+                or not 1 <= page <= len(self.departments[department]):
+            return 404, {}, b''
+        pager = f'<li class="pager__item pager__item--next"><a href="/section/{department}?page={page + 1}">Next</a>' \
+            f'</li>' if page < len(self.departments[department]) else ''
+        body = ''.join(self.departments[department][page - 1])
+        return 200, html, f'<html><body><div class="view-content">{body}</div><ul class="pager">{pager}</ul>' \
+                          f'</body></html>'.encode('utf-8')
+
+    def __enter__(self) -> 'CalendarServer':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exception: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """
+        Answers the requests of a CalendarServer.
+    """
+    server: Any
+
+    def do_GET(self) -> None:
+        headers = dict(self.headers.items())
+        status, response_headers, body = self.server.calendar.respond(self.path, headers)
+        self.server.calendar.requests.append((self.path, headers, status))
+        self.send_response(status)
+        for name, value in response_headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        """
+            Keeps the test output quiet.
+        """
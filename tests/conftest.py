@@ -0,0 +1,44 @@
+"""
+    Shared fixtures of the tests: the catalog of the course dataset and seeded random students of it.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import core_classes as cc  # noqa: E402
+import course_scrapper  # noqa: E402
+import main  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def courses() -> dict[str, cc.Course]:
+    """
+        The catalog of the course dataset, parsed without reading or writing its snapshot.
+    """
+    return main.create_course_mapping(course_scrapper.read_from_csv(os.path.join(ROOT, course_scrapper.CSV_FILE),
+                                                                     use_snapshot=False))
+
+
+def random_students(courses: dict[str, cc.Course], count: int, seed: int = 0, records: int = 12) -> list[cc.Student]:
+    """
+        Returns count students, each with up to records random courses of the catalog (half of them CSC courses)
+        and random grades.
+    """
+    rng = random.Random(seed)
+    codes = sorted(courses)
+    csc_codes = [code for code in codes if code.startswith('CSC')]
+    students = []
+    for number in range(count):
+        student = cc.Student(str(1000000000 + number), 'Student', [])
+        for _ in range(rng.randint(0, records)):
+            code = rng.choice(csc_codes if rng.random() < 0.5 else codes)
+            student.add_record(cc.Record(courses[code], rng.randint(0, 100), 0.5 if code[6] == 'H' else 1.0))
+        students.append(student)
+    return students
@@ -0,0 +1,88 @@
+"""
+    Tests that the subgraphs of ancestor_graphs.AncestorGraphs are the subgraphs of the graph main.Program.create_graph
+    builds on the targets and their ancestors, with the same group nodes and edge colours.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import random
+
+import networkx as nx
+import pytest
+
+import core_classes as cc
+import main
+from ancestor_graphs import AncestorGraphs
+from conftest import random_students
+from equivalence_groups import EQUIVALENCE_GROUPS
+
+
+def full_graph(courses: dict[str, cc.Course], student: cc.Student) -> nx.DiGraph:
+    """
+        Returns the whole prerequisite graph of the student.
+    """
+    g = nx.DiGraph()
+    main.Program(courses, student).create_graph(g)
+    return g
+
+
+def expected_graph(g: nx.DiGraph, targets: list[str]) -> nx.DiGraph:
+    """
+        Returns the subgraph of g induced by the targets and their ancestors.
+    """
+    nodes = set(targets)
+    for target in targets:
+        nodes |= nx.ancestors(g, target)
+    return g.subgraph(nodes)
+
+
+@pytest.fixture(scope='module')
+def ancestors(courses: dict[str, cc.Course]) -> AncestorGraphs:
+    """
+        The ancestor graphs of the course dataset.
+    """
+    return AncestorGraphs(courses)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_graph_is_the_induced_subgraph(courses: dict[str, cc.Course], ancestors: AncestorGraphs, seed: int) -> None:
+    rng = random.Random(seed)
+    for student in random_students(courses, 10, seed=seed, records=20):
+        g = full_graph(courses, student)
+        nodes = sorted(g.nodes)
+        for _ in range(5):
+            targets = rng.sample(nodes, rng.randint(1, 3))
+            assert nx.utils.graphs_equal(ancestors.graph(student, targets), expected_graph(g, targets))
+
+
+def test_group_node_targets(courses: dict[str, cc.Course], ancestors: AncestorGraphs) -> None:
+    group_nodes = [group.node for group in EQUIVALENCE_GROUPS.groups() if group.node is not None]
+    student = random_students(courses, 1, seed=7, records=20)[0]
+    g = full_graph(courses, student)
+    for node in group_nodes:
+        assert nx.utils.graphs_equal(ancestors.graph(student, [node]), expected_graph(g, [node]))
+    targets = group_nodes[:1] + ['CSC263H1']
+    subgraph = ancestors.graph(student, targets)
+    assert nx.utils.graphs_equal(subgraph, expected_graph(g, targets))
+    assert set(group_nodes[:1]) <= set(subgraph.nodes)
+
+
+@pytest.mark.parametrize('target', ['XYZ123H1', 'MAT137Y1', ''])
+def test_unknown_targets(courses: dict[str, cc.Course], ancestors: AncestorGraphs, target: str) -> None:
+    student = random_students(courses, 1)[0]
+    with pytest.raises(ValueError):
+        ancestors.graph(student, ['CSC263H1', target])
+
+
+def test_cached_structure_is_not_shared(courses: dict[str, cc.Course]) -> None:
+    ancestors = AncestorGraphs(courses)
+    first, second = random_students(courses, 2, seed=3, records=30)
+    targets = ['CSC263H1', 'CSC369H1']
+    first_graph = ancestors.graph(first, targets)
+    first_colors = dict(((source, target), color) for source, target, color in first_graph.edges(data='color'))
+    second_graph = ancestors.graph(second, list(reversed(targets)))
+    assert ancestors.structure(targets) is ancestors.structure(set(targets))
+    assert second_graph is not first_graph
+    assert dict(((source, target), color) for source, target, color in first_graph.edges(data='color')) \
+        == first_colors
+    assert nx.utils.graphs_equal(second_graph, expected_graph(full_graph(courses, second), targets))
+    assert all('color' not in data for _, _, data in ancestors.structure(targets).edges(data=True))
@@ -0,0 +1,158 @@
+"""
+    Tests of the calendar spider in calendar_spider, on the saved calendar print page in tests/fixtures, both
+    directly and by crawling a local stand-in for the calendar (see calendar_server) with scrapy runspider, the way
+    the spider is run from the command line.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from scrapy.http import HtmlResponse, Request
+
+import course_scrapper
+from calendar_server import CalendarServer
+from calendar_spider import CalendarSpider
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, 'tests', 'fixtures')
+CALENDAR_PAGE = os.path.join(FIXTURES, 'calendar_print_page.html')
+FAST_SETTINGS = {'LOG_LEVEL': 'WARNING', 'DOWNLOAD_DELAY': '0', 'AUTOTHROTTLE_ENABLED': '0',
+                 'BACKOFF_BASE_DELAY': '0.1', 'TELNETCONSOLE_ENABLED': '0'}
+
+
+def crawl(directory: str, **arguments: str) -> dict:
+    """
+        Runs the calendar spider in directory with scrapy runspider and the given -a arguments, and returns the change
+        report it wrote next to the dataset (or {} if it wrote none). The crawl must succeed without deprecation
+        warnings about the downloader middlewares.
+    """
+    command = [sys.executable, '-m', 'scrapy', 'runspider', os.path.join(ROOT, 'calendar_spider.py')]
+    for name, value in arguments.items():
+        command += ['-a', f'{name}={value}']
+    for name, value in FAST_SETTINGS.items():
+        command += ['-s', f'{name}={value}']
+    report_file = os.path.join(directory, course_scrapper.CSV_FILE + course_scrapper.CHANGE_REPORT_SUFFIX)
+    if os.path.exists(report_file):
+        os.remove(report_file)
+    result = subprocess.run(command, cwd=directory, env=dict(os.environ, PYTHONPATH=ROOT), capture_output=True,
+                            text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert not [line for line in result.stderr.splitlines()
+                if 'ScrapyDeprecationWarning' in line and 'Middleware' in line], result.stderr
+    if not os.path.exists(report_file):
+        return {}
+    with open(report_file, encoding='utf-8') as report:
+        return json.load(report)
+
+
+def read_page() -> bytes:
+    """
+        Returns the saved calendar print page.
+    """
+    with open(CALENDAR_PAGE, 'rb') as page:
+        return page.read()
+
+
+def page_response(url: str = CalendarSpider.url) -> HtmlResponse:
+    """
+        Returns a response with the saved calendar print page.
+    """
+    return HtmlResponse(url, body=read_page(), encoding='utf-8', request=Request(url))
+
+
+@pytest.mark.parametrize('value, expected', [('1', True), ('true', True), ('yes', True), ('0', False),
+                                             ('false', False), ('False', False), ('', False), ('off', False)])
+def test_flag_arguments(value: str, expected: bool) -> None:
+    spider = CalendarSpider(streaming=value, incremental=value, full_calendar=value)
+    assert spider.streaming is expected and spider.incremental is expected and spider.full_calendar is expected
+
+
+def test_streaming_and_soup_write_the_same_dataset(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    datasets = []
+    for streaming in ('1', '0'):
+        CalendarSpider(streaming=streaming, incremental='0').parse(page_response())
+        with open(course_scrapper.CSV_FILE, 'rb') as dataset:
+            datasets.append(dataset.read())
+    assert datasets[0] == datasets[1]
+    assert len(course_scrapper.read_from_csv(course_scrapper.CSV_FILE, use_snapshot=False)) == 12
+
+
+def test_incremental_refresh(tmp_path: str) -> None:
+    page = read_page()
+    with CalendarServer(page) as server:
+        url = server.url + '/print'
+        report = crawl(tmp_path, url=url)
+        assert report['status'] == 'updated' and len(report['added']) == 12
+        with open(os.path.join(tmp_path, course_scrapper.CSV_FILE), 'rb') as dataset:
+            first = dataset.read()
+
+        report = crawl(tmp_path, url=url)
+        assert report['status'] == 'not_modified' and report['unchanged'] == 12
+        assert server.requests[-1][1].get('If-None-Match') == server.etag
+        assert server.statuses('/print') == [200, 304]
+
+        server.set_page(page)
+        report = crawl(tmp_path, url=url)
+        assert report['status'] == 'unchanged' and report['unchanged'] == 12 and not report['written']
+        with open(os.path.join(tmp_path, course_scrapper.CSV_FILE), 'rb') as dataset:
+            assert dataset.read() == first
+
+        server.set_page(page.replace(b'Linked data structures.', b'Linked data structures and trees.'))
+        report = crawl(tmp_path, url=url, processes='2')
+        assert report['status'] == 'updated' and report['changed'] == ['CSC148H1'] and report['unchanged'] == 11
+        courses = course_scrapper.read_from_csv(os.path.join(tmp_path, course_scrapper.CSV_FILE), use_snapshot=False)
+        assert 'trees' in next(course for course in courses if course.course_code == 'CSC148H1').course_description
+
+        assert crawl(tmp_path, url=url, incremental='0') == {}
+        assert 'If-None-Match' not in server.requests[-1][1]
+        assert server.statuses('/print')[-1] == 200
+
+
+def test_refresh_on_processes_matches_serial(tmp_path: str) -> None:
+    body = read_page()
+    for processes in (1, 2):
+        file_name = os.path.join(tmp_path, f'catalog{processes}.csv')
+        report = course_scrapper.refresh_csv(course_scrapper.iter_course_block_html([body]), {'etag': 'x'},
+                                             file_name=file_name, processes=processes)
+        assert report['status'] == 'updated'
+    with open(os.path.join(tmp_path, 'catalog1.csv'), 'rb') as serial, \
+            open(os.path.join(tmp_path, 'catalog2.csv'), 'rb') as parallel:
+        assert serial.read() == parallel.read()
+
+
+def test_full_calendar_crawl(tmp_path: str) -> None:
+    departments = {}
+    for html in course_scrapper.iter_course_block_html([read_page()]):
+        code = course_scrapper.ANY_COURSE_CODE_PATTERN.search(html).group()
+        pages = departments.setdefault(code[:3], [[]])
+        if len(pages[-1]) == 3:
+            pages.append([])
+        pages[-1].append(html)
+    failing = {'/section/MAT', '/section/CSC?page=2', '/section/CSC?page=3'}
+    with CalendarServer(departments=departments, failing=failing) as server:
+        crawl(tmp_path, full_calendar='1', departments_url=server.url + '/departments', shard_directory='shards')
+        assert server.statuses('/section/CSC?page=2') == [503, 200]
+        assert server.statuses('/section/CSC?page=3') == [503, 200]
+        assert server.statuses('/section/MAT') == [503, 200]
+    shards = os.path.join(tmp_path, 'shards')
+    assert sorted(os.listdir(shards)) == ['CSC.csv', 'ENG.csv', 'MAT.csv', 'PHL.csv', 'STA.csv']
+    expected = course_scrapper.categorize_calendar_file(CALENDAR_PAGE, None)
+    courses = course_scrapper.read_shards(shards, use_snapshot=False)
+    assert sorted(courses, key=lambda course: course.course_code) \
+        == sorted(expected, key=lambda course: course.course_code)
+    csc = course_scrapper.read_from_csv(os.path.join(shards, 'CSC.csv'), use_snapshot=False)
+    assert [course.course_code for course in csc] \
+        == [course.course_code for course in expected if course.course_code.startswith('CSC')]
+
+
+def test_full_calendar_is_off_when_given_as_0(tmp_path: str) -> None:
+    with CalendarServer(read_page()) as server:
+        report = crawl(tmp_path, full_calendar='0', url=server.url + '/print',
+                       departments_url=server.url + '/departments')
+        assert [path for path, _, _ in server.requests] == ['/print']
+    assert report['status'] == 'updated'
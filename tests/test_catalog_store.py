@@ -0,0 +1,47 @@
+"""
+    Tests of catalog_store: saving and loading a store, and building the prerequisite closure from its arrays.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import os
+
+import pytest
+
+import core_classes as cc
+from catalog_store import RELATIONS, CatalogStore
+from course_ids import CourseIds
+from prerequisite_index import PrerequisiteIndex
+
+
+@pytest.mark.parametrize('file_name', ['catalog', 'catalog.npz'])
+def test_save_and_load_with_or_without_extension(tmp_path: str, courses: dict[str, cc.Course],
+                                                 file_name: str) -> None:
+    store = CatalogStore(courses.values(), CourseIds())
+    store.save(os.path.join(tmp_path, file_name))
+    assert os.listdir(tmp_path) == ['catalog.npz']
+    for name in ('catalog', 'catalog.npz'):
+        loaded = CatalogStore.load(os.path.join(tmp_path, name), CourseIds())
+        assert loaded.codes() == store.codes()
+        for relation in RELATIONS:
+            assert list(loaded.edge_codes(relation)) == list(store.edge_codes(relation))
+
+
+def test_prerequisite_index_from_store(courses: dict[str, cc.Course]) -> None:
+    ids = CourseIds()
+    index = PrerequisiteIndex(courses, ids)
+    from_store = PrerequisiteIndex.from_store(CatalogStore(courses.values(), ids))
+    for code in courses:
+        assert from_store.ancestor_mask(code) == index.ancestor_mask(code)
+        assert from_store.descendant_mask(code) == index.descendant_mask(code)
+
+
+def test_prerequisite_index_from_loaded_store(tmp_path: str, courses: dict[str, cc.Course]) -> None:
+    file_name = os.path.join(tmp_path, 'catalog')
+    CatalogStore(courses.values(), CourseIds()).save(file_name)
+    ids = CourseIds()
+    ids.intern('AAA100H1')
+    index = PrerequisiteIndex.from_store(CatalogStore.load(file_name, ids))
+    expected = PrerequisiteIndex(courses, CourseIds())
+    for code in courses:
+        assert sorted(index.required_for(code)) == sorted(expected.required_for(code))
+        assert sorted(index.unlocks(code)) == sorted(expected.unlocks(code))
@@ -0,0 +1,67 @@
+"""
+    Tests that the cohort checks of cohort give the same answers as the single student functions in main.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import random
+
+import pytest
+
+import cohort
+import core_classes as cc
+import main
+import program_rules
+from conftest import random_students
+
+
+@pytest.fixture(scope='module')
+def students(courses: dict[str, cc.Course]) -> list[cc.Student]:
+    """
+        Random students, a third of whom retook some of their courses.
+    """
+    students = random_students(courses, 200, seed=2)
+    rng = random.Random(2)
+    for student in students[::3]:
+        for record in rng.sample(student.academic_history, min(2, len(student.academic_history))):
+            student.add_record(cc.Record(record.course_taken, rng.randint(0, 100), record.weight))
+    return students
+
+
+def test_fce_counts_count_retaken_courses() -> None:
+    csc148 = cc.Course('CSC148H1', '', '', [], [], [], [], 5)
+    csc110 = cc.Course('CSC110Y1', '', '', [], [], [], [], 5)
+    student = cc.Student('1000000000', 'Student', [cc.Record(csc148, 40, 0.5), cc.Record(csc148, 70, 0.5),
+                                                   cc.Record(csc110, 80, 1.0)])
+    assert main.get_FCE_count(student) == 2.0
+    assert cohort.get_FCE_counts(cohort.create_cohort([student])).tolist() == [2.0]
+
+
+def test_fce_counts(students: list[cc.Student]) -> None:
+    counts = cohort.get_FCE_counts(cohort.create_cohort(students))
+    assert counts.tolist() == [main.get_FCE_count(student) for student in students]
+
+
+def test_course_eligibility(courses: dict[str, cc.Course], students: list[cc.Student]) -> None:
+    codes = sorted(courses)
+    eligible = cohort.check_eligibility_courses(codes, cohort.create_cohort(students), courses)
+    for row, student in enumerate(students):
+        assert eligible[row].tolist() == [main.check_eligibility_course(code, student, courses) for code in codes]
+
+
+def test_program_and_focus_eligibility(students: list[cc.Student]) -> None:
+    group = cohort.create_cohort(students)
+    degrees = ['major', 'specialist']
+    focuses = list(program_rules.FOCUS_RULES)
+    programs = cohort.check_eligibility_programs(degrees, group)
+    focus_results = cohort.check_eligibility_focuses(focuses, group)
+    for row, student in enumerate(students):
+        assert programs[row].tolist() == [main.check_eligibility_program(degree, student) for degree in degrees]
+        assert focus_results[row].tolist() == [main.check_eligibility_focus(focus, student) for focus in focuses]
+
+
+def test_unknown_course_or_focus(courses: dict[str, cc.Course], students: list[cc.Student]) -> None:
+    group = cohort.create_cohort(students)
+    with pytest.raises(ValueError):
+        cohort.check_eligibility_courses(['XYZ999H1'], group, courses)
+    with pytest.raises(ValueError):
+        cohort.check_eligibility_focuses(['no such focus'], group)
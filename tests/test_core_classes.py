@@ -0,0 +1,45 @@
+"""
+    Tests of the student index of core_classes, which must stay up to date however the academic history changes.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import core_classes as cc
+
+
+def record(code: str, grade: int = 80) -> cc.Record:
+    """
+        Returns a record of a course with the given code and no relations.
+    """
+    return cc.Record(cc.Course(code, '', '', [], [], [], [], 1), grade, 0.5 if code[6] == 'H' else 1.0)
+
+
+def test_the_given_list_is_kept() -> None:
+    records = [record('CSC110Y1')]
+    student = cc.Student('1000000000', 'Student', records)
+    assert student.index.fce == 1.0
+    records.append(record('CSC111H1'))
+    assert student.academic_history is records
+    assert set(student.index.records) == {'CSC110Y1', 'CSC111H1'}
+    assert student.index.fce == 1.5
+
+
+def test_index_follows_every_change() -> None:
+    for history in ([record('CSC110Y1'), record('CSC111H1')], cc.RecordList([record('CSC110Y1'),
+                                                                               record('CSC111H1')])):
+        student = cc.Student('1000000000', 'Student', history)
+        student.add_record(record('CSC207H1'))
+        assert student.index.fce == 2.0
+        history[0] = record('MAT137Y1')
+        assert 'MAT137Y1' in student.index.records and 'CSC110Y1' not in student.index.records
+        del history[1]
+        assert set(student.index.records) == {'MAT137Y1', 'CSC207H1'}
+        student.academic_history = []
+        assert student.index.completed == 0 and student.index.fce == 0
+
+
+def test_add_record_updates_the_index_in_place() -> None:
+    student = cc.Student('1000000000', 'Student', [record('CSC110Y1')])
+    index = student.index
+    student.add_record(record('CSC111H1'))
+    assert student.index is index
+    assert set(index.records) == {'CSC110Y1', 'CSC111H1'}
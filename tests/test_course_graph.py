@@ -0,0 +1,54 @@
+"""
+    Tests that the colours of course_graph.CourseGraph are the colours of the graph main.Program.create_graph builds
+    for each student, and of main.get_edges.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import networkx as nx
+import pytest
+
+import core_classes as cc
+import course_graph
+import main
+from conftest import random_students
+
+
+@pytest.fixture(scope='module')
+def structure(courses: dict[str, cc.Course]) -> course_graph.CourseGraph:
+    """
+        The course graph of the course dataset.
+    """
+    return course_graph.CourseGraph(courses)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_colors_match_create_graph(courses: dict[str, cc.Course], structure: course_graph.CourseGraph,
+                                   seed: int) -> None:
+    for student in random_students(courses, 25, seed=seed, records=20):
+        g = nx.DiGraph()
+        main.Program(courses, student).create_graph(g)
+        assert list(g.edges) == structure.edges
+        colors = dict(zip(structure.edges, structure.colors(student)))
+        assert colors == {(source, target): color for source, target, color in g.edges(data='color')}
+        assert nx.utils.graphs_equal(structure.graph(student), g)
+        if student.academic_history:
+            edges = main.get_edges(courses, main.create_student_mapping(student), g)
+            assert colors == {(source, target): edges[(target, source)] for source, target in structure.edges}
+
+
+def test_graph_is_not_shared_between_students(courses: dict[str, cc.Course],
+                                              structure: course_graph.CourseGraph) -> None:
+    first, second = random_students(courses, 2, seed=5, records=20)
+    g = structure.graph(first)
+    structure.graph(second)
+    assert dict(zip(structure.edges, structure.colors(first))) \
+        == {(source, target): color for source, target, color in g.edges(data='color')}
+    assert all('color' not in data for _, _, data in structure.g.edges(data=True))
+
+
+def test_cached_graph(courses: dict[str, cc.Course]) -> None:
+    course_graph.clear_cache()
+    cached = course_graph.cached_graph(courses)
+    assert course_graph.cached_graph(courses) is cached
+    assert course_graph.cached_graph(dict(courses)) is not cached
+    course_graph.clear_cache()
@@ -0,0 +1,188 @@
+"""
+    Tests of course_planner: every term of a plan is valid and the plan meets its rule set, plans are as short and
+    as small as a brute force search finds on a small catalog, and a required course the student can no longer take
+    gives no plan.
+
+    The exclusion lists of the calendar mix true exclusions with "may not be taken after" entries (CSC108H1 lists
+    CSC148H1, for example), so the planner applies an exclusion one way: a course cannot be taken once a course it
+    lists as an exclusion is completed, or in the same term, but a completed course does not stop the student from
+    taking a course it lists. The checks below use the same rule.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import random
+from typing import Optional
+
+import pytest
+
+import core_classes as cc
+import course_planner
+import main
+import program_rules
+import requisite_expressions
+from course_ids import COURSE_IDS
+
+TARGETS = list(program_rules.PROGRAM_RULES) + [(focus, 'major') for focus in program_rules.FOCUS_RULES]
+
+
+def history_student(courses: dict[str, cc.Course], codes: list[str]) -> cc.Student:
+    """
+        Returns a student who passed the given courses, including courses that are not in the catalog.
+    """
+    student = cc.Student('1000000000', 'Student', [])
+    for code in codes:
+        course = courses.get(code) or cc.Course(code, '', '', [], [], [], [], 0)
+        student.add_record(cc.Record(course, 80, 0.5 if code[6] == 'H' else 1.0))
+    return student
+
+
+def assert_valid_plan(courses: dict[str, cc.Course], student: cc.Student, rule_set: program_rules.RuleSet,
+                      plan: course_planner.CoursePlan, credit_cap: float = course_planner.DEFAULT_CREDIT_CAP) -> None:
+    """
+        Asserts that every term of the plan can be taken after the student's courses and the plan's earlier terms,
+        checking prerequisites with check_eligibility_course in main, and that the plan meets the rule set.
+    """
+    taken = [record.course_taken.course_code for record in student.academic_history]
+    credits = 0.0
+    for term in plan.terms:
+        before = history_student(courses, taken)
+        during = COURSE_IDS.mask(taken) | COURSE_IDS.mask(term)
+        assert COURSE_IDS.credits(COURSE_IDS.mask(term)) <= credit_cap
+        for code in term:
+            assert code not in taken
+            if code not in courses:
+                continue
+            course = courses[code]
+            assert main.check_eligibility_course(code, before, courses)
+            if course.corequisite_expression != '':
+                assert requisite_expressions.is_met(course.corequisite_expression, during)
+            elif any(corequisite != '' for corequisite in course.corequisite):
+                assert during & COURSE_IDS.mask(corequisite for corequisite in course.corequisite if corequisite != '')
+            assert not during & COURSE_IDS.mask(excluded for excluded in course.exclusion if excluded != '')
+        taken += term
+        credits += COURSE_IDS.credits(COURSE_IDS.mask(term))
+    assert plan.credits == credits
+    assert rule_set.is_met(COURSE_IDS.mask(taken))
+
+
+@pytest.fixture(scope='module')
+def planner(courses: dict[str, cc.Course]) -> course_planner.CoursePlanner:
+    """
+        The planner of the course dataset.
+    """
+    return course_planner.CoursePlanner(courses)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_plans_are_valid(courses: dict[str, cc.Course], planner: course_planner.CoursePlanner, seed: int) -> None:
+    rng = random.Random(seed)
+    codes = sorted(code for code in courses if code[:3] in ('CSC', 'MAT', 'STA') and code[3] in '12')
+    for _ in range(2):
+        student = history_student(courses, rng.sample(codes, rng.randint(0, 6)))
+        plans = {}
+        for program, degree_type in TARGETS:
+            rule_set = program_rules.get_rule_set(program, degree_type)
+            for objective in course_planner.PLAN_OBJECTIVES:
+                plan = planner.plan(student, rule_set, objective=objective)
+                plans[objective] = plan
+                if plan is not None:
+                    assert_valid_plan(courses, student, rule_set, plan)
+            if plans['terms'] is not None:
+                assert len(plans['terms'].terms) <= len(plans['credits'].terms)
+                assert plans['credits'].credits <= plans['terms'].credits
+
+
+def test_credit_cap(courses: dict[str, cc.Course], planner: course_planner.CoursePlanner) -> None:
+    student = history_student(courses, ['CSC110Y1', 'CSC111H1', 'MAT137Y1'])
+    rule_set = program_rules.get_rule_set('computer science', 'specialist')
+    plan = planner.plan(student, rule_set, credit_cap=1.5)
+    assert plan is not None
+    assert_valid_plan(courses, student, rule_set, plan, credit_cap=1.5)
+
+
+def course(code: str, prerequisites: str = '', corequisites: str = '', exclusion: tuple[str, ...] = ()) -> cc.Course:
+    """
+        Returns a course with the given prerequisite and corequisite expressions and exclusions.
+    """
+    return cc.Course(code, '', '', [], [], [], list(exclusion), 5, prerequisites, corequisites)
+
+
+SMALL_CATALOG = {entry.course_code: entry for entry in [
+    course('PLN101H1'), course('PLN102H1'), course('PLN110Y1', exclusion=('PLN201H1',)),
+    course('PLN201H1', 'PLN101H1'), course('PLN202H1', 'PLN101H1/PLN102H1'), course('PLN203H1', 'PLN102H1'),
+    course('PLN301H1', 'PLN201H1, PLN202H1'), course('PLN302H1', 'PLN201H1', 'PLN203H1'),
+    course('PLN303H1', 'PLN110Y1/PLN202H1', exclusion=('PLN301H1',))]}
+
+SMALL_RULES = [
+    program_rules.RuleSet(((None, (program_rules.Required(('PLN301H1',)),)),)),
+    program_rules.RuleSet(((None, (program_rules.OneOf(('PLN302H1', 'PLN303H1')),)),)),
+    program_rules.RuleSet(((None, (program_rules.Required(('PLN301H1',)), program_rules.OneOf(('PLN302H1', 'PLN303H1')),
+                                   program_rules.Credits(1.0, prefixes=('PLN1',)))),)),
+    program_rules.RuleSet(((None, (program_rules.Credits(1.5, prefixes=('PLN3',)),)),)),
+]
+
+
+def brute_force(start: list[str], rule_set: program_rules.RuleSet, objective: str, credit_cap: float) \
+        -> Optional[tuple[int, float]]:
+    """
+        Returns the fewest terms and credits (in the order of the objective) of a plan of SMALL_CATALOG's courses,
+        found by trying every valid term from every set of completed courses, or None if there is no plan.
+    """
+    codes = list(SMALL_CATALOG)
+
+    def can_take(code: str, before: frozenset[str], during: frozenset[str]) -> bool:
+        entry = SMALL_CATALOG[code]
+        before_mask, during_mask = COURSE_IDS.mask(before), COURSE_IDS.mask(during)
+        return (requisite_expressions.is_met(entry.prerequisite_expression, before_mask)
+                and requisite_expressions.is_met(entry.corequisite_expression, during_mask)
+                and not during & set(entry.exclusion))
+
+    best = {frozenset(start): 0}
+    frontier = [frozenset(start)]
+    for terms in range(1, course_planner.MAX_PLAN_TERMS + 1):
+        reached = []
+        for before in frontier:
+            available = [code for code in codes if code not in before]
+            for size in range(1, 1 << len(available)):
+                term = frozenset(code for bit, code in enumerate(available) if size >> bit & 1)
+                during = before | term
+                if COURSE_IDS.credits(COURSE_IDS.mask(term)) <= credit_cap and during not in best \
+                        and all(can_take(code, before, during) for code in term):
+                    best[during] = terms
+                    reached.append(during)
+        frontier = reached
+    plans = [(terms, COURSE_IDS.credits(COURSE_IDS.mask(state - set(start)))) for state, terms in best.items()
+             if rule_set.is_met(COURSE_IDS.mask(state))]
+    if not plans:
+        return None
+    return min(plans) if objective == 'terms' else min((credits, terms) for terms, credits in plans)[::-1]
+
+
+@pytest.mark.parametrize('start', [[], ['PLN102H1'], ['PLN201H1'], ['PLN110Y1', 'PLN101H1']])
+@pytest.mark.parametrize('rules', range(len(SMALL_RULES)))
+@pytest.mark.parametrize('objective', course_planner.PLAN_OBJECTIVES)
+@pytest.mark.parametrize('credit_cap', [1.0, 1.5])
+def test_plans_are_minimal(start: list[str], rules: int, objective: str, credit_cap: float) -> None:
+    student = history_student(SMALL_CATALOG, start)
+    plan = course_planner.CoursePlanner(SMALL_CATALOG).plan(student, SMALL_RULES[rules], credit_cap, objective)
+    expected = brute_force(start, SMALL_RULES[rules], objective, credit_cap)
+    if expected is None:
+        assert plan is None
+    else:
+        assert_valid_plan(SMALL_CATALOG, student, SMALL_RULES[rules], plan, credit_cap)
+        assert (len(plan.terms), plan.credits) == expected
+
+
+def test_no_plan_when_a_required_course_excludes_a_completed_course() -> None:
+    planner = course_planner.CoursePlanner(SMALL_CATALOG)
+    rule_set = program_rules.RuleSet(((None, (program_rules.Required(('PLN110Y1',)),)),))
+    assert planner.plan(history_student(SMALL_CATALOG, ['PLN101H1', 'PLN201H1']), rule_set) is None
+    plan = planner.plan(history_student(SMALL_CATALOG, ['PLN101H1']), rule_set)
+    assert plan is not None and plan.terms == (('PLN110Y1',),)
+
+
+def test_a_completed_course_does_not_exclude_the_courses_it_lists() -> None:
+    planner = course_planner.CoursePlanner(SMALL_CATALOG)
+    rule_set = program_rules.RuleSet(((None, (program_rules.Required(('PLN201H1',)),)),))
+    plan = planner.plan(history_student(SMALL_CATALOG, ['PLN110Y1', 'PLN101H1']), rule_set)
+    assert plan is not None and plan.terms == (('PLN201H1',),)
@@ -0,0 +1,79 @@
+"""
+    Tests of course_scrapper: reading the dataset from the CSV file and from its compiled snapshot, and parsing a
+    saved copy of the calendar print page (tests/fixtures/calendar_print_page.html).
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import marshal
+import os
+
+from bs4 import BeautifulSoup as Soupy
+
+import core_classes as cc
+import course_scrapper
+from benchmarks.synthetic import synthetic_catalog
+
+CALENDAR_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'calendar_print_page.html')
+
+
+def test_snapshot_round_trip(tmp_path: str) -> None:
+    file_name = os.path.join(tmp_path, 'catalog.csv')
+    course_scrapper.write_to_csv(synthetic_catalog(500, 1, 5), file_name)
+    parsed = course_scrapper.read_from_csv(file_name)
+    assert os.path.exists(file_name + course_scrapper.SNAPSHOT_SUFFIX)
+    loaded = course_scrapper.read_snapshot(file_name)
+    assert loaded == parsed == course_scrapper.read_from_csv(file_name, use_snapshot=False)
+    assert all(type(course) is cc.Course for course in loaded)
+    assert course_scrapper.read_from_csv(file_name, compact=True) == cc.compact_courses(parsed)
+
+
+def test_snapshot_of_other_contents_is_not_used(tmp_path: str) -> None:
+    file_name = os.path.join(tmp_path, 'catalog.csv')
+    course_scrapper.write_to_csv(synthetic_catalog(50, 1, 5), file_name)
+    course_scrapper.read_from_csv(file_name)
+    course_scrapper.write_to_csv(synthetic_catalog(60, 2, 5), file_name)
+    assert course_scrapper.read_snapshot(file_name) is None
+    assert len(course_scrapper.read_from_csv(file_name)) == 60
+    assert len(course_scrapper.read_snapshot(file_name)) == 60
+
+
+def test_touched_dataset_rekeys_the_snapshot(tmp_path: str) -> None:
+    file_name = os.path.join(tmp_path, 'catalog.csv')
+    course_scrapper.write_to_csv(synthetic_catalog(50, 1, 5), file_name)
+    courses = course_scrapper.read_from_csv(file_name)
+    stat = os.stat(file_name)
+    os.utime(file_name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert course_scrapper.read_snapshot(file_name) == courses
+    with open(file_name + course_scrapper.SNAPSHOT_SUFFIX, 'rb') as snapshot:
+        data = snapshot.read()
+    key = marshal.loads(data[4:4 + int.from_bytes(data[:4], 'little')])
+    assert key[2] == os.stat(file_name).st_mtime_ns
+
+
+def test_corrupt_snapshot_is_ignored(tmp_path: str) -> None:
+    file_name = os.path.join(tmp_path, 'catalog.csv')
+    course_scrapper.write_to_csv(synthetic_catalog(50, 1, 5), file_name)
+    with open(file_name + course_scrapper.SNAPSHOT_SUFFIX, 'wb') as snapshot:
+        snapshot.write(b'\x00\x01')
+    assert course_scrapper.read_snapshot(file_name) is None
+    assert len(course_scrapper.read_from_csv(file_name)) == 50
+
+
+def test_streaming_matches_the_soup_tree() -> None:
+    with open(CALENDAR_PAGE, 'rb') as page:
+        body = page.read()
+    blocks = Soupy(body.decode('utf-8'), 'html.parser').find_all(class_=course_scrapper.COURSE_BLOCK_CLASS)
+    for chunk_size in (7, 512, course_scrapper.STREAM_CHUNK_SIZE):
+        chunks = [body[start:start + chunk_size] for start in range(0, len(body), chunk_size)]
+        streamed = list(course_scrapper.iter_course_blocks(chunks))
+        assert len(streamed) == len(blocks)
+        for wanted_courses in (course_scrapper.COURSES_TO_SCRAP, None):
+            assert course_scrapper.categorize_courses(streamed, wanted_courses) \
+                == course_scrapper.categorize_courses(blocks, wanted_courses)
+
+
+
+def test_parallel_categorizing_matches_serial() -> None:
+    serial = course_scrapper.categorize_calendar_file(CALENDAR_PAGE)
+    assert course_scrapper.categorize_calendar_file(CALENDAR_PAGE, processes=2) == serial
+    assert [course.course_code for course in serial][:3] == ['CSC108H1', 'CSC148H1', 'CSC207H1']
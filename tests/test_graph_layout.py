@@ -0,0 +1,50 @@
+"""
+    Tests of the layout caches of graph_layout.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import os
+
+import networkx as nx
+import pytest
+
+import graph_layout
+from conftest import ROOT
+
+
+def chain(length: int) -> nx.DiGraph:
+    """
+        Returns a graph of a chain of prerequisites with the given number of courses.
+    """
+    g = nx.DiGraph()
+    g.add_edges_from((f'CSC{number}H1', f'CSC{number + 1}H1') for number in range(100, 100 + length - 1))
+    return g
+
+
+@pytest.fixture(autouse=True)
+def empty_memory_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+        Gives every test an empty memory cache of at most 2 layouts.
+    """
+    monkeypatch.setattr(graph_layout, '_LAYOUTS', type(graph_layout._LAYOUTS)())
+    monkeypatch.setattr(graph_layout, 'LAYOUT_CACHE_SIZE', 2)
+
+
+def test_cache_directory_does_not_depend_on_the_working_directory() -> None:
+    assert graph_layout.LAYOUT_CACHE_DIRECTORY == os.path.join(ROOT, '.layout_cache')
+
+
+def test_memory_cache_keeps_the_most_recently_used_layouts(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    graphs = [chain(length) for length in (2, 3, 4)]
+    keys = [graph_layout.structure_key(g) for g in graphs]
+    layouts = [graph_layout.cached_layout(g, tmp_path) for g in graphs[:2]]
+    assert graph_layout.cached_layout(graphs[0], tmp_path) is layouts[0]
+    graph_layout.cached_layout(graphs[2], tmp_path)
+    assert list(graph_layout._LAYOUTS) == [keys[0], keys[2]]
+    assert sorted(os.listdir(tmp_path)) == sorted(key + '.json' for key in keys)
+
+    laid_out = []
+    monkeypatch.setattr(graph_layout, 'layered_layout', laid_out.append)
+    assert graph_layout.cached_layout(graphs[1], tmp_path) == layouts[1]
+    assert laid_out == []
+    assert list(graph_layout._LAYOUTS) == [keys[2], keys[1]]
@@ -0,0 +1,88 @@
+"""
+    Tests that graph_renderer draws the same pictures as a full redraw of the graph, and writes the same files on
+    several processes as on one.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import os
+import re
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import core_classes as cc
+import course_graph
+import graph_renderer
+import main
+
+
+HISTORIES = [['CSC108H1', 'CSC148H1', 'CSC165H1', 'MAT137Y1'],
+             ['CSC110Y1', 'CSC111H1', 'MAT135H1', 'MAT136H1', 'CSC207H1', 'CSC236H1', 'MAT223H1', 'STA247H1'],
+             ['CSC110Y1', 'CSC111H1', 'MAT137Y1', 'CSC209H1', 'CSC263H1', 'CSC369H1']]
+
+
+@pytest.fixture(scope='module')
+def students(courses: dict[str, cc.Course]) -> list[cc.Student]:
+    """
+        A few students with passed first and second year courses, and a failed course, so that their graphs have
+        both colours.
+    """
+    students = []
+    for number, history in enumerate(HISTORIES):
+        student = cc.Student(str(1000000000 + number), 'Student', [])
+        for code in history:
+            main.add_course_info(student, code, 40 if code == history[-1] else 80, 0.5 if code[6] == 'H' else 1.0,
+                                 courses)
+        students.append(student)
+    return students
+
+
+def full_redraw(renderer: graph_renderer.GraphRenderer, colors: list[str]) -> np.ndarray:
+    """
+        Returns the RGB pixels of the renderer's figure drawn with every artist visible and the given edge colours.
+    """
+    renderer._show_static(True)
+    renderer._arrows.set_edgecolor(colors)
+    renderer._arrows.set_facecolor(colors)
+    renderer._figure.canvas.draw()
+    return np.array(renderer._figure.canvas.buffer_rgba())[:, :, :3]
+
+
+def test_png_matches_a_full_redraw(tmp_path: str, courses: dict[str, cc.Course], students: list[cc.Student]) -> None:
+    structure = course_graph.CourseGraph(courses)
+    renderer = graph_renderer.GraphRenderer(structure.g)
+    for student in students:
+        colors = structure.colors(student)
+        assert set(colors) == {'g', 'r'}
+        file_name = os.path.join(tmp_path, 'graph.png')
+        renderer.render(colors, file_name)
+        with Image.open(file_name) as image:
+            rendered = np.asarray(image.convert('RGB')).astype(np.int16)
+        assert np.abs(rendered - full_redraw(renderer, colors)).max() <= 3
+
+
+def test_svg_has_no_placeholders(tmp_path: str, courses: dict[str, cc.Course], students: list[cc.Student]) -> None:
+    structure = course_graph.CourseGraph(courses)
+    renderer = graph_renderer.GraphRenderer(structure.g)
+    placeholders = {f'#{index + 1:06x}' for index in range(len(structure.edges))}
+    for student in students:
+        file_name = os.path.join(tmp_path, 'graph.svg')
+        renderer.render(structure.colors(student), file_name)
+        with open(file_name, encoding='utf-8') as svg_file:
+            text = svg_file.read()
+        assert placeholders.isdisjoint(re.findall(r'#[0-9a-f]{6}', text))
+        assert '#008000' in text and '#ff0000' in text
+
+
+@pytest.mark.parametrize('file_format', graph_renderer.RENDER_FORMATS)
+def test_processes_write_the_same_files(tmp_path: str, courses: dict[str, cc.Course], students: list[cc.Student],
+                                        file_format: str) -> None:
+    serial = graph_renderer.render_students(courses, students, os.path.join(tmp_path, 'serial'), file_format)
+    parallel = graph_renderer.render_students(courses, students, os.path.join(tmp_path, 'parallel'), file_format,
+                                              processes=2)
+    assert [os.path.basename(file_name) for file_name in parallel] \
+        == [os.path.basename(file_name) for file_name in serial]
+    for serial_file, parallel_file in zip(serial, parallel):
+        with open(serial_file, 'rb') as first, open(parallel_file, 'rb') as second:
+            assert first.read() == second.read()
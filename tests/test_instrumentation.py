@@ -0,0 +1,182 @@
+"""
+    Tests of instrumentation: the shape of the report, nested instrumented blocks, the allocation peaks of nested
+    stages, stages recorded from several threads, the cProfile dump and the environment variables that turn
+    instrumentation on for a whole process.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import json
+import os
+import pstats
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import instrumentation
+from conftest import ROOT
+
+MEGABYTE = 1 << 20
+
+
+@instrumentation.timed('square')
+def square(number: int) -> int:
+    """
+        Returns the square of number.
+    """
+    return number * number
+
+
+def test_off_by_default() -> None:
+    assert not instrumentation.enabled()
+    assert instrumentation.report() is None
+    with instrumentation.stage('ignored'):
+        pass
+    assert square(3) == 9 and square.__name__ == 'square'
+
+
+def test_report() -> None:
+    with instrumentation.instrumented() as result:
+        assert instrumentation.enabled()
+        for number in range(3):
+            assert square(number) == number * number
+        with instrumentation.stage('block'):
+            assert instrumentation.report()['stages']['square']['calls'] == 3
+    assert not instrumentation.enabled()
+    assert result.keys() == {'allocations', 'stages', 'profile_file'}
+    assert (result['allocations'], result['profile_file']) == (False, None)
+    assert result['stages'].keys() == {'square', 'block'}
+    for name, calls in (('square', 3), ('block', 1)):
+        statistics = result['stages'][name]
+        assert statistics.keys() == {'calls', 'seconds', 'max_seconds'}
+        assert statistics['calls'] == calls
+        assert 0 <= statistics['max_seconds'] <= statistics['seconds']
+    json.dumps(result)
+
+
+def test_stage_raising() -> None:
+    with instrumentation.instrumented() as result:
+        with pytest.raises(ValueError):
+            with instrumentation.stage('failing'):
+                raise ValueError
+    assert result['stages']['failing']['calls'] == 1
+
+
+def test_nested_blocks_are_merged() -> None:
+    with instrumentation.instrumented() as outer:
+        square(1)
+        with instrumentation.instrumented(allocations=True) as inner:
+            square(2)
+            square(3)
+            with instrumentation.stage('inner'):
+                pass
+        assert instrumentation.report()['stages']['square']['calls'] == 3
+    assert {name: statistics['calls'] for name, statistics in inner['stages'].items()} == {'square': 2, 'inner': 1}
+    assert {name: statistics['calls'] for name, statistics in outer['stages'].items()} == {'square': 3, 'inner': 1}
+    assert outer['stages']['square']['max_seconds'] >= inner['stages']['square']['max_seconds']
+    assert outer['stages']['inner'] == inner['stages']['inner']
+    assert 'peak_bytes' in outer['stages']['inner'] and not outer['allocations']
+
+
+def test_allocation_peaks() -> None:
+    with instrumentation.instrumented(allocations=True) as result:
+        with instrumentation.stage('outer'):
+            kept = bytearray(MEGABYTE)
+            with instrumentation.stage('inner'):
+                freed = bytearray(4 * MEGABYTE)
+                del freed
+            with instrumentation.stage('small'):
+                kept.extend(bytes(10))
+    stages = result['stages']
+    assert result['allocations']
+    assert stages['outer'].keys() == {'calls', 'seconds', 'max_seconds', 'allocated_bytes', 'peak_bytes'}
+    assert 4 * MEGABYTE <= stages['inner']['peak_bytes'] < 5 * MEGABYTE
+    assert abs(stages['inner']['allocated_bytes']) < MEGABYTE // 4
+    assert 5 * MEGABYTE <= stages['outer']['peak_bytes'] < 6 * MEGABYTE
+    assert MEGABYTE <= stages['outer']['allocated_bytes'] < 2 * MEGABYTE
+    assert stages['small']['peak_bytes'] < 2 * MEGABYTE
+
+
+def test_peak_stacks_are_per_thread() -> None:
+    recorder = instrumentation.StageRecorder(allocations=True)
+    stacks = []
+    with instrumentation.instrumented(allocations=True):
+        with recorder.record('main'):
+            thread = threading.Thread(target=lambda: stacks.append(list(recorder._peaks())))
+            thread.start()
+            thread.join()
+            stacks.append(list(recorder._peaks()))
+    assert stacks[0] == [] and len(stacks[1]) == 1
+    assert recorder.stages['main']['calls'] == 1
+
+
+def test_threads() -> None:
+    barrier = threading.Barrier(8)
+
+    def work() -> None:
+        barrier.wait()
+        for number in range(200):
+            with instrumentation.stage('outer'):
+                square(number)
+
+    with instrumentation.instrumented(allocations=True) as result:
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert {name: statistics['calls'] for name, statistics in result['stages'].items()} \
+        == {'outer': 1600, 'square': 1600}
+
+
+def test_profile_file(tmp_path: str) -> None:
+    profile_file = os.path.join(tmp_path, 'run.prof')
+    with instrumentation.instrumented(profile_file=profile_file) as result:
+        for number in range(10):
+            square(number)
+        with instrumentation.instrumented(profile_file=os.path.join(tmp_path, 'inner.prof')) as inner:
+            square(1)
+    assert result['profile_file'] == profile_file
+    assert inner['profile_file'] is None and not os.path.exists(os.path.join(tmp_path, 'inner.prof'))
+    statistics = pstats.Stats(profile_file).stats
+    assert [calls[1] for (_, _, name), calls in statistics.items() if name == 'square'] == [11]
+
+
+def run_with_environment(tmp_path: str, **variables: str) -> str:
+    """
+        Reads and maps the course dataset in a new process with the given environment variables, and returns what
+        it prints: whether stages are being recorded.
+    """
+    code = ('import course_scrapper, instrumentation, main\n'
+            'print(instrumentation.enabled())\n'
+            'main.create_course_mapping(course_scrapper.read_from_csv(course_scrapper.CSV_FILE, use_snapshot=False))\n')
+    environment = {name: value for name, value in os.environ.items() if not name.startswith('SPYDERWEB_')}
+    completed = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env={**environment, **variables},
+                               capture_output=True, text=True, timeout=120, check=True)
+    return completed.stdout.strip()
+
+
+@pytest.mark.parametrize('value, enabled', [('', 'False'), ('0', 'False'), ('1', 'True')])
+def test_stages_variable_switch(tmp_path: str, value: str, enabled: str) -> None:
+    assert run_with_environment(tmp_path, SPYDERWEB_STAGES=value) == enabled
+    assert os.listdir(tmp_path) == []
+
+
+def test_environment_variables(tmp_path: str) -> None:
+    report_file = os.path.join(tmp_path, 'stages.json')
+    profile_file = os.path.join(tmp_path, 'run.prof')
+    assert run_with_environment(tmp_path, SPYDERWEB_STAGES=report_file, SPYDERWEB_ALLOCATIONS='1',
+                                SPYDERWEB_PROFILE=profile_file) == 'True'
+    with open(report_file, encoding='utf-8') as file:
+        report = json.load(file)
+    assert report['allocations']
+    assert report['stages'].keys() == {'read_from_csv', 'create_course_mapping'}
+    assert all(statistics['calls'] == 1 and statistics['peak_bytes'] > 0 for statistics in report['stages'].values())
+    assert any(name == 'read_from_csv' for _, _, name in pstats.Stats(profile_file).stats)
+
+
+def test_profile_variable_alone(tmp_path: str) -> None:
+    profile_file = os.path.join(tmp_path, 'run.prof')
+    assert run_with_environment(tmp_path, SPYDERWEB_PROFILE=profile_file) == 'False'
+    assert os.listdir(tmp_path) == ['run.prof']
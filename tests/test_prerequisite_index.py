@@ -0,0 +1,73 @@
+"""
+    Tests of the transitive closure in prerequisite_index against a brute force search of the prerequisite relation.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import random
+
+import core_classes as cc
+from course_ids import CourseIds
+from prerequisite_index import PrerequisiteIndex
+
+
+def brute_force_ancestors(courses: dict[str, cc.Course], course: str) -> set[str]:
+    """
+        Returns every course reachable from course by following prerequisites, with a depth first search.
+    """
+    seen = set()
+    stack = [course]
+    while stack:
+        current = stack.pop()
+        if current not in courses:
+            continue
+        for prerequisite in courses[current].prerequisites:
+            if prerequisite != '' and prerequisite not in seen:
+                seen.add(prerequisite)
+                stack.append(prerequisite)
+    return seen
+
+
+def assert_closure(index: PrerequisiteIndex, courses: dict[str, cc.Course]) -> None:
+    """
+        Asserts that the ancestors and descendants of every course in the index match a brute force search.
+    """
+    ancestors = {code: brute_force_ancestors(courses, code) for code in courses}
+    for code in courses:
+        assert set(index.required_for(code)) == ancestors[code]
+        assert set(index.unlocks(code)) == {other for other in courses if code in ancestors[other]}
+
+
+def random_catalog(size: int, seed: int) -> dict[str, cc.Course]:
+    """
+        Returns a random catalog whose prerequisites may form cycles.
+    """
+    rng = random.Random(seed)
+    codes = [f'ABC{100 + number}H1' for number in range(size)]
+    return {code: cc.Course(code, '', '', rng.sample(codes, rng.randint(0, 3)) + [''], [], [], [], 1)
+            for code in codes}
+
+
+def test_closure_of_dataset(courses: dict[str, cc.Course]) -> None:
+    assert_closure(PrerequisiteIndex(courses, CourseIds()), courses)
+
+
+def test_closure_with_cycles() -> None:
+    for seed in range(5):
+        catalog = random_catalog(40, seed)
+        assert_closure(PrerequisiteIndex(catalog, CourseIds()), catalog)
+
+
+def test_updates_match_a_rebuild() -> None:
+    rng = random.Random(7)
+    catalog = random_catalog(40, 7)
+    index = PrerequisiteIndex(catalog, CourseIds())
+    codes = sorted(catalog)
+    for _ in range(60):
+        code = rng.choice(codes)
+        if rng.random() < 0.2:
+            catalog[code] = cc.Course(code, '', '', [], [], [], [], 1)
+            index.remove_course(code)
+        else:
+            catalog[code] = cc.Course(code, '', '', rng.sample(codes, rng.randint(0, 3)), [], [], [], 1)
+            index.update_course(catalog[code])
+        assert_closure(index, catalog)
@@ -0,0 +1,49 @@
+"""
+    Tests of the compiled program and focus requirements in program_rules.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import pytest
+
+import core_classes as cc
+import main
+import program_rules
+from course_ids import COURSE_IDS
+
+
+def test_compiled_requirement_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        program_rules.CompiledRequirement()
+
+
+@pytest.mark.parametrize('degree, message', [('major', 'missing first year requirements'),
+                                             ('specialist', 'missing first year credits')])
+def test_first_year_messages(degree: str, message: str) -> None:
+    assert program_rules.PROGRAM_RULES[('computer science', degree)].explain(0) == message
+
+
+def test_stages_are_reported_in_order() -> None:
+    rule_set = program_rules.PROGRAM_RULES[('computer science', 'major')]
+    first_year = COURSE_IDS.mask(['CSC110Y1', 'CSC111H1', 'MAT137Y1'])
+    assert rule_set.explain(first_year) == 'missing second year requirements'
+    second_year = first_year | COURSE_IDS.mask(['CSC207H1', 'CSC258H1', 'CSC236H1', 'CSC263H1', 'STA247H1'])
+    assert rule_set.explain(second_year) == 'missing later year requirements(post second year)'
+    assert not rule_set.is_met(second_year)
+
+
+def test_credits_count_half_and_full_courses() -> None:
+    requirement = program_rules.compile_requirement(program_rules.Credits(1.5, courses=('CSC336H1', 'MAT237Y1')))
+    assert not requirement.is_met(COURSE_IDS.mask(['CSC336H1']))
+    assert requirement.is_met(COURSE_IDS.mask(['CSC336H1', 'MAT237Y1']))
+    assert requirement.shortfall(COURSE_IDS.mask(['CSC336H1'])) == 1.0
+
+
+@pytest.mark.parametrize('retaken, eligible', [(['CSC336H1', 'CSC336H1'], False), (['CSC336H1', 'STA238H1'], True),
+                                               (['MAT237Y1', 'MAT237Y1'], True)])
+def test_retaken_courses_count_once(retaken: list[str], eligible: bool) -> None:
+    codes = retaken + ['CSC311H1', 'CSC384H1', 'CSC401H1', 'CSC412H1', 'CSC413H1']
+    student = cc.Student('1000000000', 'Student',
+                         [cc.Record(cc.Course(code, '', '', [], [], [], [], 5), 60, 1.0 if code[6] == 'Y' else 0.5)
+                          for code in codes])
+    assert len(student.academic_history) == len(codes)
+    assert main.check_eligibility_focus('artificial intelligence', student) == eligible
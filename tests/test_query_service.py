@@ -0,0 +1,216 @@
+"""
+    Tests of query_service: the answers of every query path and their errors, and serving over real connections,
+    with keep-alive, oversized bodies and plan or unlock queries that do not block other connections.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import asyncio
+import json
+import threading
+
+import pytest
+
+import core_classes as cc
+import course_graph
+import main
+import query_service
+from ancestor_graphs import AncestorGraphs
+
+STUDENT = {'student_number': '1000000000', 'student_name': 'Student',
+           'records': [{'course': 'CSC110Y1', 'grade': 80}, {'course': 'CSC111H1', 'grade': 75},
+                       {'course': 'MAT137Y1', 'grade': 40}]}
+
+
+@pytest.fixture(scope='module')
+def service(courses: dict[str, cc.Course]) -> query_service.QueryService:
+    """
+        The service of the course dataset.
+    """
+    return query_service.QueryService(courses)
+
+
+@pytest.fixture(scope='module')
+def student(service: query_service.QueryService) -> cc.Student:
+    """
+        The student described by STUDENT.
+    """
+    return service.student({'student': STUDENT})
+
+
+def query(service: query_service.QueryService, path: str, **fields: object) -> tuple[int, dict]:
+    """
+        Answers a POST query for STUDENT with the given fields.
+    """
+    return service.handle('POST', path, json.dumps({'student': STUDENT, **fields}).encode('utf-8'))
+
+
+def test_student(student: cc.Student) -> None:
+    assert [(record.course_taken.course_code, record.grade, record.weight) for record in student.academic_history] \
+        == [('CSC110Y1', 80, 1.0), ('CSC111H1', 75, 0.5), ('MAT137Y1', 40, 1.0)]
+
+
+def test_eligibility_course(service: query_service.QueryService, courses: dict[str, cc.Course],
+                            student: cc.Student) -> None:
+    codes = ['CSC207H1', 'CSC236H1', 'CSC263H1', 'CSC110Y1']
+    assert query(service, '/eligibility/course', courses=codes) \
+        == (200, {'eligible': {code: main.check_eligibility_course(code, student, courses) for code in codes}})
+
+
+def test_eligibility_program_focus_and_requirements(service: query_service.QueryService,
+                                                    student: cc.Student) -> None:
+    assert query(service, '/eligibility/program', degree='major') \
+        == (200, {'eligible': main.check_eligibility_program('major', student)})
+    assert query(service, '/eligibility/focus', focus='game design') \
+        == (200, {'eligible': main.check_eligibility_focus('game design', student)})
+    assert query(service, '/requirements', program='computer science', degree_type='specialist') \
+        == (200, {'requirements': main.get_requirements('computer science', 'specialist', student)})
+
+
+def test_edges(service: query_service.QueryService, courses: dict[str, cc.Course], student: cc.Student) -> None:
+    structure = course_graph.CourseGraph(courses)
+    status, payload = query(service, '/edges')
+    assert status == 200
+    assert payload['edges'] == [[source, target, color]
+                                for (source, target), color in zip(structure.edges, structure.colors(student))]
+    assert {color for _, _, color in payload['edges']} == {'g', 'r'}
+
+
+def test_edges_with_targets(service: query_service.QueryService, courses: dict[str, cc.Course],
+                            student: cc.Student) -> None:
+    g = AncestorGraphs(courses).graph(student, ['CSC263H1'])
+    status, payload = query(service, '/edges', targets=['CSC263H1'])
+    assert status == 200
+    assert sorted(map(tuple, payload['edges'])) == sorted(g.edges(data='color'))
+    assert all(target != 'CSC369H1' for _, target, _ in payload['edges'])
+
+
+def test_plan_and_unlocks(service: query_service.QueryService, student: cc.Student) -> None:
+    status, payload = query(service, '/plan', program='computer science')
+    assert status == 200 and payload['terms'] and payload['credits'] > 0
+    status, payload = query(service, '/unlocks', limit=3)
+    assert status == 200 and len(payload['unlocks']) == 3
+    assert [unlock['course'] for unlock in payload['unlocks']] \
+        == [unlock.course for unlock in service.ranker.rank(student, limit=3)]
+
+
+@pytest.mark.parametrize('path, body', [
+    ('/eligibility/course', b'{"student": '),
+    ('/eligibility/course', b'[1, 2]'),
+    ('/eligibility/course', json.dumps({'student': STUDENT}).encode('utf-8')),
+    ('/eligibility/course', json.dumps({'student': STUDENT, 'courses': ['XYZ123H1']}).encode('utf-8')),
+    ('/eligibility/program', json.dumps({'student': STUDENT, 'degree': 'minor'}).encode('utf-8')),
+    ('/eligibility/focus', json.dumps({'student': STUDENT, 'focus': 'cooking'}).encode('utf-8')),
+    ('/requirements', json.dumps({'student': STUDENT, 'program': 'computer science',
+                                  'degree_type': 'minor'}).encode('utf-8')),
+    ('/edges', json.dumps({'student': STUDENT, 'targets': 'CSC263H1'}).encode('utf-8')),
+    ('/edges', json.dumps({'student': STUDENT, 'targets': ['XYZ123H1']}).encode('utf-8')),
+    ('/plan', json.dumps({'student': STUDENT, 'program': 'computer science', 'degree_type': 'minor'}).encode('utf-8')),
+    ('/unlocks', json.dumps({'student': STUDENT, 'limit': -1}).encode('utf-8')),
+    ('/edges', json.dumps({'student': {'records': [{'course': 'XYZ123H1', 'grade': 80}]}}).encode('utf-8')),
+])
+def test_invalid_queries(service: query_service.QueryService, path: str, body: bytes) -> None:
+    assert service.handle('POST', path, body) == (400, {'error': 'invalid query'})
+
+
+def test_paths_and_methods(service: query_service.QueryService, courses: dict[str, cc.Course]) -> None:
+    assert service.handle('GET', '/health', b'') == (200, {'status': 'ok', 'courses': len(courses)})
+    assert service.handle('POST', '/health', b'')[0] == 405
+    assert service.handle('GET', '/edges', b'')[0] == 405
+    assert service.handle('POST', '/missing', b'{}')[0] == 404
+
+
+async def post(port: int, path: str, query: dict) -> tuple[int, dict]:
+    """
+        Sends one query to the service on port over a new connection and returns the response's status and body.
+    """
+    reader, writer = await asyncio.open_connection(query_service.SERVICE_HOST, port)
+    body = json.dumps(query).encode('utf-8')
+    writer.write(f'POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode('latin-1')
+                 + body)
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(payload)
+
+
+async def exchange(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, request: bytes) \
+        -> tuple[int, dict[str, str], dict]:
+    """
+        Sends one request over an open connection and returns the response's status, headers and JSON body.
+    """
+    writer.write(request)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    line = await reader.readline()
+    while line not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+        line = await reader.readline()
+    return status, headers, json.loads(await reader.readexactly(int(headers['content-length'])))
+
+
+def test_connections(service: query_service.QueryService, courses: dict[str, cc.Course]) -> None:
+    body = json.dumps({'student': STUDENT, 'courses': ['CSC207H1']}).encode('utf-8')
+    request = f'POST /eligibility/course HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body
+
+    async def scenario() -> None:
+        started = asyncio.get_running_loop().create_future()
+        server = asyncio.create_task(service.serve(port=0, started=started.set_result))
+        port = await started
+        reader, writer = await asyncio.open_connection(query_service.SERVICE_HOST, port)
+        for _ in range(3):
+            status, headers, payload = await exchange(reader, writer, request)
+            assert status == 200 and headers['connection'] == 'keep-alive'
+            assert payload == query(service, '/eligibility/course', courses=['CSC207H1'])[1]
+        status, headers, payload = await exchange(reader, writer, b'GET /health HTTP/1.1\r\nConnection: close\r\n\r\n')
+        assert (status, headers['connection'], payload) == (200, 'close', {'status': 'ok', 'courses': len(courses)})
+        assert await reader.read() == b''
+        writer.close()
+
+        reader, writer = await asyncio.open_connection(query_service.SERVICE_HOST, port)
+        status, headers, payload = await exchange(reader, writer,
+                                                  b'POST /edges HTTP/1.0\r\nContent-Length: 2\r\n\r\n{}')
+        assert (status, headers['connection'], payload) == (400, 'close', {'error': 'invalid query'})
+        writer.close()
+
+        reader, writer = await asyncio.open_connection(query_service.SERVICE_HOST, port)
+        status, headers, payload = await exchange(
+            reader, writer, f'POST /edges HTTP/1.1\r\nContent-Length: {query_service.MAX_BODY_SIZE + 1}\r\n\r\n'
+            .encode('latin-1'))
+        assert (status, headers['connection'], payload) == (413, 'close', {'error': 'payload too large'})
+        assert await reader.read() == b''
+        writer.close()
+        server.cancel()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize('path', sorted(query_service.BLOCKING_PATHS))
+def test_slow_queries_do_not_block_the_event_loop(courses: dict[str, cc.Course], path: str) -> None:
+    service = query_service.QueryService(courses)
+    answer = service._routes[path]
+    release = threading.Event()
+
+    def slow(query: dict) -> dict:
+        release.wait(10)
+        return answer(query)
+
+    service._routes[path] = slow
+    student = {'records': [{'course': 'CSC110Y1', 'grade': 80}]}
+
+    async def scenario() -> None:
+        started = asyncio.get_running_loop().create_future()
+        server = asyncio.create_task(service.serve(port=0, started=started.set_result))
+        port = await started
+        slow_query = asyncio.create_task(post(port, path, {'student': student, 'program': 'computer science'}))
+        status, payload = await asyncio.wait_for(
+            post(port, '/eligibility/course', {'student': student, 'courses': ['CSC111H1']}), 5)
+        assert status == 200 and payload == {'eligible': {'CSC111H1': True}}
+        assert not slow_query.done()
+        release.set()
+        status, _ = await asyncio.wait_for(slow_query, 10)
+        assert status == 200
+        server.cancel()
+
+    asyncio.run(scenario())
@@ -0,0 +1,30 @@
+"""
+    Tests of the incremental reachability index in reachability against networkx.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import random
+
+import networkx as nx
+
+from reachability import ReachabilityIndex
+
+
+def test_matches_networkx_as_edges_are_added() -> None:
+    rng = random.Random(3)
+    g = nx.DiGraph()
+    index = ReachabilityIndex()
+    for _ in range(120):
+        source, target = rng.randrange(30), rng.randrange(30)
+        g.add_edge(source, target)
+        index.add_edge(source, target)
+        for node in g:
+            assert set(index.descendants(node)) == nx.descendants(g, node) - {node}
+            assert set(index.ancestors(node)) == nx.ancestors(g, node) - {node}
+
+
+def test_nodes_outside_the_index_only_reach_themselves() -> None:
+    index = ReachabilityIndex()
+    index.add_edge('a', 'b')
+    assert index.reaches('a', 'b') and not index.reaches('b', 'a')
+    assert index.reaches('c', 'c') and not index.reaches('a', 'c')
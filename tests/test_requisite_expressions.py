@@ -0,0 +1,185 @@
+"""
+    Tests of requisite_expressions: tokenizing and parsing calendar text, including malformed text, the round trip
+    through format_expression, compiling to DNF against a direct evaluation of random trees, and that expressions
+    match courses by stem the way the prerequisite lists of main do, in main, cohort and unlock_ranking.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import random
+from typing import Optional
+
+import pytest
+
+import cohort
+import core_classes as cc
+import main
+import unlock_ranking
+from course_ids import COURSE_IDS
+from requisite_expressions import (AllOf, AnyOf, CourseTerm, Expression, _TOKEN_PATTERN, _minimal, compile_expression,
+                                   format_expression, is_met, parse_expression, to_dnf)
+
+A, B, C, D = (CourseTerm(code) for code in ('CSC108H1', 'CSC148H1', 'CSC110Y1', 'MAT137Y1'))
+POOL = [f'RQX{number}H1' for number in range(100, 108)]
+
+
+def test_tokens() -> None:
+    text = '[CSC110Y1, CSC111H1]/ (CSC108H1 or CSC148H1); MAT137Y1 and MAT157Y1 + STA130H1, grade of 60% in ORDER'
+    assert [(match.lastgroup, match.group()) for match in _TOKEN_PATTERN.finditer(text)] == [
+        ('open', '['), ('code', 'CSC110Y1'), ('all', ','), ('code', 'CSC111H1'), ('close', ']'), ('any', '/'),
+        ('open', '('), ('code', 'CSC108H1'), ('any', 'or'), ('code', 'CSC148H1'), ('close', ')'), ('all', ';'),
+        ('code', 'MAT137Y1'), ('all', 'and'), ('code', 'MAT157Y1'), ('all', '+'), ('code', 'STA130H1'), ('all', ',')]
+
+
+@pytest.mark.parametrize('text, expression', [
+    ('CSC108H1', A),
+    ('CSC108H1/ CSC148H1 or CSC110Y1', AnyOf((A, B, C))),
+    ('CSC108H1, CSC148H1; CSC110Y1 and MAT137Y1', AllOf((A, B, C, D))),
+    ('CSC108H1, CSC148H1/ CSC110Y1', AllOf((A, AnyOf((B, C))))),
+    ('(CSC108H1, CSC148H1)/ CSC110Y1', AnyOf((AllOf((A, B)), C))),
+    ('[CSC108H1/ CSC148H1], (CSC110Y1/ MAT137Y1)', AllOf((AnyOf((A, B)), AnyOf((C, D))))),
+    ('((CSC108H1/ CSC148H1)/ CSC110Y1), (CSC108H1)', AllOf((AnyOf((A, B, C)), A))),
+    ('CSC108H1 with a minimum grade of 70%, or permission of the department', A),
+    ('CSC108H1, CSC108H1/ CSC108H1', A),
+    ('(CSC108H1, CSC148H1', AllOf((A, B))),
+    ('((CSC108H1/ CSC148H1', AnyOf((A, B))),
+    ('CSC108H1)), CSC148H1', AllOf((A, B))),
+    ('CSC108H1 and', A),
+    ('CSC108H1 or', A),
+    ('/CSC108H1', A),
+    ('and, or CSC108H1/ or CSC148H1', AnyOf((A, B))),
+    ('CSC108H1/ (CSC148H1 and', AnyOf((A, B))),
+    ('', None),
+    ('()', None),
+    ('Permission of the department', None),
+])
+def test_parse(text: str, expression: Optional[Expression]) -> None:
+    assert parse_expression(text) == expression
+    assert parse_expression(format_expression(expression)) == expression
+
+
+def test_format() -> None:
+    assert format_expression(None) == ''
+    assert format_expression(AllOf((AnyOf((AllOf((A, B)), C)), D))) == '(CSC108H1, CSC148H1)/CSC110Y1, MAT137Y1'
+
+
+def random_expression(rng: random.Random, depth: int, kind: Optional[type] = None) -> Expression:
+    """
+        Returns a random expression tree over the courses of POOL that satisfies the representation invariants, and
+        is not of the given kind.
+    """
+    kinds = [kind_ for kind_ in (AllOf, AnyOf) if kind_ is not kind]
+    if depth == 0 or rng.random() < 0.3:
+        return CourseTerm(rng.choice(POOL))
+    chosen = rng.choice(kinds)
+    children, size = [], rng.randint(2, 3)
+    while len(children) < size:
+        child = random_expression(rng, depth - 1, chosen)
+        if child not in children:
+            children.append(child)
+    return chosen(tuple(children))
+
+
+def evaluate(expression: Optional[Expression], completed: set[str]) -> bool:
+    """
+        Returns whether the completed courses meet the expression, evaluated directly on the tree.
+    """
+    if expression is None:
+        return True
+    if isinstance(expression, CourseTerm):
+        return expression.code in completed
+    if isinstance(expression, AllOf):
+        return all(evaluate(term, completed) for term in expression.terms)
+    return any(evaluate(option, completed) for option in expression.options)
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_random_expressions(seed: int) -> None:
+    rng = random.Random(seed)
+    expression = random_expression(rng, 4)
+    text = format_expression(expression)
+    assert parse_expression(text) == expression
+    assert format_expression(parse_expression(text)) == text
+    dnf = to_dnf(expression)
+    assert _minimal(list(dnf)) == dnf
+    for _ in range(20):
+        completed = {code for code in POOL if rng.random() < 0.5}
+        mask = sum(1 << COURSE_IDS.intern(code) for code in completed)
+        assert is_met(text, mask) == evaluate(expression, completed)
+        assert any(mask & option == option for option in dnf) == evaluate(expression, completed)
+
+
+def test_to_dnf() -> None:
+    a, b, c, d = (1 << COURSE_IDS.intern(term.code) for term in (A, B, C, D))
+    assert to_dnf(None) == (0,)
+    assert to_dnf(A) == (a,)
+    assert to_dnf(AnyOf((AllOf((A, B)), C))) == (a | b, c)
+    assert to_dnf(AllOf((AnyOf((A, B)), AnyOf((C, D))))) == (a | c, a | d, b | c, b | d)
+    assert to_dnf(AllOf((AnyOf((A, B)), AnyOf((A, C))))) == (a, b | c)
+    assert to_dnf(AnyOf((A, AllOf((A, B))))) == (a,)
+
+
+def test_minimal() -> None:
+    assert _minimal([0b11, 0b1, 0b110, 0b1, 0b100]) == (0b1, 0b100)
+    assert _minimal([0b110, 0b011, 0b110]) == (0b110, 0b011)
+    assert _minimal([0b101, 0]) == (0,)
+    assert _minimal([]) == ()
+
+
+def test_compile_expression() -> None:
+    a, b, c, d = (1 << COURSE_IDS.intern(term.code) for term in (A, B, C, D))
+    assert compile_expression('') == ((0, (0,)),)
+    assert compile_expression('CSC108H1/CSC148H1, (CSC108H1, CSC148H1)/CSC110Y1, MAT137Y1') \
+        == ((a | b, ()), (c, (a | b,)), (d, ()))
+    assert is_met('', 0)
+    assert is_met('CSC108H1/CSC148H1, (CSC108H1, CSC148H1)/CSC110Y1, MAT137Y1', a | b | d)
+    assert is_met('CSC108H1/CSC148H1, (CSC108H1, CSC148H1)/CSC110Y1, MAT137Y1', b | c | d)
+    assert not is_met('CSC108H1/CSC148H1, (CSC108H1, CSC148H1)/CSC110Y1, MAT137Y1', a | d)
+    assert not is_met('CSC108H1/CSC148H1, (CSC108H1, CSC148H1)/CSC110Y1, MAT137Y1', a | b | c)
+
+
+def course(code: str, prerequisites: list[str] = (), expression: str = '') -> cc.Course:
+    """
+        Returns a course with the given prerequisites and prerequisite expression.
+    """
+    return cc.Course(code, '', '', list(prerequisites), [], [], [], 5, expression)
+
+
+@pytest.fixture
+def courses() -> dict[str, cc.Course]:
+    """
+        A catalog with the same prerequisites as a list (CSC207H1) and as expressions (CSC209H1, CSC263H1).
+    """
+    catalog = [course('CSC108H1'), course('CSC108H5'), course('CSC110Y1'), course('CSC148H1'), course('CSC148H5'),
+               course('CSC207H1', ['CSC148H1']),
+               course('CSC209H1', ['CSC148H1'], 'CSC148H1'),
+               course('CSC263H1', ['CSC108H1', 'CSC148H1', 'CSC110Y1'], '(CSC108H1, CSC148H1)/CSC110Y1')]
+    return {entry.course_code: entry for entry in catalog}
+
+
+def student(courses: dict[str, cc.Course], codes: list[str]) -> cc.Student:
+    """
+        Returns a student who passed the given courses.
+    """
+    return cc.Student('1000000000', 'Student', [cc.Record(courses[code], 80, 0.5) for code in codes])
+
+
+@pytest.mark.parametrize('codes, eligible', [
+    ([], {'CSC207H1': False, 'CSC209H1': False, 'CSC263H1': False}),
+    (['CSC148H5'], {'CSC207H1': True, 'CSC209H1': True, 'CSC263H1': False}),
+    (['CSC108H5', 'CSC148H5'], {'CSC207H1': True, 'CSC209H1': True, 'CSC263H1': True}),
+    (['CSC108H1', 'CSC148H5'], {'CSC207H1': True, 'CSC209H1': True, 'CSC263H1': True}),
+    (['CSC108H5'], {'CSC207H1': False, 'CSC209H1': False, 'CSC263H1': False}),
+])
+def test_stem_equivalence(courses: dict[str, cc.Course], codes: list[str], eligible: dict[str, bool]) -> None:
+    someone = student(courses, codes)
+    assert {code: main.check_eligibility_course(code, someone, courses) for code in eligible} == eligible
+    matrix = cohort.check_eligibility_courses(list(eligible), cohort.create_cohort([someone]), courses)
+    assert matrix[0].tolist() == list(eligible.values())
+    ranker = unlock_ranking.UnlockRanker(courses)
+    assert {code: ranker.is_eligible(ranker.ids.intern(code), someone.index.completed) for code in eligible} \
+        == eligible
+
+
+def test_unlocks_by_stem(courses: dict[str, cc.Course]) -> None:
+    ranking = unlock_ranking.UnlockRanker(courses).rank(student(courses, ['CSC108H5']), ['CSC148H5'])
+    assert sorted(ranking[0].courses) == ['CSC207H1', 'CSC209H1', 'CSC263H1']
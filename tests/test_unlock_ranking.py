@@ -0,0 +1,69 @@
+"""
+    Tests of the incremental ranking of unlock_ranking against a naive re-check of the whole catalog and of every
+    milestone for each candidate.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+import pytest
+
+import core_classes as cc
+import main
+from conftest import random_students
+from unlock_ranking import Unlock, UnlockRanker
+
+
+@pytest.fixture(scope='module')
+def ranker(courses: dict[str, cc.Course]) -> UnlockRanker:
+    """
+        The ranker of the course dataset.
+    """
+    return UnlockRanker(courses)
+
+
+def naive_unlocks(ranker: UnlockRanker, student: cc.Student, course: str) -> Unlock:
+    """
+        Returns what completing course would unlock for the student, by checking every catalog course with
+        check_eligibility_course in main and every milestone, before and after the course is added to the student's
+        academic history. Like the ranker, completed courses and the course itself are not counted as unlocked.
+    """
+    after = cc.Student(student.student_number, student.student_name, list(student.academic_history))
+    after.add_record(cc.Record(ranker.courses[course], 80, 0.5 if course[6] == 'H' else 1.0))
+    courses = tuple(code for code in ranker.courses
+                    if code not in after.index.records
+                    and not main.check_eligibility_course(code, student, ranker.courses)
+                    and main.check_eligibility_course(code, after, ranker.courses))
+    milestones = tuple(name for name, requirements in ranker.milestones
+                       if not all(requirement.is_met(student.index.completed) for requirement in requirements)
+                       and all(requirement.is_met(after.index.completed) for requirement in requirements))
+    return Unlock(course, courses, milestones)
+
+
+def naive_rank(ranker: UnlockRanker, student: cc.Student) -> list[Unlock]:
+    """
+        Returns the ranking of the courses the student has not completed and is eligible to take, from naive_unlocks.
+    """
+    candidates = [code for code in ranker.courses if code not in student.index.records
+                  and main.check_eligibility_course(code, student, ranker.courses)]
+    return sorted((naive_unlocks(ranker, student, code) for code in candidates),
+                  key=lambda unlock: (-len(unlock.courses) - len(unlock.milestones), unlock.course))
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_rank_matches_a_naive_re_check(courses: dict[str, cc.Course], ranker: UnlockRanker, seed: int) -> None:
+    for student in random_students(courses, 25, seed=seed, records=16):
+        ranking = ranker.rank(student)
+        expected = naive_rank(ranker, student)
+        assert [unlock.course for unlock in ranking] == [unlock.course for unlock in expected]
+        for unlock, naive in zip(ranking, expected):
+            assert sorted(unlock.courses) == sorted(naive.courses)
+            assert sorted(unlock.milestones) == sorted(naive.milestones)
+
+
+def test_rank_of_given_candidates_with_a_limit(courses: dict[str, cc.Course], ranker: UnlockRanker) -> None:
+    student = random_students(courses, 1, seed=9)[0]
+    candidates = sorted(courses)[::3]
+    ranking = ranker.rank(student, candidates, limit=5)
+    expected = sorted((naive_unlocks(ranker, student, code) for code in candidates),
+                      key=lambda unlock: (-len(unlock.courses) - len(unlock.milestones), unlock.course))[:5]
+    assert [(unlock.course, sorted(unlock.courses), sorted(unlock.milestones)) for unlock in ranking] \
+        == [(unlock.course, sorted(unlock.courses), sorted(unlock.milestones)) for unlock in expected]
@@ -0,0 +1,184 @@
+"""
+    Unlock Ranking
+
+    This module ranks the courses a student could take next by what each one would unlock: the catalog courses the
+    student would become eligible to take, and the program year requirements and focus categories the student would
+    complete.
+
+    The ranking is computed incrementally. The prerequisites of every catalog course are compiled once into clauses
+    over course_ids.COURSE_IDS (see cohort.compile_course_clauses), and each course is mapped to the bitmask of the
+    courses whose clauses mention it and the bitmask of the requirements it counts toward. Completing a course can
+    only change the eligibility of those dependents, so ranking a candidate re-checks its dependents against the
+    student's completion bitmask with the candidate added, instead of re-checking the whole catalog.
+
+    This file is Copyright(c) 2023 Mark Henein, Ege Sayin, Kelly Wong, and Joshiah Joseph
+"""
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import cohort
+import core_classes as cc
+import program_rules
+from course_ids import COURSE_IDS, CourseIds
+
+Clause = tuple[int, tuple[int, ...]]
+
+
+@dataclass(frozen=True)
+class Unlock:
+    """
+        What completing one more course would unlock for a student.
+
+        Instance Attributes:
+        - course: The code of the course to complete.
+        - courses: The codes of the catalog courses the student is not eligible to take, and would be once the
+          course is completed.
+        - milestones: The program year requirements and focus categories the student has not completed, and would
+          complete with the course.
+    """
+    course: str
+    courses: tuple[str, ...]
+    milestones: tuple[str, ...]
+
+
+class UnlockRanker:
+    """
+        Ranks next courses by what they unlock for any student, from one catalog.
+
+        Milestones are the stages of every program in program_rules.PROGRAM_RULES, named
+        '<program> <degree type>: <stage>', and the requirements of every focus in program_rules.FOCUS_RULES,
+        named '<focus>: <courses of the requirement>'.
+
+        Instance Attributes:
+        - courses: A dictionary mapping course code to Course object.
+        - ids: The code to ID table the ranker's bitmasks are over.
+        - milestones: The name of each milestone and the requirements that must all be met to complete it.
+    """
+    courses: dict[str, cc.Course]
+    ids: CourseIds
+    milestones: list[tuple[str, tuple[program_rules.CompiledRequirement, ...]]]
+    _catalog: int
+    _clauses: dict[int, tuple[Clause, ...]]
+    _dependents: dict[int, int]
+    _milestone_dependents: dict[int, int]
+
+    def __init__(self, courses: dict[str, cc.Course], ids: CourseIds = COURSE_IDS) -> None:
+        """
+            Compiles the prerequisites of every course of the catalog and indexes the courses and milestones that
+            depend on each course.
+        """
+        self.courses = courses
+        self.ids = ids
+        self._catalog = ids.mask(courses)
+        self._clauses = {}
+        self._dependents = {}
+        stems = cohort.stem_masks(ids)
+        for code, course in courses.items():
+            course_id = ids.intern(code)
+            clauses = tuple(dict.fromkeys((single, tuple(options))
+                                          for single, options in cohort.compile_course_clauses(course, ids, stems)))
+            self._clauses[course_id] = clauses
+            mentioned = 0
+            for single, options in clauses:
+                mentioned |= single
+                for option in options:
+                    mentioned |= option
+            for prerequisite in CourseIds.id_list(mentioned):
+                self._dependents[prerequisite] = self._dependents.get(prerequisite, 0) | (1 << course_id)
+
+        self.milestones = []
+        for (program, degree_type), rule_set in program_rules.PROGRAM_RULES.items():
+            for description, stage in rule_set.stages:
+                self.milestones.append((f'{program} {degree_type}: {description}', stage))
+        for focus, requirements in program_rules.FOCUS_REQUIREMENTS.items():
+            for requirement, compiled in zip(requirements, program_rules.FOCUS_RULES[focus].stages[0][1]):
+                self.milestones.append((f'{focus}: {_describe(requirement)}', (compiled,)))
+        self._milestone_dependents = {}
+        for number, (_, requirements) in enumerate(self.milestones):
+            for requirement in requirements:
+                for course_id in CourseIds.id_list(requirement.courses()):
+                    self._milestone_dependents[course_id] = self._milestone_dependents.get(course_id, 0) \
+                        | (1 << number)
+
+    def is_eligible(self, course_id: int, completed: int) -> bool:
+        """
+            Returns whether a student with the completion bitmask is eligible to take the catalog course with the
+            given ID, the same way check_eligibility_course in main checks it.
+
+            Preconditions:
+            - self.ids.code(course_id) in self.courses
+        """
+        return all(completed & single or any(completed & option == option for option in options)
+                   for single, options in self._clauses[course_id])
+
+    def unlocks(self, course: str, completed: int, eligible: Optional[dict[int, bool]] = None) -> Unlock:
+        """
+            Returns what completing the course would unlock for a student with the completion bitmask. Only the
+            courses and milestones that depend on the course are checked. eligible, if given, caches whether the
+            student is eligible to take each course with the completion bitmask, so ranking many candidates checks
+            each dependent only once.
+        """
+        if eligible is None:
+            eligible = {}
+        course_id = self.ids.intern(course)
+        after = completed | (1 << course_id)
+        unlocked = []
+        for dependent in CourseIds.id_list(self._dependents.get(course_id, 0) & ~after):
+            if dependent not in eligible:
+                eligible[dependent] = self.is_eligible(dependent, completed)
+            if not eligible[dependent] and self.is_eligible(dependent, after):
+                unlocked.append(dependent)
+        milestones = []
+        for number in CourseIds.id_list(self._milestone_dependents.get(course_id, 0)):
+            name, requirements = self.milestones[number]
+            if all(requirement.is_met(after) for requirement in requirements) \
+                    and not all(requirement.is_met(completed) for requirement in requirements):
+                milestones.append(name)
+        return Unlock(course, tuple(self.ids.code(dependent) for dependent in unlocked), tuple(milestones))
+
+    def rank(self, student: cc.Student, candidates: Optional[Iterable[str]] = None,
+             limit: Optional[int] = None) -> list[Unlock]:
+        """
+            Returns what each candidate course would unlock for the student, the candidates that unlock the most
+            courses and milestones first, with ties broken by course code. If candidates is None, the candidates
+            are the catalog courses the student has not completed and is eligible to take. If limit is given, only
+            the first limit candidates are returned.
+
+            Preconditions:
+            - candidates is None or all(course in self.courses for course in candidates)
+            - limit is None or limit >= 0
+        """
+        completed = student.index.completed
+        if candidates is None:
+            candidates = [self.ids.code(course_id) for course_id in CourseIds.id_list(self._catalog & ~completed)
+                          if self.is_eligible(course_id, completed)]
+        eligible = {}
+        ranking = sorted((self.unlocks(course, completed, eligible) for course in candidates),
+                         key=lambda unlock: (-len(unlock.courses) - len(unlock.milestones), unlock.course))
+        return ranking if limit is None else ranking[:limit]
+
+
+def rank_unlocks(student: cc.Student, ranker: Optional[UnlockRanker] = None, **options: object) -> list[Unlock]:
+    """
+        Returns the ranking of ranker (or of a ranker of main.course_data if ranker is None) of the student's next
+        courses; options are passed on to UnlockRanker.rank.
+    """
+    if ranker is None:
+        import main
+
+        ranker = UnlockRanker(main.course_data)
+    return ranker.rank(student, **options)
+
+
+def _describe(requirement: program_rules.Requirement) -> str:
+    """
+        Returns a short description of a requirement's courses.
+    """
+    if isinstance(requirement, program_rules.Required):
+        return ', '.join(requirement.courses)
+    elif isinstance(requirement, program_rules.OneOf):
+        return 'one of ' + ', '.join(option if isinstance(option, str) else '(' + ', '.join(option) + ')'
+                                     for option in requirement.options)
+    else:
+        return f'{requirement.amount} credits of ' \
+            + ', '.join(requirement.courses + tuple(prefix + 'xx' for prefix in requirement.prefixes))